@@ -1,11 +1,16 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
 from config import Config
-from neo4j_connection import Neo4jConnectionManager
-from personal_recommender import PersonalRecommenderService
-from collaborative_recomendation import CollaborativeRecommenderService
-from utils import handle_errors, setup_logging
+from metrics import CONTENT_TYPE, observe_request, render_metrics
+from models import is_partial
+from popularity import parse_popularity_filter
+from recommendation_cache import RecommendationCache, parse_invalidation_request
+from service_container import ServiceContainer
+from tracing import SlowRequestLog, finish_trace, stage, start_trace
+from utils import NDJSON_MIMETYPE, handle_errors, ndjson_lines, setup_logging
 import logging
+import os
+import time
 
 logger = setup_logging()
 
@@ -14,26 +19,94 @@ app.config.from_object(Config)
 
 CORS(app, origins=Config.CORS_ORIGINS)
 
-try:
-    vgsales_connection = Neo4jConnectionManager(
-        Config.VGSALES_URI, 
-        Config.VGSALES_USER, 
-        Config.VGSALES_PASSWORD
-    )
-    videogames_connection = Neo4jConnectionManager(
-        Config.VIDEOGAMES_URI, 
-        Config.VIDEOGAMES_USER, 
-        Config.VIDEOGAMES_PASSWORD
-    )
+# Las conexiones y los índices se crean de forma perezosa: importar este
+# módulo no toca la red y el servidor arranca mientras se cargan los índices.
+services = ServiceContainer(Config)
+
+recommendation_cache = RecommendationCache(
+    default_ttl=Config.CACHE_DEFAULT_TTL,
+    endpoint_ttls=Config.CACHE_ENDPOINT_TTLS,
+    max_entries=Config.CACHE_MAX_ENTRIES,
+    max_bytes=Config.CACHE_MAX_BYTES
+) if Config.CACHE_ENABLED else None
+
+slow_request_log = SlowRequestLog(Config.TRACING_SLOW_THRESHOLD_MS, Config.TRACING_SLOW_SAMPLE_RATE)
+
+def cached_recommendations(endpoint, key_id, max_recommendations, compute, cacheable=True):
+    """
+    Obtiene recomendaciones serializadas desde la caché o las calcula. Los
+    resultados parciales (alguna base de datos no respondió) no se cachean.
+    """
+    cacheable = cacheable and recommendation_cache is not None
+    if cacheable:
+        cached = recommendation_cache.get(endpoint, key_id, max_recommendations)
+        if cached is not None:
+            return cached
     
-    personal_recommender = PersonalRecommenderService(vgsales_connection, videogames_connection)
-    collaborative_recommender = CollaborativeRecommenderService(vgsales_connection, videogames_connection)
+    computed = compute()
+    with stage('serialize'):
+        recommendations = [rec.to_dict() for rec in computed]
     
-    logger.info("Conexiones y servicios inicializados correctamente")
+    if cacheable and not is_partial(computed):
+        recommendation_cache.put(endpoint, key_id, max_recommendations, recommendations)
+    return recommendations
+
+def wants_ndjson():
+    """Streaming NDJSON opcional: ?stream=ndjson o Accept: application/x-ndjson"""
+    if request.args.get('stream') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def ndjson_response(records):
+    """Respuesta con una línea JSON por registro que se envía a medida que se genera"""
+    return Response(stream_with_context(ndjson_lines(records)), mimetype=NDJSON_MIMETYPE)
+
+def recommendations_response(recommendations):
+    if wants_ndjson():
+        return ndjson_response(recommendations)
     
-except Exception as e:
-    logger.error(f"Error inicializando conexiones: {e}")
-    raise
+    return jsonify({
+        'success': True,
+        'recommendations': recommendations
+    })
+
+@app.before_request
+def ensure_warmup():
+    services.start_warmup()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def start_request_trace():
+    if Config.TRACING_ENABLED and request.path.startswith('/api/'):
+        g.trace_token = start_trace(f'{request.method} {request.path}')
+
+@app.after_request
+def attach_request_trace(response):
+    """Añade la cabecera Server-Timing y, con ?debug=timings, el desglose en el JSON"""
+    token = g.pop('trace_token', None)
+    if token is None:
+        return response
+    
+    trace = finish_trace(token)
+    response.headers['Server-Timing'] = trace.server_timing()
+    if request.args.get('debug') == 'timings' and response.is_json:
+        body = response.get_json()
+        if isinstance(body, dict):
+            body['timings'] = trace.to_dict()
+            response.set_data(app.json.dumps(body))
+    slow_request_log.record(trace)
+    return response
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        observe_request(endpoint, request.method, response.status_code, time.perf_counter() - started)
+    return response
 
 @app.route('/')
 def index():
@@ -60,12 +133,12 @@ def recommend_by_game():
             'error': 'gameName es requerido'
         }), 400
     
-    recommendations = personal_recommender.recommend_games_by_game(game_name, max_recommendations)
+    recommendations = cached_recommendations(
+        'by-game', game_name, max_recommendations,
+        lambda: services.personal_recommender.recommend_games_by_game(game_name, max_recommendations)
+    )
     
-    return jsonify({
-        'success': True,
-        'recommendations': [rec.to_dict() for rec in recommendations]
-    })
+    return recommendations_response(recommendations)
 
 @app.route('/api/recommend/by-preferences', methods=['POST'])
 @handle_errors
@@ -88,12 +161,12 @@ def recommend_by_preferences():
             'error': 'userId es requerido'
         }), 400
     
-    recommendations = personal_recommender.recommend_games_by_user_preferences(user_id, max_recommendations)
+    recommendations = cached_recommendations(
+        'by-preferences', user_id, max_recommendations,
+        lambda: services.personal_recommender.recommend_games_by_user_preferences(user_id, max_recommendations)
+    )
     
-    return jsonify({
-        'success': True,
-        'recommendations': [rec.to_dict() for rec in recommendations]
-    })
+    return recommendations_response(recommendations)
 
 @app.route('/api/recommend/by-friends', methods=['POST'])
 @handle_errors
@@ -116,12 +189,12 @@ def recommend_by_friends():
             'error': 'userId es requerido'
         }), 400
     
-    recommendations = collaborative_recommender.recommend_games_by_friends(user_id, max_recommendations)
+    recommendations = cached_recommendations(
+        'by-friends', user_id, max_recommendations,
+        lambda: services.collaborative_recommender.recommend_games_by_friends(user_id, max_recommendations)
+    )
     
-    return jsonify({
-        'success': True,
-        'recommendations': [rec.to_dict() for rec in recommendations]
-    })
+    return recommendations_response(recommendations)
 
 @app.route('/api/recommend/by-similar-users', methods=['POST'])
 @handle_errors
@@ -144,11 +217,155 @@ def recommend_by_similar_users():
             'error': 'userId es requerido'
         }), 400
     
-    recommendations = collaborative_recommender.recommend_games_by_similar_users(user_id, max_recommendations)
+    recommendations = cached_recommendations(
+        'by-similar-users', user_id, max_recommendations,
+        lambda: services.collaborative_recommender.recommend_games_by_similar_users(user_id, max_recommendations)
+    )
+    
+    return recommendations_response(recommendations)
+
+@app.route('/api/recommend/hybrid', methods=['POST'])
+@handle_errors
+def recommend_hybrid():
+    """
+    Endpoint con una sola lista que combina las estrategias personales y
+    colaborativas para un usuario (y, opcionalmente, un juego base)
+    """
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({
+            'success': False,
+            'error': 'Se requieren datos JSON'
+        }), 400
+    
+    user_id = data.get('userId')
+    game_name = data.get('gameName')
+    weights = data.get('weights')
+    max_recommendations = data.get('maxRecommendations', 10)
+    
+    if not user_id:
+        return jsonify({
+            'success': False,
+            'error': 'userId es requerido'
+        }), 400
+    
+    if weights is not None and not isinstance(weights, dict):
+        return jsonify({
+            'success': False,
+            'error': 'weights debe ser un objeto estrategia -> peso'
+        }), 400
+    
+    # Solo se cachea la combinación por defecto: la clave es (usuario, k)
+    recommendations = cached_recommendations(
+        'hybrid', user_id, max_recommendations,
+        lambda: services.hybrid_recommender.recommend(user_id, max_recommendations, game_name, weights),
+        cacheable=not game_name and not weights
+    )
+    
+    return recommendations_response(recommendations)
+
+# tipo de lote -> (servicio del contenedor, método por lotes)
+BATCH_RECOMMENDERS = {
+    'by-game': ('personal_recommender', 'recommend_games_by_game_batch'),
+    'by-preferences': ('personal_recommender', 'recommend_games_by_user_preferences_batch'),
+    'by-friends': ('collaborative_recommender', 'recommend_games_by_friends_batch'),
+    'by-similar-users': ('collaborative_recommender', 'recommend_games_by_similar_users_batch')
+}
+
+def batch_recommender(recommendation_type):
+    """Método por lotes del servicio; lanza ServiceNotReadyError durante el calentamiento"""
+    service_name, method_name = BATCH_RECOMMENDERS[recommendation_type]
+    return getattr(getattr(services, service_name), method_name)
+
+def batch_results(recommendation_type, recommend, ids, max_recommendations):
+    """
+    Recomendaciones serializadas por ID; solo se calculan las que no están
+    en caché. Los IDs con resultados parciales no se cachean.
+    """
+    results = {}
+    missing = []
+    for key_id in dict.fromkeys(ids):
+        cached = None
+        if recommendation_cache is not None:
+            cached = recommendation_cache.get(recommendation_type, key_id, max_recommendations)
+        if cached is None:
+            missing.append(key_id)
+        else:
+            results[key_id] = cached
+    
+    if missing:
+        computed = recommend(missing, max_recommendations)
+        for key_id, recommendations in computed.items():
+            results[key_id] = [rec.to_dict() for rec in recommendations]
+            if recommendation_cache is not None and not is_partial(recommendations):
+                recommendation_cache.put(recommendation_type, key_id, max_recommendations, results[key_id])
+    
+    return results
+
+def stream_batch_results(recommendation_type, recommend, ids, max_recommendations):
+    """
+    Calcula el lote por tramos de STREAM_BATCH_CHUNK_SIZE IDs y emite una
+    línea {id, recommendations} por ID en cuanto termina su tramo.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    chunk_size = max(Config.STREAM_BATCH_CHUNK_SIZE, 1)
+    for start in range(0, len(unique_ids), chunk_size):
+        results = batch_results(recommendation_type, recommend, unique_ids[start:start + chunk_size], max_recommendations)
+        for key_id, recommendations in results.items():
+            yield {'id': key_id, 'recommendations': recommendations}
+
+@app.route('/api/recommend/batch', methods=['POST'])
+@handle_errors
+def recommend_batch():
+    """Endpoint para recomendaciones de muchos usuarios o juegos en una sola llamada"""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({
+            'success': False,
+            'error': 'Se requieren datos JSON'
+        }), 400
+    
+    recommendation_type = data.get('type')
+    ids = data.get('ids')
+    max_recommendations = data.get('maxRecommendations', 10)
+    
+    if recommendation_type not in BATCH_RECOMMENDERS:
+        return jsonify({
+            'success': False,
+            'error': f"type debe ser uno de: {', '.join(BATCH_RECOMMENDERS)}"
+        }), 400
+    
+    if not ids or not isinstance(ids, list):
+        return jsonify({
+            'success': False,
+            'error': 'ids debe ser una lista no vacía de userIds o gameNames'
+        }), 400
+    
+    if not all(isinstance(key_id, str) and key_id for key_id in ids):
+        return jsonify({
+            'success': False,
+            'error': 'Cada elemento de ids debe ser una cadena no vacía'
+        }), 400
+
+    if len(ids) > Config.BATCH_MAX_SIZE:
+        return jsonify({
+            'success': False,
+            'error': f'El lote no puede superar {Config.BATCH_MAX_SIZE} elementos'
+        }), 400
+    
+    # El servicio se obtiene antes de enviar las cabeceras para que
+    # ServiceNotReadyError llegue como 503 y no como una línea de error
+    recommend = batch_recommender(recommendation_type)
+    
+    if wants_ndjson():
+        return ndjson_response(stream_batch_results(recommendation_type, recommend, ids, max_recommendations))
     
     return jsonify({
         'success': True,
-        'recommendations': [rec.to_dict() for rec in recommendations]
+        'type': recommendation_type,
+        'results': batch_results(recommendation_type, recommend, ids, max_recommendations)
     })
 
 @app.route('/api/games/search', methods=['GET'])
@@ -169,19 +386,134 @@ def search_games():
             'error': 'La búsqueda debe tener al menos 2 caracteres'
         }), 400
     
-    games = personal_recommender.search_games(query)
+    games = services.personal_recommender.search_games(query, Config.SEARCH_RESULT_LIMIT)
+    
+    if wants_ndjson():
+        return ndjson_response(games)
+    
+    return jsonify({
+        'success': True,
+        'games': games
+    })
+
+@app.route('/api/games/popular', methods=['GET'])
+@handle_errors
+def popular_games():
+    """Endpoint con los juegos más vendidos, globales o por género, plataforma o año"""
+    popularity = services.popularity
+    if popularity is None:
+        return jsonify({
+            'success': False,
+            'error': 'Tablas de popularidad no disponibles'
+        }), 503
+    
+    region, dimension, value = parse_popularity_filter(request.args)
+    limit = request.args.get('limit', 10, type=int)
+    
+    games = [
+        {'name': name, 'sales': sales}
+        for name, sales in popularity.top(limit, region, dimension, value)
+    ]
     
     return jsonify({
         'success': True,
+        'region': region,
         'games': games
     })
 
+@app.route('/api/cache/invalidate', methods=['POST'])
+@handle_errors
+def invalidate_cache():
+    """Endpoint para invalidar la caché cuando cambian las relaciones de un usuario"""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({
+            'success': False,
+            'error': 'Se requieren datos JSON'
+        }), 400
+    
+    user_id, game_name, related_user_ids = parse_invalidation_request(data)
+    
+    if not user_id and not game_name:
+        return jsonify({
+            'success': False,
+            'error': 'userId o gameName es requerido'
+        }), 400
+    
+    removed = 0
+    if recommendation_cache is not None:
+        if user_id:
+            removed += recommendation_cache.invalidate_user(user_id, related_user_ids)
+        if game_name:
+            removed += recommendation_cache.invalidate_game(game_name)
+    
+    return jsonify({
+        'success': True,
+        'removed': removed
+    })
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Endpoint con estadísticas de la caché de recomendaciones"""
+    return jsonify({
+        'success': True,
+        'enabled': recommendation_cache is not None,
+        'stats': recommendation_cache.stats() if recommendation_cache is not None else {}
+    })
+
+@app.route('/api/graph/memory', methods=['GET'])
+@handle_errors
+def graph_memory():
+    """Endpoint con el uso de memoria del grafo social en memoria"""
+    collaborative_recommender = services.collaborative_recommender
+    
+    return jsonify({
+        'success': True,
+        'enabled': collaborative_recommender.graph_engine_enabled,
+        'memory': collaborative_recommender.graph_memory_report()
+    })
+
+@app.route('/api/graph/reload', methods=['POST'])
+@handle_errors
+def reload_graph():
+    """Endpoint para recargar el grafo social en memoria desde Neo4j"""
+    collaborative_recommender = services.collaborative_recommender
+    
+    if not collaborative_recommender.graph_engine_enabled:
+        return jsonify({
+            'success': False,
+            'error': 'El grafo en memoria está deshabilitado (GRAPH_ENGINE_ENABLED)'
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'memory': collaborative_recommender.reload_graph_engine()
+    })
+
+@app.route('/api/db/pool', methods=['GET'])
+@handle_errors
+def pool_stats():
+    """Endpoint con la configuración y el uso de los pools de conexiones"""
+    return jsonify({
+        'success': True,
+        'pools': {
+            'vgsales': services.vgsales_connection.pool_stats(),
+            'videogames': services.videogames_connection.pool_stats()
+        }
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas de consultas y peticiones en formato de texto de Prometheus"""
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Endpoint de health check"""
     try:
-        vgsales_ok = vgsales_connection.test_connection()
-        videogames_ok = videogames_connection.test_connection()
+        vgsales_ok = services.vgsales_connection.test_connection()
+        videogames_ok = services.videogames_connection.test_connection()
         
         return jsonify({
             'success': True,
@@ -198,6 +530,17 @@ def health_check():
             'error': str(e)
         }), 500
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Endpoint de readiness: indica si los índices ya están cargados"""
+    services.start_warmup()
+    status = services.readiness()
+    
+    return jsonify({
+        'success': status['ready'],
+        **status
+    }), 200 if status['ready'] else 503
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
@@ -214,10 +557,10 @@ def internal_error(error):
 
 if __name__ == '__main__':
     try:
-        logger.info("Probando conexiones...")
-        vgsales_connection.test_connection()
-        videogames_connection.test_connection()
-        logger.info("Conexiones a Neo4j establecidas correctamente")
+        # Con el recargador de Flask el proceso padre solo vigila ficheros:
+        # el calentamiento se lanza únicamente en el proceso que sirve
+        if not Config.DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            services.start_warmup()
         
         app.run(
             debug=Config.DEBUG,
@@ -229,8 +572,7 @@ if __name__ == '__main__':
         raise
     finally:
         try:
-            vgsales_connection.close()
-            videogames_connection.close()
+            services.close()
             logger.info("Conexiones cerradas correctamente")
         except:
             pass
@@ -0,0 +1,725 @@
+"""
+Punto de entrada ASGI con los mismos endpoints /api/* que app.py, servido
+sobre el driver asíncrono de Neo4j. Ejemplo:
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+"""
+from functools import wraps
+from urllib.parse import parse_qs
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from starlette.applications import Starlette
+from starlette.datastructures import MutableHeaders
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Match, Route
+from config import Config
+from async_neo4j_connection import AsyncNeo4jConnectionManager
+from category_refresher import FULL_REFRESH_DISABLED_WARNING
+from metrics import CONTENT_TYPE, observe_request, render_metrics
+from models import is_partial
+from neo4j_connection import pool_settings
+from async_recommenders import AsyncPersonalRecommenderService, AsyncCollaborativeRecommenderService, AsyncHybridRecommenderService
+from recommendation_cache import RecommendationCache, parse_invalidation_request
+from popularity import load_popularity, parse_popularity_filter
+from schema_bootstrap import SchemaBootstrap
+from service_container import ServiceNotReadyError
+from tracing import SlowRequestLog, current_trace, finish_trace, stage, start_trace
+from utils import NDJSON_MIMETYPE, ndjson_lines, ndjson_lines_async, setup_logging
+
+logger = setup_logging()
+
+class AsyncServices:
+    """Conexiones y servicios asíncronos con calentamiento en segundo plano"""
+
+    def __init__(self, config):
+        self.config = config
+        self.vgsales_connection = None
+        self.videogames_connection = None
+        self.personal_recommender = None
+        self.collaborative_recommender = None
+        self.hybrid_recommender = None
+        self.popularity = None
+        self.schema_bootstrap = None
+        self.stage = 'pending'
+        self.error = None
+        self._tasks = []
+
+    async def start(self):
+        self.vgsales_connection = AsyncNeo4jConnectionManager(
+            self.config.VGSALES_URI,
+            self.config.VGSALES_USER,
+            self.config.VGSALES_PASSWORD,
+            name='vgsales',
+            **pool_settings(self.config)
+        )
+        self.videogames_connection = AsyncNeo4jConnectionManager(
+            self.config.VIDEOGAMES_URI,
+            self.config.VIDEOGAMES_USER,
+            self.config.VIDEOGAMES_PASSWORD,
+            name='videogames',
+            **pool_settings(self.config)
+        )
+        self.popularity = await asyncio.to_thread(
+            load_popularity, self.config.POPULARITY_CSV, self.config.POPULARITY_TABLE_SIZE
+        )
+        self.personal_recommender = AsyncPersonalRecommenderService(
+            self.vgsales_connection,
+            self.videogames_connection,
+            snapshot_path=self.config.CATEGORY_SNAPSHOT_PATH or None,
+            popularity=self.popularity
+        )
+        self.collaborative_recommender = AsyncCollaborativeRecommenderService(
+            self.vgsales_connection,
+            self.videogames_connection,
+            similarity_top_n=self.config.SIMILARITY_TOP_N,
+            similarity_max_user_likes=self.config.SIMILARITY_MAX_USER_LIKES,
+            friend_sample_limit=self.config.FRIEND_SAMPLE_LIMIT,
+            friend_of_friend_weight=self.config.FRIEND_OF_FRIEND_WEIGHT,
+            graph_engine_enabled=self.config.GRAPH_ENGINE_ENABLED,
+            popularity=self.popularity
+        )
+        self.hybrid_recommender = AsyncHybridRecommenderService(
+            self.personal_recommender,
+            self.collaborative_recommender,
+            self.config.HYBRID_WEIGHTS
+        )
+        self._tasks.append(asyncio.create_task(self._warmup()))
+        self._tasks.append(asyncio.create_task(self._collaborative_index_loop()))
+
+    async def _warmup(self):
+        try:
+            if self.config.SCHEMA_BOOTSTRAP_ENABLED:
+                self.stage = 'verifying_schema'
+                self.schema_bootstrap = SchemaBootstrap(
+                    self.vgsales_connection,
+                    self.videogames_connection,
+                    create_schema=self.config.SCHEMA_CREATE,
+                    strict=self.config.SCHEMA_STRICT
+                )
+                await self.schema_bootstrap.run_async()
+
+            self.stage = 'loading_category_index'
+            await self.personal_recommender.initialize()
+            self.stage = 'ready'
+            logger.info("Servicios asíncronos inicializados correctamente")
+
+            if self.config.CATEGORY_REFRESH_INTERVAL > 0:
+                if self.config.CATEGORY_FULL_REFRESH_EVERY <= 0:
+                    logger.warning(FULL_REFRESH_DISABLED_WARNING)
+                self._tasks.append(asyncio.create_task(self._refresh_loop()))
+
+        except Exception as e:
+            self.stage = 'failed'
+            self.error = str(e)
+            logger.error(f"Error inicializando servicios asíncronos: {e}")
+
+    async def _refresh_loop(self):
+        cycles = 0
+        while True:
+            await asyncio.sleep(self.config.CATEGORY_REFRESH_INTERVAL)
+            cycles += 1
+            every = self.config.CATEGORY_FULL_REFRESH_EVERY
+            try:
+                await self.personal_recommender.refresh_category_maps(full=every > 0 and cycles % every == 0)
+            except Exception as e:
+                logger.error(f"Error refrescando mapas de categorías: {e}")
+
+    async def _collaborative_index_loop(self):
+        # Hasta que termine la primera construcción se usa la consulta Cypher
+        while True:
+            try:
+                await self.collaborative_recommender.rebuild_indexes()
+            except Exception as e:
+                logger.error(f"Error reconstruyendo los índices colaborativos: {e}")
+            if self.config.SIMILARITY_REFRESH_INTERVAL <= 0:
+                return
+            await asyncio.sleep(self.config.SIMILARITY_REFRESH_INTERVAL)
+
+    def require_ready(self):
+        if self.stage != 'ready':
+            raise ServiceNotReadyError(f"El servicio se está inicializando (etapa: {self.stage})")
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        for connection in (self.vgsales_connection, self.videogames_connection):
+            if connection is not None:
+                await connection.close()
+
+services = AsyncServices(Config)
+
+recommendation_cache = RecommendationCache(
+    default_ttl=Config.CACHE_DEFAULT_TTL,
+    endpoint_ttls=Config.CACHE_ENDPOINT_TTLS,
+    max_entries=Config.CACHE_MAX_ENTRIES,
+    max_bytes=Config.CACHE_MAX_BYTES
+) if Config.CACHE_ENABLED else None
+
+def handle_errors(f):
+    """Decorador para manejo de errores en rutas ASGI"""
+    @wraps(f)
+    async def decorated_function(request):
+        try:
+            return await f(request)
+        except Exception as e:
+            logging.error(f"Error en {f.__name__}: {str(e)}")
+            return JSONResponse({
+                'success': False,
+                'error': str(e)
+            }, status_code=getattr(e, 'status_code', 500))
+    return decorated_function
+
+def matched_route_path(routes, scope) -> str:
+    """
+    Plantilla de la ruta que atiende la petición. Starlette 0.37 no guarda
+    la ruta en el scope, así que se resuelve igual que el router; una ruta
+    que coincide solo en el path (método no permitido) también cuenta.
+    """
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or 'unmatched'
+
+class RequestMetricsMiddleware:
+    """Middleware ASGI que registra la latencia de cada petición por ruta"""
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        endpoint = matched_route_path(self.routes, scope)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            observe_request(endpoint, scope['method'], status, time.perf_counter() - started)
+
+class RequestTracingMiddleware:
+    """
+    Traza por etapas de las peticiones a /api/: añade la cabecera
+    Server-Timing, el desglose en el JSON con ?debug=timings y registra
+    las peticiones lentas.
+    """
+
+    def __init__(self, app, slow_log: SlowRequestLog):
+        self.app = app
+        self.slow_log = slow_log
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not Config.TRACING_ENABLED or not scope['path'].startswith('/api/'):
+            await self.app(scope, receive, send)
+            return
+
+        token = start_trace(f"{scope['method']} {scope['path']}")
+        trace = current_trace()
+        debug = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('debug') == ['timings']
+        pending_start = None
+
+        async def send_with_timing(message):
+            nonlocal pending_start
+            if message['type'] == 'http.response.start':
+                trace.finish()
+                MutableHeaders(scope=message).append('Server-Timing', trace.server_timing())
+                if debug:
+                    pending_start = message
+                    return
+            elif pending_start is not None:
+                start, pending_start = pending_start, None
+                headers = MutableHeaders(scope=start)
+                if not message.get('more_body') and headers.get('content-type', '').startswith('application/json'):
+                    body = json.loads(message.get('body', b'') or b'null')
+                    if isinstance(body, dict):
+                        body['timings'] = trace.to_dict()
+                        message = {**message, 'body': json.dumps(body).encode('utf-8')}
+                        headers['content-length'] = str(len(message['body']))
+                await send(start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            finish_trace(token)
+            self.slow_log.record(trace)
+
+async def read_json(request: Request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+def wants_ndjson(request: Request) -> bool:
+    """Streaming NDJSON opcional: ?stream=ndjson o Accept: application/x-ndjson"""
+    if request.query_params.get('stream') == 'ndjson':
+        return True
+    return NDJSON_MIMETYPE in request.headers.get('accept', '')
+
+def ndjson_response(records):
+    """Respuesta con una línea JSON por registro que se envía a medida que se genera"""
+    lines = ndjson_lines_async(records) if hasattr(records, '__aiter__') else ndjson_lines(records)
+    return StreamingResponse(lines, media_type=NDJSON_MIMETYPE)
+
+async def cached_recommendations(endpoint, key_id, max_recommendations, compute, cacheable=True):
+    """
+    Obtiene recomendaciones serializadas desde la caché o las calcula. Los
+    resultados parciales (alguna base de datos no respondió) no se cachean.
+    """
+    cacheable = cacheable and recommendation_cache is not None
+    if cacheable:
+        cached = recommendation_cache.get(endpoint, key_id, max_recommendations)
+        if cached is not None:
+            return cached
+
+    computed = await compute()
+    with stage('serialize'):
+        recommendations = [rec.to_dict() for rec in computed]
+
+    if cacheable and not is_partial(computed):
+        recommendation_cache.put(endpoint, key_id, max_recommendations, recommendations)
+    return recommendations
+
+def recommendation_endpoint(endpoint, id_field, compute):
+    """Construye un endpoint POST de recomendación con validación y caché"""
+    @handle_errors
+    async def route(request):
+        data = await read_json(request)
+
+        if not data:
+            return JSONResponse({
+                'success': False,
+                'error': 'Se requieren datos JSON'
+            }, status_code=400)
+
+        key_id = data.get(id_field)
+        max_recommendations = data.get('maxRecommendations', 10)
+
+        if not key_id:
+            return JSONResponse({
+                'success': False,
+                'error': f'{id_field} es requerido'
+            }, status_code=400)
+
+        services.require_ready()
+        recommendations = await cached_recommendations(
+            endpoint, key_id, max_recommendations,
+            lambda: compute(key_id, max_recommendations)
+        )
+
+        if wants_ndjson(request):
+            return ndjson_response(recommendations)
+
+        return JSONResponse({
+            'success': True,
+            'recommendations': recommendations
+        })
+
+    route.__name__ = f"recommend_{endpoint.replace('-', '_')}"
+    return route
+
+recommend_by_game = recommendation_endpoint(
+    'by-game', 'gameName',
+    lambda game_name, k: services.personal_recommender.recommend_games_by_game(game_name, k)
+)
+recommend_by_preferences = recommendation_endpoint(
+    'by-preferences', 'userId',
+    lambda user_id, k: services.personal_recommender.recommend_games_by_user_preferences(user_id, k)
+)
+recommend_by_friends = recommendation_endpoint(
+    'by-friends', 'userId',
+    lambda user_id, k: services.collaborative_recommender.recommend_games_by_friends(user_id, k)
+)
+recommend_by_similar_users = recommendation_endpoint(
+    'by-similar-users', 'userId',
+    lambda user_id, k: services.collaborative_recommender.recommend_games_by_similar_users(user_id, k)
+)
+
+@handle_errors
+async def recommend_hybrid(request):
+    """
+    Endpoint con una sola lista que combina las estrategias personales y
+    colaborativas para un usuario (y, opcionalmente, un juego base)
+    """
+    data = await read_json(request)
+
+    if not data:
+        return JSONResponse({
+            'success': False,
+            'error': 'Se requieren datos JSON'
+        }, status_code=400)
+
+    user_id = data.get('userId')
+    game_name = data.get('gameName')
+    weights = data.get('weights')
+    max_recommendations = data.get('maxRecommendations', 10)
+
+    if not user_id:
+        return JSONResponse({
+            'success': False,
+            'error': 'userId es requerido'
+        }, status_code=400)
+
+    if weights is not None and not isinstance(weights, dict):
+        return JSONResponse({
+            'success': False,
+            'error': 'weights debe ser un objeto estrategia -> peso'
+        }, status_code=400)
+
+    services.require_ready()
+    # Solo se cachea la combinación por defecto: la clave es (usuario, k)
+    recommendations = await cached_recommendations(
+        'hybrid', user_id, max_recommendations,
+        lambda: services.hybrid_recommender.recommend(user_id, max_recommendations, game_name, weights),
+        cacheable=not game_name and not weights
+    )
+
+    if wants_ndjson(request):
+        return ndjson_response(recommendations)
+
+    return JSONResponse({
+        'success': True,
+        'recommendations': recommendations
+    })
+
+# tipo de lote -> (servicio, método por lotes)
+BATCH_RECOMMENDERS = {
+    'by-game': ('personal_recommender', 'recommend_games_by_game_batch'),
+    'by-preferences': ('personal_recommender', 'recommend_games_by_user_preferences_batch'),
+    'by-friends': ('collaborative_recommender', 'recommend_games_by_friends_batch'),
+    'by-similar-users': ('collaborative_recommender', 'recommend_games_by_similar_users_batch')
+}
+
+def batch_recommender(recommendation_type):
+    """Método por lotes del servicio; lanza ServiceNotReadyError durante el calentamiento"""
+    services.require_ready()
+    service_name, method_name = BATCH_RECOMMENDERS[recommendation_type]
+    return getattr(getattr(services, service_name), method_name)
+
+async def batch_results(recommendation_type, recommend, ids, max_recommendations):
+    """
+    Recomendaciones serializadas por ID; solo se calculan las que no están
+    en caché. Los IDs con resultados parciales no se cachean.
+    """
+    results = {}
+    missing = []
+    for key_id in dict.fromkeys(ids):
+        cached = None
+        if recommendation_cache is not None:
+            cached = recommendation_cache.get(recommendation_type, key_id, max_recommendations)
+        if cached is None:
+            missing.append(key_id)
+        else:
+            results[key_id] = cached
+
+    if missing:
+        computed = await recommend(missing, max_recommendations)
+        for key_id, recommendations in computed.items():
+            results[key_id] = [rec.to_dict() for rec in recommendations]
+            if recommendation_cache is not None and not is_partial(recommendations):
+                recommendation_cache.put(recommendation_type, key_id, max_recommendations, results[key_id])
+
+    return results
+
+async def stream_batch_results(recommendation_type, recommend, ids, max_recommendations):
+    """
+    Calcula el lote por tramos de STREAM_BATCH_CHUNK_SIZE IDs y emite una
+    línea {id, recommendations} por ID en cuanto termina su tramo.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    chunk_size = max(Config.STREAM_BATCH_CHUNK_SIZE, 1)
+    for start in range(0, len(unique_ids), chunk_size):
+        results = await batch_results(recommendation_type, recommend, unique_ids[start:start + chunk_size], max_recommendations)
+        for key_id, recommendations in results.items():
+            yield {'id': key_id, 'recommendations': recommendations}
+
+@handle_errors
+async def recommend_batch(request):
+    """Endpoint para recomendaciones de muchos usuarios o juegos en una sola llamada"""
+    data = await read_json(request)
+
+    if not data:
+        return JSONResponse({
+            'success': False,
+            'error': 'Se requieren datos JSON'
+        }, status_code=400)
+
+    recommendation_type = data.get('type')
+    ids = data.get('ids')
+    max_recommendations = data.get('maxRecommendations', 10)
+
+    if recommendation_type not in BATCH_RECOMMENDERS:
+        return JSONResponse({
+            'success': False,
+            'error': f"type debe ser uno de: {', '.join(BATCH_RECOMMENDERS)}"
+        }, status_code=400)
+
+    if not ids or not isinstance(ids, list):
+        return JSONResponse({
+            'success': False,
+            'error': 'ids debe ser una lista no vacía de userIds o gameNames'
+        }, status_code=400)
+
+    if not all(isinstance(key_id, str) and key_id for key_id in ids):
+        return JSONResponse({
+            'success': False,
+            'error': 'Cada elemento de ids debe ser una cadena no vacía'
+        }, status_code=400)
+
+    if len(ids) > Config.BATCH_MAX_SIZE:
+        return JSONResponse({
+            'success': False,
+            'error': f'El lote no puede superar {Config.BATCH_MAX_SIZE} elementos'
+        }, status_code=400)
+
+    # El servicio se obtiene antes de enviar las cabeceras para que
+    # ServiceNotReadyError llegue como 503 y no como una línea de error
+    recommend = batch_recommender(recommendation_type)
+
+    if wants_ndjson(request):
+        return ndjson_response(stream_batch_results(recommendation_type, recommend, ids, max_recommendations))
+
+    return JSONResponse({
+        'success': True,
+        'type': recommendation_type,
+        'results': await batch_results(recommendation_type, recommend, ids, max_recommendations)
+    })
+
+@handle_errors
+async def search_games(request):
+    """Endpoint para búsqueda de juegos"""
+    query = request.query_params.get('q', '').strip()
+
+    if not query:
+        return JSONResponse({
+            'success': False,
+            'error': 'Parámetro de búsqueda q es requerido'
+        }, status_code=400)
+
+    if len(query) < 2:
+        return JSONResponse({
+            'success': False,
+            'error': 'La búsqueda debe tener al menos 2 caracteres'
+        }, status_code=400)
+
+    services.require_ready()
+    games = await services.personal_recommender.search_games(query, Config.SEARCH_RESULT_LIMIT)
+
+    if wants_ndjson(request):
+        return ndjson_response(games)
+
+    return JSONResponse({
+        'success': True,
+        'games': games
+    })
+
+@handle_errors
+async def popular_games(request):
+    """Endpoint con los juegos más vendidos, globales o por género, plataforma o año"""
+    popularity = services.popularity
+    if popularity is None:
+        return JSONResponse({
+            'success': False,
+            'error': 'Tablas de popularidad no disponibles'
+        }, status_code=503)
+
+    region, dimension, value = parse_popularity_filter(request.query_params)
+    try:
+        limit = int(request.query_params.get('limit', 10))
+    except ValueError:
+        limit = 10
+
+    games = [
+        {'name': name, 'sales': sales}
+        for name, sales in popularity.top(limit, region, dimension, value)
+    ]
+
+    return JSONResponse({
+        'success': True,
+        'region': region,
+        'games': games
+    })
+
+@handle_errors
+async def invalidate_cache(request):
+    """Endpoint para invalidar la caché cuando cambian las relaciones de un usuario"""
+    data = await read_json(request)
+
+    if not data:
+        return JSONResponse({
+            'success': False,
+            'error': 'Se requieren datos JSON'
+        }, status_code=400)
+
+    user_id, game_name, related_user_ids = parse_invalidation_request(data)
+
+    if not user_id and not game_name:
+        return JSONResponse({
+            'success': False,
+            'error': 'userId o gameName es requerido'
+        }, status_code=400)
+
+    removed = 0
+    if recommendation_cache is not None:
+        if user_id:
+            removed += recommendation_cache.invalidate_user(user_id, related_user_ids)
+        if game_name:
+            removed += recommendation_cache.invalidate_game(game_name)
+
+    return JSONResponse({
+        'success': True,
+        'removed': removed
+    })
+
+async def cache_stats(request):
+    """Endpoint con estadísticas de la caché de recomendaciones"""
+    return JSONResponse({
+        'success': True,
+        'enabled': recommendation_cache is not None,
+        'stats': recommendation_cache.stats() if recommendation_cache is not None else {}
+    })
+
+@handle_errors
+async def graph_memory(request):
+    """Endpoint con el uso de memoria del grafo social en memoria"""
+    services.require_ready()
+    collaborative_recommender = services.collaborative_recommender
+
+    return JSONResponse({
+        'success': True,
+        'enabled': collaborative_recommender.graph_engine_enabled,
+        'memory': collaborative_recommender.graph_memory_report()
+    })
+
+@handle_errors
+async def reload_graph(request):
+    """Endpoint para recargar el grafo social en memoria desde Neo4j"""
+    services.require_ready()
+    collaborative_recommender = services.collaborative_recommender
+
+    if not collaborative_recommender.graph_engine_enabled:
+        return JSONResponse({
+            'success': False,
+            'error': 'El grafo en memoria está deshabilitado (GRAPH_ENGINE_ENABLED)'
+        }, status_code=400)
+
+    return JSONResponse({
+        'success': True,
+        'memory': await collaborative_recommender.reload_graph_engine()
+    })
+
+@handle_errors
+async def pool_stats(request):
+    """Endpoint con la configuración y el uso de los pools de conexiones"""
+    return JSONResponse({
+        'success': True,
+        'pools': {
+            'vgsales': services.vgsales_connection.pool_stats(),
+            'videogames': services.videogames_connection.pool_stats()
+        }
+    })
+
+async def metrics(request):
+    """Métricas de consultas y peticiones en formato de texto de Prometheus"""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+async def health_check(request):
+    """Endpoint de health check"""
+    try:
+        vgsales_ok, videogames_ok = await asyncio.gather(
+            services.vgsales_connection.test_connection(),
+            services.videogames_connection.test_connection()
+        )
+
+        return JSONResponse({
+            'success': True,
+            'status': 'healthy',
+            'connections': {
+                'vgsales': vgsales_ok,
+                'videogames': videogames_ok
+            }
+        })
+    except Exception as e:
+        return JSONResponse({
+            'success': False,
+            'status': 'unhealthy',
+            'error': str(e)
+        }, status_code=500)
+
+async def readiness_check(request):
+    """Endpoint de readiness: indica si los índices ya están cargados"""
+    ready = services.stage == 'ready'
+    status = {
+        'success': ready,
+        'ready': ready,
+        'stage': services.stage,
+        'error': services.error
+    }
+    if services.schema_bootstrap is not None:
+        status['schema'] = services.schema_bootstrap.report
+    if services.personal_recommender is not None:
+        status['indexedGames'] = services.personal_recommender.category_index.game_count
+
+    return JSONResponse(status, status_code=200 if ready else 503)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    await services.start()
+    try:
+        yield
+    finally:
+        await services.close()
+        logger.info("Conexiones cerradas correctamente")
+
+routes = [
+    Route('/api/recommend/by-game', recommend_by_game, methods=['POST']),
+    Route('/api/recommend/by-preferences', recommend_by_preferences, methods=['POST']),
+    Route('/api/recommend/by-friends', recommend_by_friends, methods=['POST']),
+    Route('/api/recommend/by-similar-users', recommend_by_similar_users, methods=['POST']),
+    Route('/api/recommend/hybrid', recommend_hybrid, methods=['POST']),
+    Route('/api/recommend/batch', recommend_batch, methods=['POST']),
+    Route('/api/games/search', search_games, methods=['GET']),
+    Route('/api/games/popular', popular_games, methods=['GET']),
+    Route('/api/cache/invalidate', invalidate_cache, methods=['POST']),
+    Route('/api/cache/stats', cache_stats, methods=['GET']),
+    Route('/api/graph/memory', graph_memory, methods=['GET']),
+    Route('/api/graph/reload', reload_graph, methods=['POST']),
+    Route('/api/db/pool', pool_stats, methods=['GET']),
+    Route('/metrics', metrics, methods=['GET']),
+    Route('/api/health', health_check, methods=['GET']),
+    Route('/api/ready', readiness_check, methods=['GET'])
+]
+
+app = Starlette(
+    debug=Config.DEBUG,
+    routes=routes,
+    middleware=[
+        Middleware(RequestMetricsMiddleware, routes=routes),
+        Middleware(
+            RequestTracingMiddleware,
+            slow_log=SlowRequestLog(Config.TRACING_SLOW_THRESHOLD_MS, Config.TRACING_SLOW_SAMPLE_RATE)
+        ),
+        Middleware(CORSMiddleware, allow_origins=Config.CORS_ORIGINS, allow_methods=['*'], allow_headers=['*'])
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,163 @@
+from typing import Any, AsyncIterator, Dict, Optional
+from neo4j import AsyncGraphDatabase, READ_ACCESS, WRITE_ACCESS, unit_of_work
+import logging
+import time
+from metrics import observe_query
+from neo4j_connection import PoolStatistics, pool_connections
+
+logger = logging.getLogger(__name__)
+
+class AsyncNeo4jConnectionManager:
+    """Variante asíncrona de Neo4jConnectionManager sobre AsyncGraphDatabase"""
+
+    def __init__(self, uri, username, password, max_connection_pool_size: int = 100,
+                 max_connection_lifetime: float = 3600, connection_acquisition_timeout: float = 60,
+                 max_transaction_retry_time: float = 30, query_timeout: Optional[float] = None,
+                 fetch_size: int = 1000, name: str = 'neo4j'):
+        self.uri = uri
+        self.name = name
+        self.username = username
+        self.password = password
+        self.max_connection_pool_size = max_connection_pool_size
+        self.max_connection_lifetime = max_connection_lifetime
+        self.connection_acquisition_timeout = connection_acquisition_timeout
+        self.max_transaction_retry_time = max_transaction_retry_time
+        self.query_timeout = query_timeout
+        self.fetch_size = fetch_size
+        self.stats = PoolStatistics()
+        self.driver = None
+        self._connect()
+
+    def _connect(self):
+        try:
+            self.driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=(self.username, self.password),
+                max_connection_pool_size=self.max_connection_pool_size,
+                max_connection_lifetime=self.max_connection_lifetime,
+                connection_acquisition_timeout=self.connection_acquisition_timeout,
+                max_transaction_retry_time=self.max_transaction_retry_time
+            )
+            logger.info(f"Conexión asíncrona establecida con Neo4j en {self.uri} (pool de {self.max_connection_pool_size})")
+        except Exception as e:
+            logger.error(f"Error conectando a Neo4j: {e}")
+            raise
+
+    async def test_connection(self):
+        try:
+            async with self.driver.session() as session:
+                result = await session.run("RETURN '¡Hola desde Neo4j!' as greeting")
+                record = await result.single()
+                logger.info(f"Prueba de conexión exitosa: {record['greeting']}")
+                return True
+        except Exception as e:
+            logger.error(f"Error en prueba de conexión: {e}")
+            return False
+
+    async def _run_managed(self, access_mode, query, parameters, timeout):
+        timeout = self.query_timeout if timeout is None else timeout
+        attempts = 0
+
+        @unit_of_work(timeout=timeout)
+        async def work(tx):
+            nonlocal attempts
+            attempts += 1
+            result = await tx.run(query, parameters or {})
+            return await result.data()
+
+        self.stats.begin()
+        started = time.perf_counter()
+        records = []
+        failed = True
+        try:
+            async with self.driver.session(default_access_mode=access_mode) as session:
+                if access_mode == READ_ACCESS:
+                    records = await session.execute_read(work)
+                else:
+                    records = await session.execute_write(work)
+            failed = False
+            return records
+        finally:
+            self.stats.end(attempts, failed)
+            observe_query(query, self.name, time.perf_counter() - started, len(records), failed)
+
+    async def execute_read(self, query, parameters=None, timeout: Optional[float] = None):
+        try:
+            return await self._run_managed(READ_ACCESS, query, parameters, timeout)
+        except Exception as e:
+            logger.error(f"Error ejecutando query: {e}")
+            raise
+
+    async def execute_write(self, query, parameters=None, timeout: Optional[float] = None):
+        try:
+            return await self._run_managed(WRITE_ACCESS, query, parameters, timeout)
+        except Exception as e:
+            logger.error(f"Error ejecutando transacción de escritura: {e}")
+            raise
+
+    async def execute_query(self, query, parameters=None, timeout: Optional[float] = None):
+        return await self.execute_read(query, parameters, timeout)
+
+    async def stream_query(self, query, parameters=None, fetch_size: Optional[int] = None,
+                           timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Variante asíncrona de Neo4jConnectionManager.stream_query (sin reintentos)"""
+        timeout = self.query_timeout if timeout is None else timeout
+        fetch_size = self.fetch_size if fetch_size is None else fetch_size
+
+        self.stats.begin()
+        started = time.perf_counter()
+        rows = 0
+        failed = True
+        try:
+            async with self.driver.session(default_access_mode=READ_ACCESS, fetch_size=fetch_size) as session:
+                async with await session.begin_transaction(timeout=timeout) as tx:
+                    result = await tx.run(query, parameters or {})
+                    async for record in result:
+                        rows += 1
+                        yield record.data()
+                    await tx.commit()
+            failed = False
+        except GeneratorExit:
+            failed = False
+            raise
+        except Exception as e:
+            logger.error(f"Error ejecutando query en streaming: {e}")
+            raise
+        finally:
+            self.stats.end(1, failed)
+            observe_query(query, self.name, time.perf_counter() - started, rows, failed)
+
+    async def explain(self, query, parameters=None):
+        if parameters is None:
+            parameters = {}
+
+        try:
+            async with self.driver.session() as session:
+                result = await session.run(f"EXPLAIN {query}", parameters)
+                summary = await result.consume()
+                return summary.plan
+        except Exception as e:
+            logger.error(f"Error obteniendo el plan de la query: {e}")
+            raise
+
+    async def execute_write_transaction(self, query, parameters=None):
+        return await self.execute_write(query, parameters)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'uri': self.uri,
+            'maxPoolSize': self.max_connection_pool_size,
+            'maxConnectionLifetime': self.max_connection_lifetime,
+            'acquisitionTimeout': self.connection_acquisition_timeout,
+            'maxRetryTime': self.max_transaction_retry_time,
+            'queryTimeout': self.query_timeout,
+            'fetchSize': self.fetch_size,
+            'transactions': self.stats.snapshot(),
+            'connections': pool_connections(self.driver)
+        }
+
+    async def close(self):
+        if self.driver:
+            await self.driver.close()
+            logger.info("Conexión Neo4j asíncrona cerrada")
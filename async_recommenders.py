@@ -0,0 +1,602 @@
+from typing import List, Dict, Iterable, Optional, Tuple
+import asyncio
+import logging
+from models import Recommendation, RecommendationList, UserProfile
+from async_neo4j_connection import AsyncNeo4jConnectionManager
+from category_index import CategoryIndex
+from index_snapshot import load_snapshot, write_snapshot
+from popularity import PopularityTables, with_popular_fallback
+from query_fanout import run_async_fanout
+from user_profile import build_user_profiles, profile_queries
+from game_registry import GameEntry
+from personal_recommender import (
+    batch_game_attribute_queries,
+    game_attribute_queries,
+    parse_games_attributes_batch,
+    score_games_by_attributes,
+    score_games_by_preferences,
+    parse_game_attributes
+)
+from collaborative_recomendation import build_collaborative_recommendations, friend_query_params, score_similar_users
+from hybrid_recommender import (
+    HybridRecommenderService,
+    fuse_recommendations,
+    fusion_is_partial,
+    interacted_game_ids,
+    resolve_weights,
+    CANDIDATE_FACTOR
+)
+from item_similarity import ItemSimilarityIndex
+from social_graph import SocialGraph
+from tracing import stage
+from queries import (
+    BATCH_FRIENDS_WEIGHTED_QUERY,
+    BATCH_SIMILAR_USERS_QUERY,
+    FRIENDS_EDGES_QUERY,
+    FRIENDS_WEIGHTED_QUERY,
+    LIKES_EDGES_QUERY,
+    PLAYED_EDGES_QUERY,
+    SIMILAR_USERS_QUERY,
+    VGSALES_FIND_GAME_QUERY,
+    VGSALES_FINGERPRINT_QUERY,
+    VGSALES_GENRES_QUERY,
+    VGSALES_PLATFORMS_QUERY,
+    VGSALES_TITLES_QUERY,
+    VIDEOGAMES_DEVELOPERS_QUERY,
+    VIDEOGAMES_FIND_GAME_QUERY,
+    VIDEOGAMES_FINGERPRINT_QUERY,
+    VIDEOGAMES_TITLES_QUERY
+)
+
+logger = logging.getLogger(__name__)
+
+# Filas de streaming que se acumulan antes de incorporarlas al índice
+INGEST_CHUNK_SIZE = 1000
+
+async def load_user_profile(vgsales_connection, videogames_connection, user_id: str) -> UserProfile:
+    """Carga el perfil del usuario con una consulta por base de datos"""
+    return (await load_user_profiles(vgsales_connection, videogames_connection, [user_id]))[user_id]
+
+async def load_user_profiles(vgsales_connection, videogames_connection, user_ids: List[str]) -> Dict[str, UserProfile]:
+    """Carga los perfiles de un lote de usuarios con una consulta UNWIND por base de datos"""
+    result = await run_async_fanout(profile_queries(vgsales_connection, videogames_connection, user_ids))
+
+    if result.failed:
+        raise RuntimeError(f"No se pudo cargar el perfil en ninguna base de datos: {result.errors}")
+
+    return build_user_profiles(user_ids, result)
+
+class AsyncPersonalRecommenderService:
+    """
+    Versión asíncrona de PersonalRecommenderService. Comparte el índice de
+    categorías y la lógica de puntuación; solo cambia el acceso a Neo4j.
+    """
+
+    def __init__(self, vgsales_connection: AsyncNeo4jConnectionManager, videogames_connection: AsyncNeo4jConnectionManager,
+                 snapshot_path: Optional[str] = None, popularity: Optional[PopularityTables] = None):
+        self.vgsales_conn = vgsales_connection
+        self.videogames_conn = videogames_connection
+        self.snapshot_path = snapshot_path
+        self.popularity = popularity
+        self.category_index = CategoryIndex().finalize()
+        self._refresh_lock = asyncio.Lock()
+
+    async def initialize(self):
+        """Carga el índice de categorías (desde snapshot si sigue vigente)"""
+        try:
+            async with self._refresh_lock:
+                fingerprint = await self._database_fingerprint() if self.snapshot_path else None
+
+                index = None
+                if self.snapshot_path:
+                    index = await asyncio.to_thread(load_snapshot, self.snapshot_path, fingerprint)
+                if index is None:
+                    index = await self._load_category_index(CategoryIndex())
+                    if self.snapshot_path:
+                        await self._save_snapshot(index, fingerprint)
+
+                self._install_index(index)
+
+            logger.info("Mapas de categorías inicializados correctamente")
+
+        except Exception as e:
+            logger.error(f"Error inicializando mapas de categorías: {e}")
+            raise
+
+    async def refresh_category_maps(self, full: bool = False) -> int:
+        """Carga incremental de juegos nuevos e intercambio atómico del índice"""
+        async with self._refresh_lock:
+            current = self.category_index
+            base = CategoryIndex() if full else await asyncio.to_thread(current.copy)
+
+            # Snapshot solo tras una reconstrucción completa, con la huella previa a la carga
+            fingerprint = await self._database_fingerprint() if full and self.snapshot_path else None
+
+            refreshed = await self._load_category_index(base)
+            added = refreshed.game_count - (0 if full else current.game_count)
+
+            if full or refreshed.watermarks != current.watermarks:
+                self._install_index(refreshed)
+                if fingerprint is not None:
+                    await self._save_snapshot(refreshed, fingerprint)
+
+            logger.info(f"Mapas de categorías refrescados: {added} juegos nuevos")
+            return added
+
+    def _install_index(self, index: CategoryIndex):
+        if self.popularity is not None:
+            index.scoring_engine.prior = self.popularity.prior(index.scoring_engine.game_names)
+        self.category_index = index
+
+    async def _database_fingerprint(self) -> Dict[str, Dict[str, int]]:
+        vgsales, videogames = await asyncio.gather(
+            self.vgsales_conn.execute_query(VGSALES_FINGERPRINT_QUERY),
+            self.videogames_conn.execute_query(VIDEOGAMES_FINGERPRINT_QUERY)
+        )
+        return {
+            'vgsales': vgsales[0] if vgsales else {},
+            'videogames': videogames[0] if videogames else {}
+        }
+
+    async def _save_snapshot(self, index: CategoryIndex, fingerprint: Optional[Dict[str, Dict[str, int]]]):
+        # Escritura y fsync bloqueantes: fuera del event loop
+        try:
+            await asyncio.to_thread(write_snapshot, self.snapshot_path, index, fingerprint)
+        except Exception as e:
+            logger.warning(f"No se pudo escribir el snapshot del índice: {e}")
+
+    async def _load_category_index(self, index: CategoryIndex) -> CategoryIndex:
+        """
+        Las cinco consultas se leen en streaming de forma concurrente y sus
+        filas se incorporan al índice por lotes a medida que llegan.
+        """
+        vgsales_params = {'watermark': index.watermarks['vgsales']}
+        videogames_params = {'watermark': index.watermarks['videogames']}
+
+        async def ingest(add, records):
+            chunk = []
+            async for record in records:
+                chunk.append(record)
+                if len(chunk) >= INGEST_CHUNK_SIZE:
+                    add(chunk)
+                    chunk = []
+            add(chunk)
+
+        # Todas las tareas corren en el event loop, así que no hay
+        # escrituras concurrentes sobre el índice
+        await asyncio.gather(
+            ingest(lambda rows: index.ingest('genre', rows),
+                   self.vgsales_conn.stream_query(VGSALES_GENRES_QUERY, vgsales_params)),
+            ingest(lambda rows: index.ingest('platform', rows),
+                   self.vgsales_conn.stream_query(VGSALES_PLATFORMS_QUERY, vgsales_params)),
+            ingest(lambda rows: index.ingest('developer', rows),
+                   self.videogames_conn.stream_query(VIDEOGAMES_DEVELOPERS_QUERY, videogames_params)),
+            ingest(lambda rows: index.ingest_titles('vgsales', rows),
+                   self.vgsales_conn.stream_query(VGSALES_TITLES_QUERY, vgsales_params)),
+            ingest(lambda rows: index.ingest_titles('videogames', rows),
+                   self.videogames_conn.stream_query(VIDEOGAMES_TITLES_QUERY, videogames_params))
+        )
+
+        # Construir el motor y el índice de búsqueda es CPU; se hace fuera del event loop
+        return await asyncio.to_thread(index.finalize)
+
+    async def recommend_games_by_game(self, base_game_name: str, max_recommendations: int) -> List[Recommendation]:
+        """Recomienda juegos basándose en un juego base"""
+        try:
+            index = self.category_index
+            partial = False
+            with stage('lookup'):
+                entry = index.registry.resolve(base_game_name)
+                base_attributes = index.attributes_for(entry) if entry is not None else None
+
+            if entry is None:
+                with stage('node_lookup'):
+                    found, partial = await self._find_game_node(base_game_name)
+                if not found:
+                    logger.warning(f"Juego base '{base_game_name}' no encontrado")
+                    return RecommendationList(
+                        with_popular_fallback([], self.popularity, max_recommendations, exclude=[base_game_name], partial=partial),
+                        partial
+                    )
+                with stage('attribute_fetch'):
+                    base_attributes, attributes_partial = await self._get_game_attributes(base_game_name)
+                partial = partial or attributes_partial
+            elif not base_attributes:
+                with stage('attribute_fetch'):
+                    base_attributes, partial = await self._get_game_attributes(base_game_name, entry)
+
+            recommendations = with_popular_fallback(
+                score_games_by_attributes(index, base_game_name, base_attributes, max_recommendations),
+                self.popularity, max_recommendations, exclude=[base_game_name], attributes=base_attributes,
+                partial=partial
+            )
+
+            logger.info(f"Generadas {len(recommendations)} recomendaciones para '{base_game_name}'")
+            return RecommendationList(recommendations, partial)
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por juego: {e}")
+            raise
+
+    async def recommend_games_by_user_preferences(self, user_id: str, max_recommendations: int,
+                                                  profile: Optional[UserProfile] = None) -> List[Recommendation]:
+        """Recomienda juegos basándose en las preferencias del usuario"""
+        try:
+            if profile is None:
+                with stage('profile_fetch'):
+                    profile = await load_user_profile(self.vgsales_conn, self.videogames_conn, user_id)
+
+            recommendations = with_popular_fallback(
+                score_games_by_preferences(
+                    self.category_index, profile.genres, profile.platforms, profile.interacted_games, max_recommendations
+                ),
+                self.popularity, max_recommendations, exclude=profile.interacted_games, partial=profile.partial
+            )
+
+            logger.info(f"Generadas {len(recommendations)} recomendaciones para usuario '{user_id}'")
+            return RecommendationList(recommendations, profile.partial)
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por preferencias: {e}")
+            raise
+
+    async def recommend_games_by_game_batch(self, game_names: List[str], max_recommendations: int) -> Dict[str, List[Recommendation]]:
+        """
+        Recomendaciones por juego para un lote de juegos. Los juegos indexados
+        se resuelven en memoria y el resto con una consulta UNWIND por base de
+        datos; si alguna no responde, los resultados de esos juegos son parciales.
+        """
+        try:
+            index = self.category_index
+            attributes_by_game = {}
+            for name in game_names:
+                entry = index.registry.resolve(name)
+                attributes = index.attributes_for(entry) if entry is not None else None
+                if attributes:
+                    attributes_by_game[name] = attributes
+
+            missing = [name for name in game_names if name not in attributes_by_game]
+            degraded = set()
+            if missing:
+                fetched, partial = await self._get_games_attributes_batch(missing)
+                attributes_by_game.update(fetched)
+                if partial:
+                    degraded.update(missing)
+
+            results = {}
+            for name in game_names:
+                base_attributes = attributes_by_game.get(name)
+                if base_attributes is None:
+                    recommendations = []
+                else:
+                    recommendations = score_games_by_attributes(index, name, base_attributes, max_recommendations)
+                results[name] = RecommendationList(
+                    with_popular_fallback(
+                        recommendations, self.popularity, max_recommendations, exclude=[name], attributes=base_attributes,
+                        partial=name in degraded
+                    ),
+                    name in degraded
+                )
+
+            logger.info(f"Generadas recomendaciones por juego para un lote de {len(game_names)} juegos")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por juego en lote: {e}")
+            raise
+
+    async def recommend_games_by_user_preferences_batch(self, user_ids: List[str],
+                                                        max_recommendations: int) -> Dict[str, List[Recommendation]]:
+        """Recomendaciones por preferencias para un lote de usuarios con una consulta por base de datos"""
+        try:
+            index = self.category_index
+            profiles = await load_user_profiles(self.vgsales_conn, self.videogames_conn, user_ids)
+
+            results = {}
+            for user_id in user_ids:
+                profile = profiles[user_id]
+                results[user_id] = RecommendationList(
+                    with_popular_fallback(
+                        score_games_by_preferences(
+                            index, profile.genres, profile.platforms, profile.interacted_games, max_recommendations
+                        ),
+                        self.popularity, max_recommendations, exclude=profile.interacted_games,
+                        partial=profile.partial
+                    ),
+                    profile.partial
+                )
+
+            logger.info(f"Generadas recomendaciones por preferencias para un lote de {len(user_ids)} usuarios")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por preferencias en lote: {e}")
+            raise
+
+    async def search_games(self, query: str, limit: int = 20) -> List[Dict]:
+        """Busca juegos por nombre en el índice de n-gramas en memoria"""
+        try:
+            return self.category_index.search_index.search(query, limit)
+
+        except Exception as e:
+            logger.error(f"Error buscando juegos: {e}")
+            raise
+
+    async def _find_game_node(self, game_name: str) -> Tuple[Optional[Dict], bool]:
+        """Nodo del juego (o None) y si alguna base de datos no respondió"""
+        result = await run_async_fanout({
+            'vgsales': (self.vgsales_conn, VGSALES_FIND_GAME_QUERY, {'name': game_name}),
+            'videogames': (self.videogames_conn, VIDEOGAMES_FIND_GAME_QUERY, {'name': game_name})
+        })
+
+        if result.failed:
+            raise RuntimeError(f"Búsqueda de '{game_name}' fallida en ambas bases de datos: {result.errors}")
+
+        for source in ('vgsales', 'videogames'):
+            rows = result.rows(source)
+            if rows:
+                return rows[0]['game'], result.partial
+
+        return None, result.partial
+
+    async def _get_game_attributes(self, game_name: str, entry: Optional[GameEntry] = None) -> Tuple[Dict[str, str], bool]:
+        result = await run_async_fanout(
+            game_attribute_queries(self.vgsales_conn, self.videogames_conn, game_name, entry)
+        )
+        if result.failed:
+            raise RuntimeError(f"Atributos de '{game_name}' no disponibles en ninguna base de datos: {result.errors}")
+        return parse_game_attributes(result.rows('vgsales'), result.rows('videogames')), result.partial
+
+    async def _get_games_attributes_batch(self, game_names: List[str]) -> Tuple[Dict[str, Dict[str, str]], bool]:
+        result = await run_async_fanout(
+            batch_game_attribute_queries(self.vgsales_conn, self.videogames_conn, game_names)
+        )
+        if result.failed:
+            raise RuntimeError(f"Atributos del lote no disponibles en ninguna base de datos: {result.errors}")
+        return parse_games_attributes_batch(game_names, result), result.partial
+
+class AsyncCollaborativeRecommenderService:
+    """Versión asíncrona de CollaborativeRecommenderService"""
+
+    def __init__(self, vgsales_connection: AsyncNeo4jConnectionManager, videogames_connection: AsyncNeo4jConnectionManager,
+                 similarity_top_n: int = 50, similarity_max_user_likes: int = 0,
+                 friend_sample_limit: int = 0, friend_of_friend_weight: float = 0.5,
+                 graph_engine_enabled: bool = False, popularity: Optional[PopularityTables] = None):
+        self.vgsales_conn = vgsales_connection
+        self.videogames_conn = videogames_connection
+        self.popularity = popularity
+        self.friend_sample_limit = friend_sample_limit
+        self.friend_of_friend_weight = friend_of_friend_weight
+        self.similarity_top_n = similarity_top_n
+        self.similarity_max_user_likes = similarity_max_user_likes
+        self.similarity_index: Optional[ItemSimilarityIndex] = None
+        self.graph_engine_enabled = graph_engine_enabled
+        self.graph_engine: Optional[SocialGraph] = None
+
+    async def rebuild_indexes(self):
+        """Reconstruye los índices en memoria habilitados"""
+        await self.rebuild_similarity_index()
+        if self.graph_engine_enabled:
+            await self.reload_graph_engine()
+
+    async def reload_graph_engine(self) -> Dict[str, int]:
+        """Recarga las aristas FRIENDS_WITH, LIKES y PLAYED y cambia el grafo en memoria"""
+        friends, likes, played = await asyncio.gather(
+            self.vgsales_conn.execute_query(FRIENDS_EDGES_QUERY),
+            self.vgsales_conn.execute_query(LIKES_EDGES_QUERY),
+            self.vgsales_conn.execute_query(PLAYED_EDGES_QUERY)
+        )
+        graph = await asyncio.to_thread(
+            SocialGraph.build,
+            [(record['userId'], record['friendId']) for record in friends],
+            [(record['userId'], record['gameName']) for record in likes],
+            [(record['userId'], record['gameName']) for record in played]
+        )
+        self.graph_engine = graph
+        return graph.memory_usage()
+
+    def graph_memory_report(self) -> Optional[Dict[str, int]]:
+        graph = self.graph_engine
+        return graph.memory_usage() if graph is not None else None
+
+    async def rebuild_similarity_index(self) -> int:
+        """Reconstruye el índice item-item desde las aristas LIKES y lo intercambia"""
+        records = await self.vgsales_conn.execute_query(LIKES_EDGES_QUERY)
+        index = await asyncio.to_thread(
+            ItemSimilarityIndex.build,
+            [(record['userId'], record['gameName']) for record in records],
+            self.similarity_top_n,
+            self.similarity_max_user_likes
+        )
+        self.similarity_index = index
+        return index.size
+
+    async def recommend_games_by_friends(self, user_id: str, max_recommendations: int) -> List[Recommendation]:
+        """Recomienda juegos basándose en los gustos de amigos"""
+        try:
+            graph = self.graph_engine
+            if graph is not None:
+                with stage('graph_score'):
+                    game_scores = dict(graph.friend_scores(
+                        user_id, max_recommendations, self.friend_sample_limit, self.friend_of_friend_weight
+                    ))
+            else:
+                params = friend_query_params(max_recommendations, self.friend_sample_limit, self.friend_of_friend_weight)
+                params['userId'] = user_id
+                with stage('friends_query'):
+                    records = await self.vgsales_conn.execute_query(FRIENDS_WEIGHTED_QUERY, params)
+                game_scores = {record['gameName']: record['score'] for record in records}
+
+            with stage('sort'):
+                recommendations = self._rank(game_scores, max_recommendations)
+
+            logger.info(f"Generadas {len(recommendations)} recomendaciones por amigos para usuario '{user_id}'")
+            return recommendations
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por amigos: {e}")
+            raise
+
+    async def recommend_games_by_similar_users(self, user_id: str, max_recommendations: int,
+                                               profile: Optional[UserProfile] = None) -> List[Recommendation]:
+        """Recomienda juegos basándose en usuarios similares"""
+        try:
+            if profile is not None and not profile.liked_games:
+                return self._rank({}, max_recommendations, profile.interacted_games, profile.partial)
+
+            partial = False
+            graph = self.graph_engine
+            index = self.similarity_index
+            if graph is not None:
+                with stage('graph_score'):
+                    game_scores = dict(graph.similar_user_scores(user_id, max_recommendations))
+            elif index is not None:
+                if profile is None:
+                    with stage('profile_fetch'):
+                        profile = await load_user_profile(self.vgsales_conn, self.videogames_conn, user_id)
+                partial = profile.partial
+                with stage('similarity_score'):
+                    game_scores = score_similar_users(index, profile, max_recommendations)
+            else:
+                with stage('similar_users_query'):
+                    similar_users = await self.vgsales_conn.execute_query(SIMILAR_USERS_QUERY, {'userId': user_id})
+                game_scores = {record['gameName']: record['score'] for record in similar_users}
+
+            with stage('sort'):
+                recommendations = self._rank(game_scores, max_recommendations, partial=partial)
+
+            logger.info(f"Generadas {len(recommendations)} recomendaciones por usuarios similares para usuario '{user_id}'")
+            return recommendations
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por usuarios similares: {e}")
+            raise
+
+    async def recommend_games_by_friends_batch(self, user_ids: List[str],
+                                               max_recommendations: int) -> Dict[str, List[Recommendation]]:
+        """Recomendaciones por amigos para un lote de usuarios en un solo recorrido ponderado"""
+        try:
+            graph = self.graph_engine
+            results = {}
+
+            if graph is not None:
+                for user_id in user_ids:
+                    game_scores = dict(graph.friend_scores(
+                        user_id, max_recommendations, self.friend_sample_limit, self.friend_of_friend_weight
+                    ))
+                    results[user_id] = self._rank(game_scores, max_recommendations)
+            else:
+                params = friend_query_params(max_recommendations, self.friend_sample_limit, self.friend_of_friend_weight)
+                params['userIds'] = user_ids
+                records = await self.vgsales_conn.execute_query(BATCH_FRIENDS_WEIGHTED_QUERY, params)
+
+                games_by_user = {record['userId']: record['games'] for record in records}
+
+                for user_id in user_ids:
+                    game_scores = {game['gameName']: game['score'] for game in games_by_user.get(user_id, [])}
+                    results[user_id] = self._rank(game_scores, max_recommendations)
+
+            logger.info(f"Generadas recomendaciones por amigos para un lote de {len(user_ids)} usuarios")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por amigos en lote: {e}")
+            raise
+
+    async def recommend_games_by_similar_users_batch(self, user_ids: List[str],
+                                                     max_recommendations: int) -> Dict[str, List[Recommendation]]:
+        """Recomendaciones por usuarios similares para un lote de usuarios en una consulta"""
+        try:
+            graph = self.graph_engine
+            index = self.similarity_index
+            results = {}
+
+            if graph is not None:
+                for user_id in user_ids:
+                    game_scores = dict(graph.similar_user_scores(user_id, max_recommendations))
+                    results[user_id] = self._rank(game_scores, max_recommendations)
+            elif index is not None:
+                profiles = await load_user_profiles(self.vgsales_conn, self.videogames_conn, user_ids)
+                for user_id in user_ids:
+                    profile = profiles[user_id]
+                    game_scores = score_similar_users(index, profile, max_recommendations)
+                    results[user_id] = self._rank(game_scores, max_recommendations, partial=profile.partial)
+            else:
+                records = await self.vgsales_conn.execute_query(
+                    BATCH_SIMILAR_USERS_QUERY,
+                    {'userIds': user_ids, 'limit': max_recommendations}
+                )
+
+                games_by_user = {record['userId']: record['games'] for record in records}
+
+                for user_id in user_ids:
+                    game_scores = {game['gameName']: game['score'] for game in games_by_user.get(user_id, [])}
+                    results[user_id] = self._rank(game_scores, max_recommendations)
+
+            logger.info(f"Generadas recomendaciones por usuarios similares para un lote de {len(user_ids)} usuarios")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por usuarios similares en lote: {e}")
+            raise
+
+    def _rank(self, game_scores: Dict[str, float], max_recommendations: int,
+              exclude: Iterable[str] = (), partial: bool = False) -> RecommendationList:
+        return RecommendationList(
+            with_popular_fallback(
+                build_collaborative_recommendations(game_scores, max_recommendations, self.popularity),
+                self.popularity, max_recommendations, exclude, partial=partial
+            ),
+            partial
+        )
+
+class AsyncHybridRecommenderService(HybridRecommenderService):
+    """
+    Versión asíncrona de HybridRecommenderService: tras la carga única del
+    perfil, las estrategias se ejecutan de forma concurrente.
+    """
+
+    async def recommend(self, user_id: str, max_recommendations: int, game_name: Optional[str] = None,
+                        weights: Optional[Dict[str, float]] = None) -> List[Recommendation]:
+        try:
+            weights = resolve_weights(self.weights, weights)
+            candidates = max(max_recommendations * CANDIDATE_FACTOR, max_recommendations)
+
+            with stage('profile_fetch'):
+                profile = await load_user_profile(
+                    self.personal_recommender.vgsales_conn, self.personal_recommender.videogames_conn, user_id
+                )
+
+            strategies = {
+                strategy: compute
+                for strategy, compute in self._strategies(user_id, game_name, candidates, profile).items()
+                if weights[strategy] > 0
+            }
+            outcomes = await asyncio.gather(*(compute() for compute in strategies.values()), return_exceptions=True)
+
+            results = {}
+            errors = {}
+            for strategy, outcome in zip(strategies, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.warning(f"Estrategia {strategy} fallida en la recomendación híbrida: {outcome}")
+                    errors[strategy] = str(outcome)
+                else:
+                    results[strategy] = outcome
+
+            if errors and not results:
+                raise RuntimeError(f"Fallaron todas las estrategias: {errors}")
+
+            partial = fusion_is_partial(profile, results, errors)
+            with stage('fuse'):
+                recommendations = with_popular_fallback(
+                    fuse_recommendations(results, weights, max_recommendations, interacted_game_ids(profile)),
+                    self.personal_recommender.popularity, max_recommendations, exclude=profile.interacted_games,
+                    partial=partial
+                )
+
+            logger.info(f"Generadas {len(recommendations)} recomendaciones híbridas para usuario '{user_id}'")
+            return RecommendationList(recommendations, partial)
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones híbridas: {e}")
+            raise
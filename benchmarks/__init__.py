@@ -0,0 +1 @@
+"""Benchmarks reproducibles: grafo sintético, backend sustituto en proceso y medición"""
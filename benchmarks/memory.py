@@ -0,0 +1,181 @@
+"""
+Compara la memoria de los mapas de categorías como conjuntos de títulos
+(la representación anterior) con CompactCatalog, y la de los modelos de
+resultados con y sin __slots__:
+
+    python -m benchmarks.memory --scale 4 --output memory.json
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from collections import defaultdict
+from dataclasses import make_dataclass
+import argparse
+import gc
+import json
+import logging
+import sys
+import time
+import tracemalloc
+import numpy as np
+from benchmarks.synthetic_graph import load_catalog
+from compact_catalog import CompactCatalog, intersect
+from models import Recommendation, RecommendationType
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTE_TYPES = ('genre', 'platform', 'developer')
+
+# Recommendation tal como era antes de __slots__
+LegacyRecommendation = make_dataclass(
+    'LegacyRecommendation', [('game_id', str), ('game_name', str), ('score', float), ('recommendation_type', RecommendationType)]
+)
+
+def measure_memory(build: Callable[[], Any]) -> Tuple[Any, Dict[str, float]]:
+    """Memoria retenida por el resultado de `build` y pico durante su construcción"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        'retainedBytes': retained,
+        'peakBytes': peak,
+        'buildSeconds': round(elapsed, 4)
+    }
+
+def category_rows(scale: int, vgsales_path: Optional[str], videogames_path: Optional[str]) -> List[Tuple[str, bytes, bytes]]:
+    """
+    Filas (tipo, título, valor) del catálogo real, replicado `scale` veces
+    con sufijos para simular un catálogo mayor. Se guardan codificadas
+    para que cada fila decodifique cadenas nuevas, como hace el driver.
+    """
+    catalog = load_catalog(vgsales_path, videogames_path)
+    sources = (('genre', catalog.genres), ('platform', catalog.platforms), ('developer', catalog.developers))
+    rows = []
+    for replica in range(scale):
+        suffix = f' #{replica}' if replica else ''
+        for attribute_type, attributes in sources:
+            for title, values in attributes.items():
+                encoded_title = (title + suffix).encode('utf-8')
+                for value in sorted(values):
+                    rows.append((attribute_type, encoded_title, value.encode('utf-8')))
+    return rows
+
+def decoded(rows: List[Tuple[str, bytes, bytes]]) -> Iterator[Tuple[str, str, str]]:
+    for attribute_type, title, value in rows:
+        yield attribute_type, title.decode('utf-8'), value.decode('utf-8')
+
+def build_legacy(rows) -> Dict[str, Any]:
+    """Mapas valor -> set de títulos e índice título -> atributos, como el CategoryIndex anterior"""
+    maps = {attribute_type: defaultdict(set) for attribute_type in ATTRIBUTE_TYPES}
+    attributes = defaultdict(dict)
+    for attribute_type, title, value in decoded(rows):
+        maps[attribute_type][value].add(title)
+        attributes[title][attribute_type] = value
+    return {'maps': maps, 'attributes': attributes}
+
+def build_compact(rows) -> CompactCatalog:
+    catalog = CompactCatalog(ATTRIBUTE_TYPES)
+    for attribute_type, title, value in decoded(rows):
+        catalog.add(attribute_type, title, value)
+    return catalog.compact()
+
+def time_intersections(legacy, catalog: CompactCatalog, pairs: List[Tuple[str, str]]) -> Dict[str, float]:
+    """Tiempo medio de intersecar género x plataforma con sets y con listas ordenadas"""
+    started = time.perf_counter()
+    legacy_sizes = [len(legacy['maps']['genre'][genre] & legacy['maps']['platform'][platform]) for genre, platform in pairs]
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compact_sizes = [
+        int(intersect(catalog.postings('genre', genre), catalog.postings('platform', platform)).size)
+        for genre, platform in pairs
+    ]
+    compact_seconds = time.perf_counter() - started
+
+    if legacy_sizes != compact_sizes:
+        raise RuntimeError('Las intersecciones de ambas representaciones no coinciden')
+    return {
+        'pairs': len(pairs),
+        'setMeanUs': round(legacy_seconds / max(len(pairs), 1) * 1e6, 3),
+        'postingsMeanUs': round(compact_seconds / max(len(pairs), 1) * 1e6, 3)
+    }
+
+def object_benchmarks(count: int) -> Dict[str, Dict[str, float]]:
+    """Memoria de `count` resultados con cada variante de modelo"""
+    names = [f'game {index}' for index in range(count)]
+    builders = {
+        'Recommendation (dataclass)': lambda: [
+            LegacyRecommendation(name, name, float(index), RecommendationType.PERSONAL) for index, name in enumerate(names)
+        ],
+        'Recommendation (__slots__)': lambda: [
+            Recommendation(name, name, float(index), RecommendationType.PERSONAL) for index, name in enumerate(names)
+        ]
+    }
+    report = {}
+    for label, build in builders.items():
+        _, report[label] = measure_memory(build)
+        report[label]['bytesPerObject'] = round(report[label]['retainedBytes'] / max(count, 1), 1)
+    return report
+
+def run(args) -> Dict[str, Any]:
+    rows = category_rows(args.scale, args.vgsales_csv, args.videogames_csv)
+    logger.info(f"{len(rows)} filas de categorías (escala {args.scale})")
+
+    legacy, legacy_memory = measure_memory(lambda: build_legacy(rows))
+    catalog, compact_memory = measure_memory(lambda: build_compact(rows))
+
+    rng = np.random.default_rng(args.seed)
+    genres = list(legacy['maps']['genre'])
+    platforms = list(legacy['maps']['platform'])
+    pairs = [
+        (genres[g], platforms[p])
+        for g, p in zip(rng.integers(0, len(genres), args.pairs), rng.integers(0, len(platforms), args.pairs))
+    ] if genres and platforms else []
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': sys.version.split()[0],
+            'scale': args.scale,
+            'rows': len(rows),
+            'games': catalog.game_count
+        },
+        'categoryMaps': {
+            'sets': legacy_memory,
+            'compact': {**compact_memory, **catalog.memory_usage()},
+            'retainedRatio': round(compact_memory['retainedBytes'] / max(legacy_memory['retainedBytes'], 1), 4)
+        },
+        'intersections': time_intersections(legacy, catalog, pairs),
+        'objects': object_benchmarks(args.objects)
+    }
+    logger.info(f"Mapas de categorías: {report['categoryMaps']}")
+    logger.info(f"Intersecciones: {report['intersections']}")
+    for label, result in report['objects'].items():
+        logger.info(f"{label}: {result}")
+    return report
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Memoria de los mapas de categorías y de los modelos de resultados')
+    parser.add_argument('--scale', type=int, default=1, help='Veces que se replica el catálogo de los CSV')
+    parser.add_argument('--objects', type=int, default=100000, help='Resultados creados por variante de modelo')
+    parser.add_argument('--pairs', type=int, default=2000, help='Intersecciones género x plataforma medidas')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--vgsales-csv', default=None)
+    parser.add_argument('--videogames-csv', default=None)
+    parser.add_argument('--output', default='memory-results.json')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', force=True)
+    logger.setLevel(logging.INFO)
+
+    report = run(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    logger.info(f"Resultados escritos en {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Benchmarks de los servicios y de los endpoints /api/* sobre un grafo
+sintético y el backend sustituto en proceso (sin Neo4j):
+
+    python -m benchmarks.run --users 10000 --like-edges 100000 --output bench.json
+    python -m benchmarks.run --baseline bench.json --output bench-new.json
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import numpy as np
+from config import Config
+from benchmarks.stand_in import StandInBackend
+from benchmarks.synthetic_graph import generate_graph, load_catalog
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+
+def measure(function: Callable[[Any], Any], inputs: Sequence[Any], warmup: int = 5) -> Dict[str, float]:
+    """Ejecuta `function` con cada entrada y resume latencias y throughput"""
+    for value in inputs[:warmup]:
+        function(value)
+
+    latencies = np.empty(len(inputs), dtype=np.float64)
+    started = time.perf_counter()
+    for position, value in enumerate(inputs):
+        call_started = time.perf_counter()
+        function(value)
+        latencies[position] = time.perf_counter() - call_started
+    elapsed = time.perf_counter() - started
+
+    latencies *= 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(inputs) else (0.0, 0.0, 0.0)
+    return {
+        'calls': len(inputs),
+        'throughputPerSecond': round(len(inputs) / elapsed, 3) if elapsed > 0 else 0.0,
+        'meanMs': round(float(latencies.mean()), 4) if len(inputs) else 0.0,
+        'p50Ms': round(float(p50), 4),
+        'p95Ms': round(float(p95), 4),
+        'p99Ms': round(float(p99), 4),
+        'maxMs': round(float(latencies.max()), 4) if len(inputs) else 0.0
+    }
+
+def benchmark_config(collaborative_mode: str):
+    """Config sin refrescos en segundo plano ni verificación de esquema"""
+    class BenchmarkConfig(Config):
+        SCHEMA_BOOTSTRAP_ENABLED = False
+        CATEGORY_REFRESH_INTERVAL = 0
+        CATEGORY_SNAPSHOT_PATH = ''
+        SIMILARITY_REFRESH_INTERVAL = 0
+        GRAPH_ENGINE_ENABLED = collaborative_mode == 'graph'
+        CACHE_ENABLED = False
+        TRACING_ENABLED = False
+    return BenchmarkConfig
+
+def start_services(app_module, backend: StandInBackend, config, latency_ms: float, collaborative_mode: str):
+    """
+    Sustituye el contenedor de app.py por uno que usa el backend en
+    proceso y espera a que terminen la carga de índices y la primera
+    construcción de los índices colaborativos.
+    """
+    from service_container import ServiceContainer
+
+    services = ServiceContainer(
+        config,
+        vgsales_connection=backend.connection('vgsales', latency_ms),
+        videogames_connection=backend.connection('videogames', latency_ms)
+    )
+    services.start_warmup()
+    if not services.wait_until_ready():
+        raise RuntimeError(f"No se pudieron iniciar los servicios: {services.readiness()['error']}")
+
+    refresher = services.collaborative_refresher
+    if refresher is not None:
+        refresher.stop()
+
+    if collaborative_mode == 'cypher':
+        services.collaborative_recommender.similarity_index = None
+
+    app_module.services = services
+    app_module.recommendation_cache = None
+    return services
+
+def sample(values: Sequence[Any], count: int, rng: np.random.Generator) -> List[Any]:
+    return [values[index] for index in rng.integers(0, len(values), size=count)] if values else []
+
+def service_benchmarks(services, user_ids, game_names, queries, iterations) -> Dict[str, Tuple[Callable[[Any], Any], List[Any]]]:
+    personal = services.personal_recommender
+    collaborative = services.collaborative_recommender
+    batches = max(iterations // BATCH_SIZE, 1)
+    user_batches = [user_ids[i * BATCH_SIZE:(i + 1) * BATCH_SIZE] for i in range(batches)]
+    game_batches = [game_names[i * BATCH_SIZE:(i + 1) * BATCH_SIZE] for i in range(batches)]
+    return {
+        'PersonalRecommenderService.recommend_games_by_game':
+            (lambda name: personal.recommend_games_by_game(name, 10), game_names),
+        'PersonalRecommenderService.recommend_games_by_user_preferences':
+            (lambda user_id: personal.recommend_games_by_user_preferences(user_id, 10), user_ids),
+        'PersonalRecommenderService.search_games':
+            (lambda query: personal.search_games(query, Config.SEARCH_RESULT_LIMIT), queries),
+        'PersonalRecommenderService.recommend_games_by_game_batch':
+            (lambda names: personal.recommend_games_by_game_batch(names, 10), game_batches),
+        'PersonalRecommenderService.recommend_games_by_user_preferences_batch':
+            (lambda ids: personal.recommend_games_by_user_preferences_batch(ids, 10), user_batches),
+        'CollaborativeRecommenderService.recommend_games_by_friends':
+            (lambda user_id: collaborative.recommend_games_by_friends(user_id, 10), user_ids),
+        'CollaborativeRecommenderService.recommend_games_by_similar_users':
+            (lambda user_id: collaborative.recommend_games_by_similar_users(user_id, 10), user_ids),
+        'CollaborativeRecommenderService.recommend_games_by_friends_batch':
+            (lambda ids: collaborative.recommend_games_by_friends_batch(ids, 10), user_batches),
+        'CollaborativeRecommenderService.recommend_games_by_similar_users_batch':
+            (lambda ids: collaborative.recommend_games_by_similar_users_batch(ids, 10), user_batches),
+        'HybridRecommenderService.recommend':
+            (lambda user_id: services.hybrid_recommender.recommend(user_id, 10), user_ids)
+    }
+
+def endpoint_benchmarks(client, user_ids, game_names, queries, iterations) -> Dict[str, Tuple[Callable[[Any], Any], List[Any]]]:
+    def post(path, payload):
+        response = client.post(path, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} devolvió {response.status_code}: {response.get_data(as_text=True)}")
+        return response
+
+    def get(path, params):
+        response = client.get(path, query_string=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} devolvió {response.status_code}: {response.get_data(as_text=True)}")
+        return response
+
+    batches = max(iterations // BATCH_SIZE, 1)
+    user_batches = [user_ids[i * BATCH_SIZE:(i + 1) * BATCH_SIZE] for i in range(batches)]
+    return {
+        'POST /api/recommend/by-game':
+            (lambda name: post('/api/recommend/by-game', {'gameName': name}), game_names),
+        'POST /api/recommend/by-preferences':
+            (lambda user_id: post('/api/recommend/by-preferences', {'userId': user_id}), user_ids),
+        'POST /api/recommend/by-friends':
+            (lambda user_id: post('/api/recommend/by-friends', {'userId': user_id}), user_ids),
+        'POST /api/recommend/by-similar-users':
+            (lambda user_id: post('/api/recommend/by-similar-users', {'userId': user_id}), user_ids),
+        'POST /api/recommend/hybrid':
+            (lambda user_id: post('/api/recommend/hybrid', {'userId': user_id}), user_ids),
+        'POST /api/recommend/batch':
+            (lambda ids: post('/api/recommend/batch', {'type': 'by-friends', 'ids': ids}), user_batches),
+        'GET /api/games/search':
+            (lambda query: get('/api/games/search', {'q': query}), queries),
+        'GET /api/ready':
+            (lambda _: get('/api/ready', {}), list(range(iterations)))
+    }
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """Benchmarks cuyo p95 sube o cuyo throughput baja más que `tolerance`"""
+    regressions = []
+    for section in ('services', 'endpoints'):
+        for name, result in current.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if not previous:
+                continue
+            if previous['p95Ms'] > 0 and result['p95Ms'] > previous['p95Ms'] * (1 + tolerance):
+                regressions.append(f"{name}: p95 {previous['p95Ms']} ms -> {result['p95Ms']} ms")
+            if result['throughputPerSecond'] < previous['throughputPerSecond'] * (1 - tolerance):
+                regressions.append(
+                    f"{name}: throughput {previous['throughputPerSecond']}/s -> {result['throughputPerSecond']}/s"
+                )
+    return regressions
+
+def run(args) -> Dict[str, Any]:
+    import app as app_module
+
+    catalog = load_catalog(args.vgsales_csv, args.videogames_csv)
+    graph = generate_graph(
+        catalog, args.users, args.friend_edges, args.like_edges, args.played_edges,
+        seed=args.seed, popularity_skew=args.popularity_skew
+    )
+    backend = StandInBackend(graph)
+    services = start_services(
+        app_module, backend, benchmark_config(args.collaborative_mode), args.latency_ms, args.collaborative_mode
+    )
+
+    rng = np.random.default_rng(args.seed)
+    user_ids = sample(graph.user_ids, args.iterations, rng)
+    game_names = sample(catalog.vgsales_titles, args.iterations, rng)
+    # Prefijos de títulos reales; el endpoint exige al menos 2 caracteres
+    queries = [
+        prefix if len(prefix.strip()) >= 2 else name
+        for name, prefix in (
+            (name, name[:int(length)])
+            for name, length in zip(sample(catalog.vgsales_titles, args.iterations, rng),
+                                    rng.integers(2, 8, size=args.iterations))
+        )
+    ]
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'iterations': args.iterations,
+            'latencyMs': args.latency_ms,
+            'collaborativeMode': args.collaborative_mode,
+            'graph': graph.summary(),
+            'graphParameters': graph.parameters
+        },
+        'services': {},
+        'endpoints': {}
+    }
+
+    for name, (function, inputs) in service_benchmarks(services, user_ids, game_names, queries, args.iterations).items():
+        report['services'][name] = measure(function, inputs, args.warmup)
+        logger.info(f"{name}: {report['services'][name]}")
+
+    client = app_module.app.test_client()
+    for name, (function, inputs) in endpoint_benchmarks(client, user_ids, game_names, queries, args.iterations).items():
+        report['endpoints'][name] = measure(function, inputs, args.warmup)
+        logger.info(f"{name}: {report['endpoints'][name]}")
+
+    services.close()
+    return report
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks del recomendador con un grafo sintético y un backend en proceso')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--friend-edges', type=int, default=50000)
+    parser.add_argument('--like-edges', type=int, default=100000)
+    parser.add_argument('--played-edges', type=int, default=None, help='Por defecto, tantas como LIKES')
+    parser.add_argument('--popularity-skew', type=float, default=1.1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Latencia simulada por consulta')
+    parser.add_argument('--collaborative-mode', choices=['cypher', 'index', 'graph'], default='index',
+                        help='cypher: plantillas Cypher; index: índice item-item; graph: grafo social en memoria')
+    parser.add_argument('--vgsales-csv', default=None)
+    parser.add_argument('--videogames-csv', default=None)
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', default=None, help='Resultados previos para detectar regresiones')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    parser.add_argument('--log-level', default='WARNING', help='Nivel de log de los servicios medidos')
+    args = parser.parse_args(argv)
+
+    # Los servicios registran una línea por recomendación; se silencian
+    # por defecto para no medir el coste del logging
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', force=True)
+    logger.setLevel(logging.INFO)
+
+    report = run(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    logger.info(f"Resultados escritos en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_reports(json.load(f), report, args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regresión: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
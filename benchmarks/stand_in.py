@@ -0,0 +1,244 @@
+from typing import Any, Callable, Dict, List, Optional
+from collections import defaultdict
+import logging
+import time
+import numpy as np
+from benchmarks.synthetic_graph import SyntheticGraph
+from game_registry import canonical_title
+from metrics import template_name
+from social_graph import SocialGraph, _csr
+
+logger = logging.getLogger(__name__)
+
+def _social_graph(graph: SyntheticGraph) -> SocialGraph:
+    """
+    SocialGraph construido directamente desde los arreglos del generador.
+    Los juegos se renumeran en orden alfabético, como en SocialGraph.build,
+    para que el desempate coincida con el ORDER BY gameName de Cypher.
+    """
+    titles = graph.catalog.vgsales_titles
+    order = sorted(range(len(titles)), key=titles.__getitem__)
+    rank = np.empty(len(titles), dtype=np.int32)
+    rank[order] = np.arange(len(titles), dtype=np.int32)
+
+    users = len(graph.user_ids)
+    games = len(titles)
+    likes = graph.like_edges
+    played = graph.played_edges
+    return SocialGraph(list(graph.user_ids), [titles[index] for index in order], {
+        'friends': _csr(graph.friend_edges[:, 0], graph.friend_edges[:, 1], users),
+        'likes': _csr(likes[:, 0], rank[likes[:, 1]], users),
+        'likers': _csr(rank[likes[:, 1]], likes[:, 0], games),
+        'played': _csr(played[:, 0], rank[played[:, 1]], users)
+    })
+
+class StandInBackend:
+    """
+    Implementación en proceso de las plantillas de queries.py sobre un
+    SyntheticGraph. Resuelve cada consulta por el nombre de su plantilla
+    y reproduce sus columnas y su semántica, sin pasar por Cypher.
+    """
+
+    def __init__(self, graph: SyntheticGraph):
+        self.graph = graph
+        catalog = graph.catalog
+        self.social = _social_graph(graph)
+        self.vgsales_ids = {name: index for index, name in enumerate(catalog.vgsales_titles)}
+        self.videogames_ids = {name: index for index, name in enumerate(catalog.videogames_titles)}
+
+        # Los usuarios de videogames reflejan sus LIKES/PLAYED sobre el
+        # Videojuego con el mismo título canónico, si existe
+        videogames_by_title = {}
+        for name in catalog.videogames_titles:
+            videogames_by_title.setdefault(canonical_title(name), name)
+        self.videogames_for = [videogames_by_title.get(canonical_title(name)) for name in catalog.vgsales_titles]
+
+        self.likes_by_user = self._group(graph.like_edges)
+        self.played_by_user = self._group(graph.played_edges)
+
+    @staticmethod
+    def _group(edges: np.ndarray) -> Dict[int, List[int]]:
+        grouped = defaultdict(list)
+        for user, game in edges.tolist():
+            grouped[user].append(game)
+        return grouped
+
+    def connection(self, source: str, latency_ms: float = 0.0) -> 'StandInConnection':
+        handlers = self._vgsales_handlers() if source == 'vgsales' else self._videogames_handlers()
+        return StandInConnection(source, handlers, latency_ms)
+
+    # Índice de categorías
+
+    def _category_rows(self, titles: List[str], attributes: Dict[str, set], column: str, watermark: int):
+        return [
+            {'gameId': index, 'gameName': name, column: value}
+            for index, name in enumerate(titles) if index > watermark
+            for value in sorted(attributes.get(name, ()))
+        ]
+
+    def _title_rows(self, titles: List[str], watermark: int):
+        return [{'gameId': index, 'gameName': name} for index, name in enumerate(titles) if index > watermark]
+
+    # Resolución de juegos
+
+    def _attribute_rows(self, name: str, relations: List[tuple]) -> List[Dict[str, Any]]:
+        return [
+            {'relationType': relation, 'labels': [label], 'attr': {'name': value}}
+            for relation, label, attributes in relations
+            for value in sorted(attributes.get(name, ()))
+        ]
+
+    def _batch_attribute_rows(self, names: List[str], known: Dict[str, int], relations: List[tuple]):
+        rows = []
+        for name in names:
+            if name not in known:
+                continue
+            game_rows = self._attribute_rows(name, relations)
+            if not game_rows:
+                # OPTIONAL MATCH sin atributos devuelve una fila con nulos
+                rows.append({'name': name, 'labels': None, 'attr': None})
+            for row in game_rows:
+                rows.append({'name': name, 'labels': row['labels'], 'attr': row['attr']})
+        return rows
+
+    # Perfiles
+
+    def _profile_rows(self, user_ids: List[str], titles_for: Callable[[int], Optional[str]],
+                      genres: Dict[str, set], platforms: Optional[Dict[str, set]]):
+        rows = []
+        for user_id in user_ids:
+            user = self.social.user_ids.get(user_id)
+            if user is None:
+                continue
+            liked = {titles_for(game) for game in self.likes_by_user.get(user, ())} - {None}
+            played = {titles_for(game) for game in self.played_by_user.get(user, ())} - {None}
+            if not liked and not played:
+                continue
+            rows.append({
+                'userId': user_id,
+                'likedGames': sorted(liked),
+                'playedGames': sorted(played),
+                'genres': [sorted(genres.get(name, ())) for name in sorted(liked)],
+                'platforms': [sorted(platforms.get(name, ())) for name in sorted(liked)] if platforms is not None else []
+            })
+        return rows
+
+    # Recomendación colaborativa
+
+    def _friend_games(self, user_id: str, parameters: Dict[str, Any]):
+        return [
+            {'gameName': name, 'score': score}
+            for name, score in self.social.friend_scores(
+                user_id, parameters['limit'], parameters['friendLimit'], parameters['friendOfFriendWeight']
+            )
+        ]
+
+    def _similar_games(self, user_id: str, limit: Optional[int] = None):
+        limit = len(self.social.game_names) if limit is None else limit
+        return [
+            {'gameName': name, 'score': int(score)}
+            for name, score in self.social.similar_user_scores(user_id, limit)
+        ]
+
+    def _batch(self, user_ids: List[str], games_for: Callable[[str], List[Dict[str, Any]]]):
+        rows = []
+        for user_id in user_ids:
+            games = games_for(user_id)
+            if games:
+                rows.append({'userId': user_id, 'games': games})
+        return rows
+
+    def _edge_rows(self, edges: np.ndarray, target_column: str, target_names: List[str]):
+        users = self.graph.user_ids
+        return [{'userId': users[source], target_column: target_names[target]} for source, target in edges.tolist()]
+
+    def _vgsales_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], List[Dict[str, Any]]]]:
+        catalog = self.graph.catalog
+        titles = catalog.vgsales_titles
+        relations = [('BELONGS_TO_GENRE', 'Genre', catalog.genres), ('AVAILABLE_ON', 'Platform', catalog.platforms)]
+        return {
+            'VGSALES_GENRES_QUERY': lambda p: self._category_rows(titles, catalog.genres, 'genreName', p['watermark']),
+            'VGSALES_PLATFORMS_QUERY': lambda p: self._category_rows(titles, catalog.platforms, 'platformName', p['watermark']),
+            'VGSALES_TITLES_QUERY': lambda p: self._title_rows(titles, p['watermark']),
+            'VGSALES_FINGERPRINT_QUERY': lambda p: [{
+                'games': len(titles),
+                'genreEdges': sum(len(values) for values in catalog.genres.values()),
+                'platformEdges': sum(len(values) for values in catalog.platforms.values())
+            }],
+            'VGSALES_FIND_GAME_QUERY': lambda p: [{'game': {'Name': p['name']}}] if p['name'] in self.vgsales_ids else [],
+            'VGSALES_GAME_ATTRIBUTES_QUERY': lambda p: self._attribute_rows(p['name'], relations) if p['name'] in self.vgsales_ids else [],
+            'VGSALES_BATCH_GAME_ATTRIBUTES_QUERY': lambda p: self._batch_attribute_rows(p['names'], self.vgsales_ids, relations),
+            'VGSALES_USER_PROFILE_QUERY': lambda p: self._profile_rows(p['userIds'], titles.__getitem__, catalog.genres, catalog.platforms),
+            'FRIENDS_WEIGHTED_QUERY': lambda p: self._friend_games(p['userId'], p),
+            'BATCH_FRIENDS_WEIGHTED_QUERY': lambda p: self._batch(p['userIds'], lambda user_id: self._friend_games(user_id, p)),
+            'SIMILAR_USERS_QUERY': lambda p: self._similar_games(p['userId']),
+            'BATCH_SIMILAR_USERS_QUERY': lambda p: self._batch(p['userIds'], lambda user_id: self._similar_games(user_id, p['limit'])),
+            'LIKES_EDGES_QUERY': lambda p: self._edge_rows(self.graph.like_edges, 'gameName', titles),
+            'PLAYED_EDGES_QUERY': lambda p: self._edge_rows(self.graph.played_edges, 'gameName', titles),
+            'FRIENDS_EDGES_QUERY': lambda p: self._edge_rows(self.graph.friend_edges, 'friendId', self.graph.user_ids)
+        }
+
+    def _videogames_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], List[Dict[str, Any]]]]:
+        catalog = self.graph.catalog
+        titles = catalog.videogames_titles
+        relations = [('BELONGS_TO_GENRE', 'Genre', catalog.videogames_genres), ('DEVELOPED_BY', 'Developer', catalog.developers)]
+        return {
+            'VIDEOGAMES_DEVELOPERS_QUERY': lambda p: self._category_rows(titles, catalog.developers, 'developerName', p['watermark']),
+            'VIDEOGAMES_TITLES_QUERY': lambda p: self._title_rows(titles, p['watermark']),
+            'VIDEOGAMES_FINGERPRINT_QUERY': lambda p: [{
+                'games': len(titles),
+                'developerEdges': sum(len(values) for values in catalog.developers.values())
+            }],
+            'VIDEOGAMES_FIND_GAME_QUERY': lambda p: [{'game': {'nombre': p['name']}}] if p['name'] in self.videogames_ids else [],
+            'VIDEOGAMES_GAME_ATTRIBUTES_QUERY': lambda p: self._attribute_rows(p['name'], relations) if p['name'] in self.videogames_ids else [],
+            'VIDEOGAMES_BATCH_GAME_ATTRIBUTES_QUERY': lambda p: self._batch_attribute_rows(p['names'], self.videogames_ids, relations),
+            'VIDEOGAMES_USER_PROFILE_QUERY': lambda p: self._profile_rows(p['userIds'], self.videogames_for.__getitem__, catalog.videogames_genres, None)
+        }
+
+class StandInConnection:
+    """
+    Sustituto de Neo4jConnectionManager: mismo contrato de execute_query
+    (lista de diccionarios), con una latencia de red simulada opcional.
+    Las sentencias de esquema se aceptan sin efecto y EXPLAIN no devuelve plan.
+    """
+
+    def __init__(self, name: str, handlers: Dict[str, Callable[[Dict[str, Any]], List[Dict[str, Any]]]],
+                 latency_ms: float = 0.0):
+        self.name = name
+        self.handlers = handlers
+        self.latency_ms = latency_ms
+        self.calls: Dict[str, int] = defaultdict(int)
+
+    def execute_query(self, query, parameters=None, timeout: Optional[float] = None):
+        template = template_name(query)
+        handler = self.handlers.get(template)
+        if handler is None:
+            raise ValueError(f"Plantilla no soportada por el backend sustituto ({self.name}): {template}")
+
+        self.calls[template] += 1
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+        return handler(parameters or {})
+
+    execute_read = execute_query
+
+    def stream_query(self, query, parameters=None, fetch_size: Optional[int] = None, timeout: Optional[float] = None):
+        return iter(self.execute_query(query, parameters, timeout))
+
+    def execute_write(self, query, parameters=None, timeout: Optional[float] = None):
+        return []
+
+    def execute_write_transaction(self, query, parameters=None):
+        return []
+
+    def explain(self, query, parameters=None):
+        return None
+
+    def test_connection(self):
+        return True
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {'name': self.name, 'uri': 'stand-in', 'transactions': dict(self.calls), 'connections': {}}
+
+    def close(self):
+        pass
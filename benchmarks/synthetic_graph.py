@@ -0,0 +1,141 @@
+from typing import Dict, List, Optional, Set
+from collections import defaultdict
+from dataclasses import dataclass, field
+import logging
+import os
+import numpy as np
+from bulk_loader import DATASETS, stream_rows
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@dataclass
+class Catalog:
+    """Catálogo real de ambas bases de datos, con el mismo modelo que bulk_loader"""
+    vgsales_titles: List[str]
+    genres: Dict[str, Set[str]]
+    platforms: Dict[str, Set[str]]
+    videogames_titles: List[str]
+    videogames_genres: Dict[str, Set[str]]
+    developers: Dict[str, Set[str]]
+
+def load_catalog(vgsales_path: Optional[str] = None, videogames_path: Optional[str] = None) -> Catalog:
+    """Lee vgsales.csv y video_games.csv; un nodo por título como en la carga masiva"""
+    vgsales_path = vgsales_path or os.path.join(REPO_ROOT, DATASETS['vgsales'].default_csv)
+    videogames_path = videogames_path or os.path.join(REPO_ROOT, DATASETS['videogames'].default_csv)
+
+    genres = defaultdict(set)
+    platforms = defaultdict(set)
+    vgsales_titles = {}
+    for row in stream_rows(vgsales_path, DATASETS['vgsales']):
+        vgsales_titles.setdefault(row['name'], None)
+        if row['genre']:
+            genres[row['name']].add(row['genre'])
+        if row['platform']:
+            platforms[row['name']].add(row['platform'])
+
+    videogames_genres = defaultdict(set)
+    developers = defaultdict(set)
+    videogames_titles = {}
+    for row in stream_rows(videogames_path, DATASETS['videogames']):
+        videogames_titles.setdefault(row['name'], None)
+        videogames_genres[row['name']].update(row['genres'])
+        developers[row['name']].update(row['developers'])
+
+    return Catalog(
+        vgsales_titles=list(vgsales_titles),
+        genres=dict(genres),
+        platforms=dict(platforms),
+        videogames_titles=list(videogames_titles),
+        videogames_genres=dict(videogames_genres),
+        developers=dict(developers)
+    )
+
+@dataclass
+class SyntheticGraph:
+    """
+    Usuarios y aristas sintéticas sobre el catálogo real. Las aristas son
+    arreglos (origen, destino) de índices: usuarios en `user_ids` y juegos
+    en `catalog.vgsales_titles`, igual que LIKES/PLAYED apuntan a VideoGame.
+    """
+    catalog: Catalog
+    user_ids: List[str]
+    friend_edges: np.ndarray
+    like_edges: np.ndarray
+    played_edges: np.ndarray
+    seed: int
+    parameters: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'users': len(self.user_ids),
+            'vgsalesGames': len(self.catalog.vgsales_titles),
+            'videogamesGames': len(self.catalog.videogames_titles),
+            'friendEdges': int(len(self.friend_edges)),
+            'likeEdges': int(len(self.like_edges)),
+            'playedEdges': int(len(self.played_edges))
+        }
+
+def _unique_pairs(sources: np.ndarray, targets: np.ndarray, target_count: int) -> np.ndarray:
+    keys = np.unique(sources.astype(np.int64) * target_count + targets)
+    return np.stack([keys // target_count, keys % target_count], axis=1).astype(np.int32)
+
+def _zipf_weights(count: int, skew: float, rng: np.random.Generator) -> np.ndarray:
+    """Pesos de popularidad tipo Zipf asignados a posiciones aleatorias"""
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+def generate_graph(catalog: Catalog, users: int, friend_edges: int, like_edges: int,
+                   played_edges: Optional[int] = None, seed: int = 42,
+                   popularity_skew: float = 1.1, activity_sigma: float = 1.0) -> SyntheticGraph:
+    """
+    Genera un grafo social reproducible para una semilla dada. La
+    popularidad de los juegos sigue una Zipf y la actividad de los
+    usuarios una lognormal, así que hay juegos y usuarios muy conectados
+    como en datos reales. Las aristas duplicadas se descartan, por lo que
+    los totales pueden quedar algo por debajo de lo pedido.
+    """
+    rng = np.random.default_rng(seed)
+    game_count = len(catalog.vgsales_titles)
+    played_edges = like_edges if played_edges is None else played_edges
+
+    # IDs con ancho fijo: el orden alfabético coincide con el índice
+    width = len(str(max(users - 1, 0)))
+    user_ids = [f'user{index:0{width}d}' for index in range(users)]
+
+    activity = rng.lognormal(0.0, activity_sigma, users)
+    activity /= activity.sum()
+    popularity = _zipf_weights(game_count, popularity_skew, rng)
+
+    # FRIENDS_WITH se guarda en ambos sentidos, como una amistad mutua
+    half = max(friend_edges // 2, 0)
+    sources = rng.choice(users, size=half, p=activity)
+    targets = rng.choice(users, size=half, p=activity)
+    keep = sources != targets
+    sources, targets = sources[keep], targets[keep]
+    friends = _unique_pairs(np.concatenate([sources, targets]), np.concatenate([targets, sources]), users)
+
+    likes = _unique_pairs(
+        rng.choice(users, size=like_edges, p=activity),
+        rng.choice(game_count, size=like_edges, p=popularity),
+        game_count
+    )
+    played = _unique_pairs(
+        rng.choice(users, size=played_edges, p=activity),
+        rng.choice(game_count, size=played_edges, p=popularity),
+        game_count
+    )
+
+    graph = SyntheticGraph(
+        catalog=catalog,
+        user_ids=user_ids,
+        friend_edges=friends,
+        like_edges=likes,
+        played_edges=played,
+        seed=seed,
+        parameters={'popularitySkew': popularity_skew, 'activitySigma': activity_sigma}
+    )
+    logger.info(f"Grafo sintético generado: {graph.summary()}")
+    return graph
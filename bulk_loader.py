@@ -0,0 +1,410 @@
+"""
+Carga masiva de vgsales.csv y video_games.csv en Neo4j con lotes UNWIND.
+
+    python bulk_loader.py all --batch-size 1000 --workers 4
+    python bulk_loader.py vgsales --csv vgsales.csv --no-resume
+
+Cada CSV se lee en streaming y se carga en tres fases:
+
+1. Las categorías (pocas y compartidas por muchos juegos) se crean en una
+   sola transacción.
+2. Los nodos de juego y sus propiedades se cargan en paralelo, repartidos
+   en particiones por hash del título: dos hilos nunca escriben el mismo
+   nodo.
+3. Las relaciones con las categorías se crean en una sola pasada
+   secuencial. Crear una relación bloquea sus dos extremos, así que lotes
+   concurrentes se serializarían sobre los mismos nodos de género,
+   plataforma o desarrollador y acabarían en reintentos por DeadlockDetected.
+
+El progreso de cada partición y de la pasada de relaciones se guarda en un
+checkpoint para reanudar tras un fallo; MERGE hace que repetir un lote no
+confirmado sea seguro.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import argparse
+import csv
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from config import Config
+from metrics import register_templates
+from neo4j_connection import Neo4jConnectionManager, pool_settings
+from schema_bootstrap import SchemaBootstrap
+
+logger = logging.getLogger(__name__)
+
+MERGE_GENRES_QUERY = "UNWIND $names AS name MERGE (:Genre {name: name})"
+MERGE_PLATFORMS_QUERY = "UNWIND $names AS name MERGE (:Platform {name: name})"
+MERGE_DEVELOPERS_QUERY = "UNWIND $names AS name MERGE (:Developer {name: name})"
+
+# Fase paralela: solo nodos de juego, disjuntos entre particiones
+LOAD_VGSALES_QUERY = """
+UNWIND $rows AS row
+MERGE (game:VideoGame {Name: row.name})
+SET game.Publisher = row.publisher
+"""
+
+LOAD_VIDEOGAMES_QUERY = """
+UNWIND $rows AS row
+MERGE (game:Videojuego {nombre: row.name})
+SET game += row.properties
+"""
+
+# Fase secuencial: relaciones con los nodos de categoría compartidos. Los
+# datos por plataforma (año y ventas) van en la relación AVAILABLE_ON, ya
+# que un mismo título aparece una vez por plataforma en vgsales.csv
+LINK_VGSALES_QUERY = """
+UNWIND $rows AS row
+MATCH (game:VideoGame {Name: row.name})
+CALL {
+    WITH game, row
+    MATCH (genre:Genre {name: row.genre})
+    MERGE (game)-[:BELONGS_TO_GENRE]->(genre)
+}
+CALL {
+    WITH game, row
+    MATCH (platform:Platform {name: row.platform})
+    MERGE (game)-[available:AVAILABLE_ON]->(platform)
+    SET available += row.sales
+}
+"""
+
+LINK_VIDEOGAMES_QUERY = """
+UNWIND $rows AS row
+MATCH (game:Videojuego {nombre: row.name})
+CALL {
+    WITH game, row
+    UNWIND row.genres AS genreName
+    MATCH (genre:Genre {name: genreName})
+    MERGE (game)-[:BELONGS_TO_GENRE]->(genre)
+}
+CALL {
+    WITH game, row
+    UNWIND row.developers AS developerName
+    MATCH (developer:Developer {name: developerName})
+    MERGE (game)-[:DEVELOPED_BY]->(developer)
+}
+"""
+
+register_templates(globals())
+
+def _to_int(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _split(value: str) -> List[str]:
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+def normalize_vgsales_row(row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    name = (row.get('Title') or '').strip()
+    if not name:
+        return None
+
+    sales = {
+        'Year': _to_int(row.get('Year')),
+        'NA_Sales': _to_float(row.get('NA_Sales')),
+        'EU_Sales': _to_float(row.get('EU_Sales')),
+        'JP_Sales': _to_float(row.get('JP_Sales')),
+        'Other_Sales': _to_float(row.get('Other_Sales')),
+        'Global_Sales': _to_float(row.get('Global_Sales'))
+    }
+    return {
+        'name': name,
+        'genre': (row.get('Genre') or '').strip() or None,
+        'platform': (row.get('Platform') or '').strip() or None,
+        'publisher': (row.get('Publisher') or '').strip() or None,
+        'sales': {key: value for key, value in sales.items() if value is not None}
+    }
+
+def normalize_videogames_row(row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    name = (row.get('Title') or '').strip()
+    if not name:
+        return None
+
+    properties = {
+        'consola': (row.get('Release.Console') or '').strip() or None,
+        'anio': _to_int(row.get('Release.Year')),
+        'clasificacion': (row.get('Release.Rating') or '').strip() or None,
+        'puntuacion': _to_int(row.get('Metrics.Review Score')),
+        'ventas': _to_float(row.get('Metrics.Sales'))
+    }
+    return {
+        'name': name,
+        'genres': _split(row.get('Metadata.Genres')),
+        # El CSV no trae desarrolladores; las editoras son lo más cercano
+        'developers': _split(row.get('Metadata.Publishers')),
+        'properties': {key: value for key, value in properties.items() if value is not None}
+    }
+
+@dataclass
+class Dataset:
+    name: str
+    default_csv: str
+    normalize: Callable[[Dict[str, str]], Optional[Dict[str, Any]]]
+    categories: Callable[[Dict[str, Any]], Dict[str, Iterable[str]]]
+    load_query: str
+    link_query: str
+
+DATASETS = {
+    'vgsales': Dataset(
+        name='vgsales',
+        default_csv='vgsales.csv',
+        normalize=normalize_vgsales_row,
+        categories=lambda row: {'genre': [row['genre']] if row['genre'] else [],
+                                'platform': [row['platform']] if row['platform'] else []},
+        load_query=LOAD_VGSALES_QUERY,
+        link_query=LINK_VGSALES_QUERY
+    ),
+    'videogames': Dataset(
+        name='videogames',
+        default_csv='video_games.csv',
+        normalize=normalize_videogames_row,
+        categories=lambda row: {'genre': row['genres'], 'developer': row['developers']},
+        load_query=LOAD_VIDEOGAMES_QUERY,
+        link_query=LINK_VIDEOGAMES_QUERY
+    )
+}
+
+CATEGORY_QUERIES = {
+    'genre': MERGE_GENRES_QUERY,
+    'platform': MERGE_PLATFORMS_QUERY,
+    'developer': MERGE_DEVELOPERS_QUERY
+}
+
+def stream_rows(path: str, dataset: Dataset) -> Iterator[Dict[str, Any]]:
+    """Lee el CSV fila a fila y devuelve las filas normalizadas válidas"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        # vgsales.csv trae la cabecera 'Title ' con un espacio final
+        reader.fieldnames = [field.strip() for field in reader.fieldnames or []]
+        for row in reader:
+            normalized = dataset.normalize(row)
+            if normalized is not None:
+                yield normalized
+
+def partition_of(game_name: str, partitions: int) -> int:
+    """Partición estable de un título (independiente de PYTHONHASHSEED)"""
+    return zlib.crc32(game_name.encode('utf-8')) % partitions
+
+# Clave del checkpoint para la pasada secuencial de relaciones
+LINK_PHASE = 'relationships'
+
+class LoadCheckpoint:
+    """
+    Lotes confirmados por partición (y por la pasada de relaciones),
+    guardados en JSON tras cada lote. Solo es válido para el mismo archivo,
+    tamaño de lote y particiones.
+    """
+
+    def __init__(self, path: str, dataset: str, signature: Dict[str, Any], resume: bool = True):
+        self.path = path
+        self.dataset = dataset
+        self.signature = signature
+        self._lock = threading.Lock()
+        self._state = self._read() if resume else {}
+        entry = self._state.get(dataset, {})
+        self.committed: Dict[str, int] = entry.get('committed', {}) if entry.get('signature') == signature else {}
+
+    def _read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Checkpoint {self.path} ilegible, se empieza de cero: {e}")
+            return {}
+
+    def batches_done(self, partition) -> int:
+        return self.committed.get(str(partition), 0)
+
+    def mark(self, partition, batches: int):
+        with self._lock:
+            self.committed[str(partition)] = batches
+            self._state[self.dataset] = {'signature': self.signature, 'committed': self.committed}
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f)
+            os.replace(tmp_path, self.path)
+
+    def complete(self):
+        with self._lock:
+            self._state.pop(self.dataset, None)
+            if self._state:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump(self._state, f)
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+
+class BulkLoader:
+    """
+    Carga un dataset CSV en su base de datos con lotes UNWIND: los nodos de
+    juego en paralelo y las relaciones con las categorías con un solo escritor
+    """
+
+    def __init__(self, connection: Neo4jConnectionManager, batch_size: int = 1000, workers: int = 4,
+                 checkpoint_path: str = '.bulk_loader_checkpoint.json', resume: bool = True):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.checkpoint_path = checkpoint_path
+        self.resume = resume
+
+    def load(self, dataset: Dataset, path: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        stat = os.stat(path)
+        checkpoint = LoadCheckpoint(self.checkpoint_path, dataset.name, {
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime': int(stat.st_mtime),
+            'batchSize': self.batch_size,
+            'partitions': self.workers
+        }, resume=self.resume)
+
+        categories = self._load_categories(dataset, path)
+
+        totals = {'rows': 0, 'batches': 0, 'skippedBatches': 0, 'linkBatches': 0}
+        totals_lock = threading.Lock()
+
+        def load_batches(key, batches: Iterable[List[Dict[str, Any]]], query: str, counter: str):
+            done = checkpoint.batches_done(key)
+            batch_number = 0
+            for batch in batches:
+                batch_number += 1
+                if batch_number <= done:
+                    with totals_lock:
+                        totals['skippedBatches'] += 1
+                    continue
+
+                self.connection.execute_write(query, {'rows': batch})
+                checkpoint.mark(key, batch_number)
+
+                with totals_lock:
+                    totals[counter] += 1
+                    if counter == 'batches':
+                        totals['rows'] += len(batch)
+                    elapsed = time.perf_counter() - started
+                    logger.info(
+                        f"[{dataset.name}] {totals['rows']} filas en {totals['batches']} lotes, "
+                        f"{totals['linkBatches']} lotes de relaciones ({totals['rows'] / elapsed:.0f} filas/s)"
+                    )
+
+        # Nodos de juego: las particiones no comparten nodos, así que pueden ir en paralelo
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bulk-loader') as executor:
+            futures = [
+                executor.submit(
+                    load_batches, partition, self._partition_batches(dataset, path, partition),
+                    dataset.load_query, 'batches'
+                )
+                for partition in range(self.workers)
+            ]
+            for future in futures:
+                future.result()
+
+        # Relaciones: todas tocan los mismos nodos de categoría, así que un solo escritor
+        load_batches(LINK_PHASE, self._batches(stream_rows(path, dataset)), dataset.link_query, 'linkBatches')
+
+        checkpoint.complete()
+        elapsed = time.perf_counter() - started
+        report = {
+            'dataset': dataset.name,
+            'rows': totals['rows'],
+            'batches': totals['batches'],
+            'linkBatches': totals['linkBatches'],
+            'skippedBatches': totals['skippedBatches'],
+            'categories': categories,
+            'seconds': round(elapsed, 3),
+            'rowsPerSecond': round(totals['rows'] / elapsed, 1) if elapsed > 0 else None
+        }
+        logger.info(
+            f"[{dataset.name}] Carga completa: {report['rows']} filas, {report['batches']} lotes "
+            f"en {report['seconds']}s ({report['rowsPerSecond']} filas/s)"
+        )
+        return report
+
+    def _load_categories(self, dataset: Dataset, path: str) -> Dict[str, int]:
+        """Crea de una vez los nodos de categoría para que los lotes solo hagan MATCH"""
+        names: Dict[str, Set[str]] = {}
+        for row in stream_rows(path, dataset):
+            for category, values in dataset.categories(row).items():
+                names.setdefault(category, set()).update(values)
+
+        for category, values in names.items():
+            self.connection.execute_write(CATEGORY_QUERIES[category], {'names': sorted(values)})
+
+        return {category: len(values) for category, values in names.items()}
+
+    def _partition_batches(self, dataset: Dataset, path: str, partition: int) -> Iterator[List[Dict[str, Any]]]:
+        return self._batches(
+            row for row in stream_rows(path, dataset) if partition_of(row['name'], self.workers) == partition
+        )
+
+    def _batches(self, rows: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+def connection_for(dataset_name: str) -> Neo4jConnectionManager:
+    if dataset_name == 'vgsales':
+        return Neo4jConnectionManager(Config.VGSALES_URI, Config.VGSALES_USER, Config.VGSALES_PASSWORD,
+                                      name='vgsales', **pool_settings(Config))
+    return Neo4jConnectionManager(Config.VIDEOGAMES_URI, Config.VIDEOGAMES_USER, Config.VIDEOGAMES_PASSWORD,
+                                  name='videogames', **pool_settings(Config))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Carga masiva de los CSV de videojuegos en Neo4j')
+    parser.add_argument('dataset', choices=['vgsales', 'videogames', 'all'])
+    parser.add_argument('--csv', help='Ruta del CSV (solo con un dataset concreto)')
+    parser.add_argument('--batch-size', type=int, default=Config.BULK_LOAD_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=Config.BULK_LOAD_WORKERS)
+    parser.add_argument('--checkpoint', default=Config.BULK_LOAD_CHECKPOINT)
+    parser.add_argument('--no-resume', action='store_true', help='Ignora el checkpoint y carga todo de nuevo')
+    parser.add_argument('--skip-schema', action='store_true', help='No crea restricciones ni índices antes de cargar')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    names = ['vgsales', 'videogames'] if args.dataset == 'all' else [args.dataset]
+    connections = {name: connection_for(name) for name in names}
+    try:
+        if not args.skip_schema:
+            # Sin índices en los nombres, cada MERGE sería un escaneo por etiqueta
+            SchemaBootstrap(connections.get('vgsales'), connections.get('videogames')).apply_schema()
+
+        for name in names:
+            dataset = DATASETS[name]
+            loader = BulkLoader(
+                connections[name],
+                batch_size=args.batch_size,
+                workers=args.workers,
+                checkpoint_path=args.checkpoint,
+                resume=not args.no_resume
+            )
+            report = loader.load(dataset, args.csv if args.csv and len(names) == 1 else dataset.default_csv)
+            print(json.dumps(report, ensure_ascii=False))
+    finally:
+        for connection in connections.values():
+            connection.close()
+
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+from typing import Dict, Iterable, Mapping, Optional, Set
+import logging
+import sys
+import numpy as np
+from compact_catalog import CompactCatalog
+from game_registry import GameEntry, GameRegistry
+from scoring_engine import CategoryScoringEngine
+from search_index import GameSearchIndex
+
+logger = logging.getLogger(__name__)
+
+# tipo de atributo -> (base de datos de origen, columna con el nombre de la categoría)
+ATTRIBUTE_SOURCES = {
+    'genre': ('vgsales', 'genreName'),
+    'platform': ('vgsales', 'platformName'),
+    'developer': ('videogames', 'developerName')
+}
+
+class CategoryIndex:
+    """
+    Índice en memoria de categorías: un CompactCatalog con las listas de
+    juegos por categoría y los atributos de cada juego, el registro de
+    identidad de juegos y el motor de puntuación construido sobre ellos.
+    Una vez finalizado no se modifica; las actualizaciones construyen una
+    copia que luego se intercambia de forma atómica.
+    """
+
+    def __init__(self):
+        self.catalog = CompactCatalog(ATTRIBUTE_SOURCES)
+        self.titles: Dict[str, Set[str]] = {'vgsales': set(), 'videogames': set()}
+        self.watermarks: Dict[str, int] = {'vgsales': -1, 'videogames': -1}
+        self.registry: Optional[GameRegistry] = None
+        self.scoring_engine: Optional[CategoryScoringEngine] = None
+        self.search_index: Optional[GameSearchIndex] = None
+
+    @property
+    def genre_games_map(self) -> Mapping[str, Set[str]]:
+        return self.catalog.games_map('genre')
+
+    @property
+    def platform_games_map(self) -> Mapping[str, Set[str]]:
+        return self.catalog.games_map('platform')
+
+    @property
+    def developer_games_map(self) -> Mapping[str, Set[str]]:
+        return self.catalog.games_map('developer')
+
+    @property
+    def game_attributes_map(self) -> Mapping[str, Dict[str, str]]:
+        return self.catalog.attributes_map()
+
+    def add_genre(self, game_name: str, genre_name: str):
+        self.catalog.add('genre', game_name, genre_name)
+
+    def add_platform(self, game_name: str, platform_name: str):
+        self.catalog.add('platform', game_name, platform_name)
+
+    def add_developer(self, game_name: str, developer_name: str):
+        self.catalog.add('developer', game_name, developer_name)
+
+    def ingest(self, attribute_type: str, records: Iterable[Dict]):
+        """Añade filas (gameId, gameName, <categoría>) de una consulta de carga"""
+        source, name_key = ATTRIBUTE_SOURCES[attribute_type]
+        add = getattr(self, f'add_{attribute_type}')
+        for record in records:
+            add(record['gameName'], record[name_key])
+            self.advance_watermark(source, record['gameId'])
+
+    def add_title(self, source: str, game_name: str):
+        # Internado para compartir la cadena con la tabla de títulos del catálogo
+        self.titles[source].add(sys.intern(game_name))
+
+    def ingest_titles(self, source: str, records: Iterable[Dict]):
+        """Añade filas (gameId, gameName) de una consulta de títulos"""
+        for record in records:
+            self.add_title(source, record['gameName'])
+            self.advance_watermark(source, record['gameId'])
+
+    def advance_watermark(self, source: str, internal_id: Optional[int]):
+        """
+        Actualiza el ID interno más alto visto para una base de datos. No es
+        una marca monotónica fiable (IDs reutilizados, lecturas en momentos
+        distintos): la corrección depende de las reconstrucciones completas.
+        """
+        if internal_id is not None and internal_id > self.watermarks[source]:
+            self.watermarks[source] = internal_id
+
+    def copy(self) -> 'CategoryIndex':
+        """Crea una copia independiente para aplicar cambios incrementales"""
+        clone = CategoryIndex()
+        clone.catalog = self.catalog.copy()
+        clone.titles = {source: set(names) for source, names in self.titles.items()}
+        clone.watermarks = dict(self.watermarks)
+        return clone
+
+    def finalize(self) -> 'CategoryIndex':
+        """
+        Construye el registro de juegos, el motor de puntuación y el índice
+        de búsqueda. El motor trabaja con los nombres canónicos para que un
+        mismo juego escrito distinto en cada base de datos reúna sus atributos.
+        """
+        catalog = self.catalog.compact()
+
+        titles = {source: set(names) for source, names in self.titles.items()}
+        for attribute_type, (source, _) in ATTRIBUTE_SOURCES.items():
+            titles[source].update(catalog.names(catalog.games_with_type(attribute_type).tolist()))
+        self.registry = GameRegistry(titles)
+
+        # Los IDs del catálogo se traducen a IDs del motor (nombres canónicos
+        # en orden alfabético) sin pasar por conjuntos de cadenas
+        display_name = self.registry.display_name
+        display_names = [display_name(title) for title in catalog.titles.names]
+        game_names = sorted(set(display_names))
+        engine_ids = {name: engine_id for engine_id, name in enumerate(game_names)}
+        remap = np.fromiter((engine_ids[name] for name in display_names), dtype=np.int32, count=len(display_names))
+
+        self.scoring_engine = CategoryScoringEngine.from_postings(game_names, {
+            attribute_type: {
+                attribute_value: np.unique(remap[game_ids])
+                for attribute_value, game_ids in catalog.value_postings(attribute_type)
+            }
+            for attribute_type in ATTRIBUTE_SOURCES
+        })
+        self.search_index = GameSearchIndex(self.titles)
+        return self
+
+    def attributes_for(self, entry: GameEntry) -> Dict[str, str]:
+        """Atributos de todos los títulos de un juego; vgsales tiene prioridad"""
+        attributes = {}
+        for title in entry.all_titles():
+            for attribute_type, attribute_value in self.catalog.attributes_of(title).items():
+                attributes.setdefault(attribute_type, attribute_value)
+        return attributes
+
+    @property
+    def game_count(self) -> int:
+        return self.catalog.game_count
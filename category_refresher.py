@@ -0,0 +1,91 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+FULL_REFRESH_DISABLED_WARNING = (
+    "CATEGORY_FULL_REFRESH_EVERY <= 0: los refrescos incrementales no recogen juegos "
+    "borrados, recreados ni nuevas relaciones de juegos ya indexados"
+)
+
+class CategoryMapRefresher:
+    """
+    Hilo en segundo plano que refresca periódicamente los mapas de
+    categorías de un PersonalRecommenderService sin reiniciar el proceso.
+    Cada `full_refresh_every` ciclos hace una reconstrucción completa para
+    recoger cambios que la marca de agua no detecta (bajas, nuevas
+    relaciones en juegos ya indexados, juegos recreados con un ID interno
+    reutilizado). Sin ella esos cambios no se recogen nunca.
+    """
+
+    def __init__(self, recommender, interval_seconds: float, full_refresh_every: int = 0):
+        self.recommender = recommender
+        self.interval_seconds = interval_seconds
+        self.full_refresh_every = full_refresh_every
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._cycles = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='category-map-refresher', daemon=True)
+        self._thread.start()
+        logger.info(f"Refresco de mapas de categorías cada {self.interval_seconds}s")
+        if self.full_refresh_every <= 0:
+            logger.warning(FULL_REFRESH_DISABLED_WARNING)
+
+    def stop(self, timeout: float = None):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            self._cycles += 1
+            full = self.full_refresh_every > 0 and self._cycles % self.full_refresh_every == 0
+
+            try:
+                self.recommender.refresh_category_maps(full=full)
+            except Exception as e:
+                logger.error(f"Error refrescando mapas de categorías: {e}")
+
+class CollaborativeIndexRefresher:
+    """
+    Hilo en segundo plano que reconstruye los índices en memoria de un
+    CollaborativeRecommenderService (item-item y grafo social): una vez
+    al arrancar y después cada `interval_seconds`.
+    """
+
+    def __init__(self, recommender, interval_seconds: float):
+        self.recommender = recommender
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='collaborative-index-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.recommender.rebuild_indexes()
+            except Exception as e:
+                logger.error(f"Error reconstruyendo los índices colaborativos: {e}")
+
+            if self.interval_seconds <= 0 or self._stop_event.wait(self.interval_seconds):
+                return
@@ -1,117 +1,278 @@
-from typing import List, Dict
-from collections import defaultdict
+from typing import List, Dict, Iterable, Optional
 import logging
-from models import Recommendation, RecommendationType
+import threading
+from game_registry import canonical_game_id
+from models import Recommendation, RecommendationList, RecommendationType, UserProfile
 from neo4j_connection import Neo4jConnectionManager
+from popularity import PopularityTables, with_popular_fallback
+from item_similarity import ItemSimilarityIndex
+from social_graph import SocialGraph
+from tracing import stage
+from user_profile import UserProfileLoader
+from queries import (
+    BATCH_FRIENDS_WEIGHTED_QUERY,
+    BATCH_SIMILAR_USERS_QUERY,
+    FRIENDS_EDGES_QUERY,
+    FRIENDS_WEIGHTED_QUERY,
+    LIKES_EDGES_QUERY,
+    PLAYED_EDGES_QUERY,
+    SIMILAR_USERS_QUERY
+)
 
 logger = logging.getLogger(__name__)
 
+# Valor de LIMIT usado cuando no se muestrean amigos
+UNLIMITED_FRIENDS = 2 ** 31 - 1
+
+def build_collaborative_recommendations(game_scores: Dict[str, float], max_recommendations: int,
+                                        popularity: Optional[PopularityTables] = None) -> List[Recommendation]:
+    """
+    Ordena las puntuaciones y construye las recomendaciones colaborativas.
+    Con tablas de popularidad, los empates se resuelven por ventas globales.
+    """
+    recommendations = []
+    if popularity is None:
+        sorted_games = sorted(game_scores.items(), key=lambda x: x[1], reverse=True)
+    else:
+        sorted_games = sorted(game_scores.items(), key=lambda x: (-x[1], -popularity.sales_of(x[0])))
+    
+    for game_name, score in sorted_games[:max_recommendations]:
+        recommendations.append(Recommendation(
+            game_id=canonical_game_id(game_name),
+            game_name=game_name,
+            score=score,
+            recommendation_type=RecommendationType.COLLABORATIVE
+        ))
+    
+    return recommendations
+
+def friend_query_params(max_recommendations: int, friend_sample_limit: int = 0,
+                        friend_of_friend_weight: float = 0.5) -> Dict[str, float]:
+    """
+    Parámetros del recorrido ponderado de amigos. Un límite de muestreo
+    menor o igual a 0 significa recorrer todos los amigos.
+    """
+    return {
+        'limit': max_recommendations,
+        'friendLimit': friend_sample_limit if friend_sample_limit > 0 else UNLIMITED_FRIENDS,
+        'friendWeight': 1.0,
+        'friendOfFriendWeight': friend_of_friend_weight
+    }
+
+def score_similar_users(index: ItemSimilarityIndex, profile: UserProfile, max_recommendations: int) -> Dict[str, int]:
+    """Puntúa candidatos sumando los vecinos item-item de los juegos con LIKES"""
+    return {
+        game_name: int(score)
+        for game_name, score in index.recommend(profile.liked_games, max_recommendations, exclude=profile.interacted_games)
+    }
+
 class CollaborativeRecommenderService:
-    def __init__(self, vgsales_connection: Neo4jConnectionManager, videogames_connection: Neo4jConnectionManager):
+    def __init__(self, vgsales_connection: Neo4jConnectionManager, videogames_connection: Neo4jConnectionManager,
+                 similarity_top_n: int = 50, similarity_max_user_likes: int = 0,
+                 friend_sample_limit: int = 0, friend_of_friend_weight: float = 0.5,
+                 graph_engine_enabled: bool = False, popularity: Optional[PopularityTables] = None):
         self.vgsales_conn = vgsales_connection
         self.videogames_conn = videogames_connection
+        self.popularity = popularity
+        self.friend_sample_limit = friend_sample_limit
+        self.friend_of_friend_weight = friend_of_friend_weight
+        self.profile_loader = UserProfileLoader(vgsales_connection, videogames_connection)
+        self.similarity_top_n = similarity_top_n
+        self.similarity_max_user_likes = similarity_max_user_likes
+        # Hasta que se construya el índice item-item se usa la consulta Cypher
+        self.similarity_index: Optional[ItemSimilarityIndex] = None
+        self._similarity_lock = threading.Lock()
+        # Grafo social en memoria (opcional); sin cargar se usa Cypher
+        self.graph_engine_enabled = graph_engine_enabled
+        self.graph_engine: Optional[SocialGraph] = None
+        self._graph_lock = threading.Lock()
+    
+    def rebuild_indexes(self):
+        """Reconstruye los índices en memoria habilitados"""
+        self.rebuild_similarity_index()
+        if self.graph_engine_enabled:
+            self.reload_graph_engine()
+    
+    def reload_graph_engine(self) -> Dict[str, int]:
+        """Recarga las aristas FRIENDS_WITH, LIKES y PLAYED y cambia el grafo en memoria"""
+        with self._graph_lock:
+            friends = self.vgsales_conn.execute_query(FRIENDS_EDGES_QUERY)
+            likes = self.vgsales_conn.execute_query(LIKES_EDGES_QUERY)
+            played = self.vgsales_conn.execute_query(PLAYED_EDGES_QUERY)
+            
+            graph = SocialGraph.build(
+                ((record['userId'], record['friendId']) for record in friends),
+                ((record['userId'], record['gameName']) for record in likes),
+                ((record['userId'], record['gameName']) for record in played)
+            )
+            self.graph_engine = graph
+            return graph.memory_usage()
+    
+    def graph_memory_report(self) -> Optional[Dict[str, int]]:
+        graph = self.graph_engine
+        return graph.memory_usage() if graph is not None else None
+    
+    def rebuild_similarity_index(self) -> int:
+        """Reconstruye el índice item-item desde las aristas LIKES y lo intercambia"""
+        with self._similarity_lock:
+            records = self.vgsales_conn.execute_query(LIKES_EDGES_QUERY)
+            index = ItemSimilarityIndex.build(
+                ((record['userId'], record['gameName']) for record in records),
+                top_n=self.similarity_top_n,
+                max_user_likes=self.similarity_max_user_likes
+            )
+            self.similarity_index = index
+            return index.size
     
     def recommend_games_by_friends(self, user_id: str, max_recommendations: int) -> List[Recommendation]:
-        """Recomienda juegos basándose en los gustos de amigos"""
+        """
+        Recomienda juegos basándose en los gustos de amigos y, con menos
+        peso, de amigos de amigos. Con el grafo en memoria cargado se
+        puntúa sobre sus arreglos; si no, Neo4j pondera y aplica el LIMIT.
+        """
         try:
-            game_scores = defaultdict(int)
-            game_names = {}
+            graph = self.graph_engine
+            if graph is not None:
+                with stage('graph_score'):
+                    game_scores = dict(graph.friend_scores(
+                        user_id, max_recommendations, self.friend_sample_limit, self.friend_of_friend_weight
+                    ))
+            else:
+                params = self._friend_query_params(max_recommendations)
+                params['userId'] = user_id
+                with stage('friends_query'):
+                    records = self.vgsales_conn.execute_query(FRIENDS_WEIGHTED_QUERY, params)
+                game_scores = {record['gameName']: record['score'] for record in records}
             
-            direct_friends_query = """
-            MATCH (user:User {id: $userId})-[:FRIENDS_WITH]->(friend:User)-[:LIKES]->(game:VideoGame)
-            WHERE NOT (user)-[:PLAYED|LIKES]->(game)
-            RETURN game.Name as gameName, count(friend) as friendCount
-            ORDER BY friendCount DESC
-            """
+            with stage('sort'):
+                recommendations = self._rank(game_scores, max_recommendations)
             
-            vgsales_friends = self.vgsales_conn.execute_query(direct_friends_query, {'userId': user_id})
+            logger.info(f"Generadas {len(recommendations)} recomendaciones por amigos para usuario '{user_id}'")
+            return recommendations
             
-            for record in vgsales_friends:
-                game_name = record['gameName']
-                friend_count = record['friendCount']
-                game_scores[game_name] = friend_count
-                game_names[game_name] = game_name
-
-            if len(game_scores) < max_recommendations:
-                extended_query = """
-                MATCH (user:User {id: $userId})-[:FRIENDS_WITH]->(:User)-[:FRIENDS_WITH]->(friendOfFriend:User)
-                WHERE NOT (user)-[:FRIENDS_WITH]->(friendOfFriend) AND NOT user = friendOfFriend
-                WITH DISTINCT friendOfFriend
-                MATCH (friendOfFriend)-[:LIKES]->(game:VideoGame)
-                WHERE NOT (user)-[:PLAYED|LIKES]->(game)
-                RETURN game.Name as gameName, count(friendOfFriend) as fofCount
-                ORDER BY fofCount DESC
-                """
-                
-                extended_friends = self.vgsales_conn.execute_query(extended_query, {'userId': user_id})
-                
-                for record in extended_friends:
-                    if len(game_scores) >= max_recommendations * 2:
-                        break
-                    
-                    game_name = record['gameName']
-                    fof_count = record['fofCount']
-                    
-                    game_scores[game_name] = game_scores.get(game_name, 0) + fof_count // 2
-                    game_names[game_name] = game_name
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por amigos: {e}")
+            raise
+    
+    def recommend_games_by_similar_users(self, user_id: str, max_recommendations: int,
+                                         profile: Optional[UserProfile] = None) -> List[Recommendation]:
+        """
+        Recomienda juegos basándose en usuarios similares. Usa, por orden,
+        el grafo en memoria, el índice item-item o la consulta Cypher; si se
+        recibe el perfil ya cargado y no tiene LIKES, no consulta Neo4j.
+        """
+        try:
+            if profile is not None and not profile.liked_games:
+                return self._rank({}, max_recommendations, profile.interacted_games, profile.partial)
             
-            recommendations = []
-            sorted_games = sorted(game_scores.items(), key=lambda x: x[1], reverse=True)
+            # Solo el índice item-item depende del perfil cargado con fan-out
+            partial = False
+            graph = self.graph_engine
+            index = self.similarity_index
+            if graph is not None:
+                with stage('graph_score'):
+                    game_scores = dict(graph.similar_user_scores(user_id, max_recommendations))
+            elif index is not None:
+                if profile is None:
+                    with stage('profile_fetch'):
+                        profile = self.profile_loader.load(user_id)
+                partial = profile.partial
+                with stage('similarity_score'):
+                    game_scores = score_similar_users(index, profile, max_recommendations)
+            else:
+                with stage('similar_users_query'):
+                    similar_users = self.vgsales_conn.execute_query(SIMILAR_USERS_QUERY, {'userId': user_id})
+                game_scores = {record['gameName']: record['score'] for record in similar_users}
             
-            for game_name, score in sorted_games[:max_recommendations]:
-                recommendations.append(Recommendation(
-                    game_id=game_name,
-                    game_name=game_names[game_name],
-                    score=score,
-                    recommendation_type=RecommendationType.COLLABORATIVE
-                ))
+            with stage('sort'):
+                recommendations = self._rank(game_scores, max_recommendations, partial=partial)
             
-            logger.info(f"Generadas {len(recommendations)} recomendaciones por amigos para usuario '{user_id}'")
+            logger.info(f"Generadas {len(recommendations)} recomendaciones por usuarios similares para usuario '{user_id}'")
             return recommendations
             
         except Exception as e:
-            logger.error(f"Error generando recomendaciones por amigos: {e}")
+            logger.error(f"Error generando recomendaciones por usuarios similares: {e}")
             raise
     
-    def recommend_games_by_similar_users(self, user_id: str, max_recommendations: int) -> List[Recommendation]:
-        """Recomienda juegos basándose en usuarios similares"""
+    def recommend_games_by_friends_batch(self, user_ids: List[str], max_recommendations: int) -> Dict[str, List[Recommendation]]:
+        """Recomendaciones por amigos para un lote de usuarios en un solo recorrido ponderado"""
         try:
-            game_scores = defaultdict(int)
-            game_names = {}
+            graph = self.graph_engine
+            results = {}
             
-            similar_users_query = """
-            MATCH (user:User {id: $userId})-[:LIKES]->(game:VideoGame)<-[:LIKES]-(otherUser:User)
-            WHERE user <> otherUser
-            WITH otherUser, count(game) AS commonGames
-            WHERE commonGames > 0
-            MATCH (otherUser)-[:LIKES]->(rec:VideoGame)
-            WHERE NOT (user)-[:PLAYED|LIKES]->(rec)
-            RETURN rec.Name AS gameName, sum(commonGames) AS score
-            ORDER BY score DESC
-            """
-            
-            similar_users = self.vgsales_conn.execute_query(similar_users_query, {'userId': user_id})
+            if graph is not None:
+                for user_id in user_ids:
+                    game_scores = dict(graph.friend_scores(
+                        user_id, max_recommendations, self.friend_sample_limit, self.friend_of_friend_weight
+                    ))
+                    results[user_id] = self._rank(game_scores, max_recommendations)
+            else:
+                params = self._friend_query_params(max_recommendations)
+                params['userIds'] = user_ids
+                records = self.vgsales_conn.execute_query(BATCH_FRIENDS_WEIGHTED_QUERY, params)
+                
+                games_by_user = {record['userId']: record['games'] for record in records}
+                
+                for user_id in user_ids:
+                    game_scores = {game['gameName']: game['score'] for game in games_by_user.get(user_id, [])}
+                    results[user_id] = self._rank(game_scores, max_recommendations)
             
-            for record in similar_users:
-                game_name = record['gameName']
-                score = record['score']
-                game_scores[game_name] = score
-                game_names[game_name] = game_name
+            logger.info(f"Generadas recomendaciones por amigos para un lote de {len(user_ids)} usuarios")
+            return results
             
-            recommendations = []
-            sorted_games = sorted(game_scores.items(), key=lambda x: x[1], reverse=True)
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por amigos en lote: {e}")
+            raise
+    
+    def recommend_games_by_similar_users_batch(self, user_ids: List[str], max_recommendations: int) -> Dict[str, List[Recommendation]]:
+        """Recomendaciones por usuarios similares para un lote de usuarios en una consulta"""
+        try:
+            graph = self.graph_engine
+            index = self.similarity_index
+            results = {}
             
-            for game_name, score in sorted_games[:max_recommendations]:
-                recommendations.append(Recommendation(
-                    game_id=game_name,
-                    game_name=game_names[game_name],
-                    score=score,
-                    recommendation_type=RecommendationType.COLLABORATIVE
-                ))
+            if graph is not None:
+                for user_id in user_ids:
+                    game_scores = dict(graph.similar_user_scores(user_id, max_recommendations))
+                    results[user_id] = self._rank(game_scores, max_recommendations)
+            elif index is not None:
+                profiles = self.profile_loader.load_many(user_ids)
+                for user_id in user_ids:
+                    profile = profiles[user_id]
+                    game_scores = score_similar_users(index, profile, max_recommendations)
+                    results[user_id] = self._rank(game_scores, max_recommendations, partial=profile.partial)
+            else:
+                records = self.vgsales_conn.execute_query(
+                    BATCH_SIMILAR_USERS_QUERY,
+                    {'userIds': user_ids, 'limit': max_recommendations}
+                )
+                
+                games_by_user = {record['userId']: record['games'] for record in records}
+                
+                for user_id in user_ids:
+                    game_scores = {game['gameName']: game['score'] for game in games_by_user.get(user_id, [])}
+                    results[user_id] = self._rank(game_scores, max_recommendations)
             
-            logger.info(f"Generadas {len(recommendations)} recomendaciones por usuarios similares para usuario '{user_id}'")
-            return recommendations
+            logger.info(f"Generadas recomendaciones por usuarios similares para un lote de {len(user_ids)} usuarios")
+            return results
             
         except Exception as e:
-            logger.error(f"Error generando recomendaciones por usuarios similares: {e}")
+            logger.error(f"Error generando recomendaciones por usuarios similares en lote: {e}")
             raise
+    
+    def _rank(self, game_scores: Dict[str, float], max_recommendations: int,
+              exclude: Iterable[str] = (), partial: bool = False) -> RecommendationList:
+        """
+        Recomendaciones ordenadas; sin candidatos (usuario nuevo) se devuelven
+        las más vendidas, salvo que el perfil se haya cargado de forma parcial.
+        """
+        return RecommendationList(
+            with_popular_fallback(
+                build_collaborative_recommendations(game_scores, max_recommendations, self.popularity),
+                self.popularity, max_recommendations, exclude, partial=partial
+            ),
+            partial
+        )
+    
+    def _friend_query_params(self, max_recommendations: int) -> Dict[str, float]:
+        return friend_query_params(max_recommendations, self.friend_sample_limit, self.friend_of_friend_weight)
@@ -0,0 +1,220 @@
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set
+from array import array
+import logging
+import sys
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MISSING = -1
+
+_EMPTY_POSTINGS = np.empty(0, dtype=np.int32)
+_EMPTY_POSTINGS.setflags(write=False)
+
+class TitleTable:
+    """
+    Tabla de cadenas internadas: cada nombre se guarda una sola vez y el
+    resto de estructuras lo referencian por un ID entero denso.
+    """
+    __slots__ = ('names', 'ids')
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def intern(self, name: str) -> int:
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name = sys.intern(name)
+            name_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def id_of(self, name: str) -> Optional[int]:
+        return self.ids.get(name)
+
+    def copy(self) -> 'TitleTable':
+        clone = TitleTable()
+        clone.names = list(self.names)
+        clone.ids = dict(self.ids)
+        return clone
+
+    def __getitem__(self, name_id: int) -> str:
+        return self.names[name_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+def intersect(*postings: np.ndarray) -> np.ndarray:
+    """Intersección de listas de IDs ordenadas y sin repetidos, empezando por la más corta"""
+    if not postings:
+        return _EMPTY_POSTINGS
+    ordered = sorted(postings, key=len)
+    result = ordered[0]
+    for ids in ordered[1:]:
+        if not result.size:
+            break
+        result = np.intersect1d(result, ids, assume_unique=True)
+    return result
+
+def union(*postings: np.ndarray) -> np.ndarray:
+    """Unión ordenada y sin repetidos de listas de IDs"""
+    postings = [ids for ids in postings if ids.size]
+    if not postings:
+        return _EMPTY_POSTINGS
+    if len(postings) == 1:
+        return postings[0]
+    return np.unique(np.concatenate(postings))
+
+class CompactCatalog:
+    """
+    Catálogo de categorías compacto. Los títulos y los valores de las
+    categorías se internan en tablas; cada categoría guarda una lista
+    ordenada de IDs de juego (int32) y el atributo de cada juego es un
+    `array` indexado por su ID. Las altas se acumulan en arrays pendientes
+    y compact() las fusiona en las listas definitivas.
+    """
+
+    def __init__(self, attribute_types: Iterable[str]):
+        self.titles = TitleTable()
+        self.values = TitleTable()
+        self.attribute_types = tuple(attribute_types)
+        self._postings: Dict[str, Dict[int, np.ndarray]] = {t: {} for t in self.attribute_types}
+        self._pending: Dict[str, Dict[int, array]] = {t: {} for t in self.attribute_types}
+        self._attributes: Dict[str, array] = {t: array('i') for t in self.attribute_types}
+
+    def add(self, attribute_type: str, game_name: str, attribute_value: str):
+        game_id = self.titles.intern(game_name)
+        value_id = self.values.intern(attribute_value)
+
+        pending = self._pending[attribute_type].get(value_id)
+        if pending is None:
+            pending = self._pending[attribute_type][value_id] = array('i')
+        pending.append(game_id)
+
+        attributes = self._attributes[attribute_type]
+        if game_id >= len(attributes):
+            attributes.extend([MISSING] * (game_id + 1 - len(attributes)))
+        attributes[game_id] = value_id
+
+    def compact(self) -> 'CompactCatalog':
+        """Fusiona las altas pendientes en listas ordenadas y sin repetidos"""
+        for attribute_type, pending in self._pending.items():
+            postings = self._postings[attribute_type]
+            for value_id, game_ids in pending.items():
+                added = np.unique(np.asarray(game_ids, dtype=np.int32))
+                current = postings.get(value_id)
+                merged = added if current is None else union(current, added)
+                merged.setflags(write=False)
+                postings[value_id] = merged
+            pending.clear()
+        return self
+
+    def copy(self) -> 'CompactCatalog':
+        """
+        Copia independiente para aplicar cambios incrementales. Las listas
+        compactadas son de solo lectura, así que se comparten.
+        """
+        self.compact()
+        clone = CompactCatalog(self.attribute_types)
+        clone.titles = self.titles.copy()
+        clone.values = self.values.copy()
+        clone._postings = {t: dict(postings) for t, postings in self._postings.items()}
+        clone._attributes = {t: array('i', attributes) for t, attributes in self._attributes.items()}
+        return clone
+
+    @property
+    def game_count(self) -> int:
+        return len(self.titles)
+
+    def postings(self, attribute_type: str, attribute_value: str) -> np.ndarray:
+        """IDs de los juegos con un atributo; requiere haber llamado a compact()"""
+        value_id = self.values.id_of(attribute_value)
+        if value_id is None:
+            return _EMPTY_POSTINGS
+        return self._postings[attribute_type].get(value_id, _EMPTY_POSTINGS)
+
+    def value_postings(self, attribute_type: str) -> Iterator:
+        """Pares (valor, IDs de juegos) de un tipo de atributo"""
+        values = self.values.names
+        for value_id, game_ids in self._postings[attribute_type].items():
+            yield values[value_id], game_ids
+
+    def games_with_type(self, attribute_type: str) -> np.ndarray:
+        """IDs de los juegos que tienen algún valor del tipo de atributo"""
+        return union(*self._postings[attribute_type].values())
+
+    def names(self, game_ids: Iterable[int]) -> List[str]:
+        titles = self.titles.names
+        return [titles[game_id] for game_id in game_ids]
+
+    def attributes_of(self, game_name: str) -> Dict[str, str]:
+        game_id = self.titles.id_of(game_name)
+        if game_id is None:
+            return {}
+
+        attributes = {}
+        for attribute_type, values in self._attributes.items():
+            if game_id < len(values) and values[game_id] != MISSING:
+                attributes[attribute_type] = self.values.names[values[game_id]]
+        return attributes
+
+    def games_map(self, attribute_type: str) -> 'CategoryMapView':
+        return CategoryMapView(self, attribute_type)
+
+    def attributes_map(self) -> 'GameAttributesView':
+        return GameAttributesView(self)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes de las listas de IDs y de los arrays de atributos (sin las tablas de cadenas)"""
+        return {
+            'postings': sum(ids.nbytes for postings in self._postings.values() for ids in postings.values()),
+            'attributes': sum(values.itemsize * len(values) for values in self._attributes.values())
+        }
+
+class CategoryMapView(Mapping):
+    """
+    Vista de solo lectura valor -> conjunto de títulos sobre un
+    CompactCatalog, con la forma de los antiguos mapas categoría -> juegos.
+    Los conjuntos se construyen al acceder; no se guardan.
+    """
+
+    def __init__(self, catalog: CompactCatalog, attribute_type: str):
+        self.catalog = catalog
+        self.attribute_type = attribute_type
+
+    def __getitem__(self, attribute_value: str) -> Set[str]:
+        if attribute_value not in self:
+            raise KeyError(attribute_value)
+        return set(self.catalog.names(self.catalog.postings(self.attribute_type, attribute_value).tolist()))
+
+    def __contains__(self, attribute_value) -> bool:
+        value_id = self.catalog.values.id_of(attribute_value)
+        return value_id is not None and value_id in self.catalog._postings[self.attribute_type]
+
+    def __iter__(self) -> Iterator[str]:
+        values = self.catalog.values.names
+        return (values[value_id] for value_id in self.catalog._postings[self.attribute_type])
+
+    def __len__(self) -> int:
+        return len(self.catalog._postings[self.attribute_type])
+
+class GameAttributesView(Mapping):
+    """Vista de solo lectura título -> {tipo: valor} sobre un CompactCatalog"""
+
+    def __init__(self, catalog: CompactCatalog):
+        self.catalog = catalog
+
+    def __getitem__(self, game_name: str) -> Dict[str, str]:
+        if game_name not in self.catalog.titles.ids:
+            raise KeyError(game_name)
+        return self.catalog.attributes_of(game_name)
+
+    def __contains__(self, game_name) -> bool:
+        return game_name in self.catalog.titles.ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.catalog.titles.names)
+
+    def __len__(self) -> int:
+        return len(self.catalog.titles)
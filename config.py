@@ -17,3 +17,68 @@ class Config:
     DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
 
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
+
+    NEO4J_MAX_POOL_SIZE = int(os.getenv('NEO4J_MAX_POOL_SIZE', '100'))
+    NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME', '3600'))
+    NEO4J_ACQUISITION_TIMEOUT = float(os.getenv('NEO4J_ACQUISITION_TIMEOUT', '60'))
+    NEO4J_MAX_RETRY_TIME = float(os.getenv('NEO4J_MAX_RETRY_TIME', '30'))
+    NEO4J_QUERY_TIMEOUT = float(os.getenv('NEO4J_QUERY_TIMEOUT', '0'))
+    NEO4J_FETCH_SIZE = int(os.getenv('NEO4J_FETCH_SIZE', '1000'))
+
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'True').lower() == 'true'
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '10000'))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    CACHE_DEFAULT_TTL = float(os.getenv('CACHE_DEFAULT_TTL', '300'))
+    CACHE_ENDPOINT_TTLS = {
+        'by-game': float(os.getenv('CACHE_TTL_BY_GAME', '3600')),
+        'by-preferences': float(os.getenv('CACHE_TTL_BY_PREFERENCES', '300')),
+        'by-friends': float(os.getenv('CACHE_TTL_BY_FRIENDS', '120')),
+        'by-similar-users': float(os.getenv('CACHE_TTL_BY_SIMILAR_USERS', '300')),
+        'hybrid': float(os.getenv('CACHE_TTL_HYBRID', '120'))
+    }
+
+    CATEGORY_REFRESH_INTERVAL = float(os.getenv('CATEGORY_REFRESH_INTERVAL', '300'))
+    # Cada cuántos refrescos se reconstruye el índice completo; los
+    # incrementales se basan en id() y dependen de ello (ver queries.py)
+    CATEGORY_FULL_REFRESH_EVERY = int(os.getenv('CATEGORY_FULL_REFRESH_EVERY', '12'))
+    CATEGORY_SNAPSHOT_PATH = os.getenv('CATEGORY_SNAPSHOT_PATH', '')
+
+    FANOUT_MAX_WORKERS = int(os.getenv('FANOUT_MAX_WORKERS', '16'))
+    FANOUT_TIMEOUT = float(os.getenv('FANOUT_TIMEOUT', '5'))
+
+    BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', '1000'))
+    STREAM_BATCH_CHUNK_SIZE = int(os.getenv('STREAM_BATCH_CHUNK_SIZE', '50'))
+
+    TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'False').lower() == 'true'
+    TRACING_SLOW_THRESHOLD_MS = float(os.getenv('TRACING_SLOW_THRESHOLD_MS', '500'))
+    TRACING_SLOW_SAMPLE_RATE = float(os.getenv('TRACING_SLOW_SAMPLE_RATE', '1.0'))
+
+    SIMILARITY_TOP_N = int(os.getenv('SIMILARITY_TOP_N', '50'))
+    SIMILARITY_MAX_USER_LIKES = int(os.getenv('SIMILARITY_MAX_USER_LIKES', '0'))
+    SIMILARITY_REFRESH_INTERVAL = float(os.getenv('SIMILARITY_REFRESH_INTERVAL', '3600'))
+
+    FRIEND_SAMPLE_LIMIT = int(os.getenv('FRIEND_SAMPLE_LIMIT', '0'))
+    FRIEND_OF_FRIEND_WEIGHT = float(os.getenv('FRIEND_OF_FRIEND_WEIGHT', '0.5'))
+
+    HYBRID_WEIGHTS = {
+        'by-game': float(os.getenv('HYBRID_WEIGHT_BY_GAME', '1.0')),
+        'by-preferences': float(os.getenv('HYBRID_WEIGHT_BY_PREFERENCES', '1.0')),
+        'by-friends': float(os.getenv('HYBRID_WEIGHT_BY_FRIENDS', '1.0')),
+        'by-similar-users': float(os.getenv('HYBRID_WEIGHT_BY_SIMILAR_USERS', '1.0'))
+    }
+
+    GRAPH_ENGINE_ENABLED = os.getenv('GRAPH_ENGINE_ENABLED', 'False').lower() == 'true'
+
+    # Rankings de ventas para usuarios nuevos y juegos no encontrados; vacío lo deshabilita
+    POPULARITY_CSV = os.getenv('POPULARITY_CSV', 'vgsales.csv')
+    POPULARITY_TABLE_SIZE = int(os.getenv('POPULARITY_TABLE_SIZE', '100'))
+
+    SEARCH_RESULT_LIMIT = int(os.getenv('SEARCH_RESULT_LIMIT', '20'))
+
+    SCHEMA_BOOTSTRAP_ENABLED = os.getenv('SCHEMA_BOOTSTRAP_ENABLED', 'True').lower() == 'true'
+    SCHEMA_CREATE = os.getenv('SCHEMA_CREATE', 'True').lower() == 'true'
+    SCHEMA_STRICT = os.getenv('SCHEMA_STRICT', 'False').lower() == 'true'
+
+    BULK_LOAD_BATCH_SIZE = int(os.getenv('BULK_LOAD_BATCH_SIZE', '1000'))
+    BULK_LOAD_WORKERS = int(os.getenv('BULK_LOAD_WORKERS', '4'))
+    BULK_LOAD_CHECKPOINT = os.getenv('BULK_LOAD_CHECKPOINT', '.bulk_loader_checkpoint.json')
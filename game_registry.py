@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, List, Optional, Set
+from dataclasses import dataclass, field
+import hashlib
+import logging
+import re
+from search_index import SEARCH_SOURCES, normalize_title
+
+logger = logging.getLogger(__name__)
+
+_SEPARATORS = re.compile(r'[\W_]+')
+
+def canonical_title(name: str) -> str:
+    """Título normalizado sin puntuación: 'Pokémon: Red/Blue' y 'pokemon red blue' coinciden"""
+    normalized = normalize_title(name)
+    return _SEPARATORS.sub(' ', normalized).strip() or normalized.strip()
+
+def canonical_game_id(name: str) -> str:
+    """
+    ID estable de un juego derivado de su título canónico. No depende del
+    orden de carga, así que es el mismo entre reinicios y entre servicios.
+    """
+    digest = hashlib.sha1(canonical_title(name).encode('utf-8')).hexdigest()
+    return f'g{digest[:12]}'
+
+@dataclass
+class GameEntry:
+    game_id: str
+    name: str
+    titles: Dict[str, Set[str]] = field(default_factory=dict)
+
+    @property
+    def sources(self) -> List[str]:
+        """Bases de datos que contienen el juego, en orden de preferencia"""
+        return [source for source in SEARCH_SOURCES if self.titles.get(source)]
+
+    def title_in(self, source: str) -> Optional[str]:
+        """Título con el que aparece el juego en una base de datos"""
+        titles = self.titles.get(source)
+        return min(titles) if titles else None
+
+    def all_titles(self) -> List[str]:
+        return [title for source in self.sources for title in sorted(self.titles[source])]
+
+class GameRegistry:
+    """
+    Identidad canónica de los juegos entre ambas bases de datos
+    (VideoGame.Name y Videojuego.nombre). Los títulos que solo difieren en
+    mayúsculas, acentos o puntuación comparten una entrada con un único ID.
+    El nombre visible es el de vgsales cuando existe.
+    """
+
+    def __init__(self, titles: Dict[str, Iterable[str]]):
+        self.entries: Dict[str, GameEntry] = {}
+        self._by_title: Dict[str, GameEntry] = {}
+        self._by_canonical: Dict[str, GameEntry] = {}
+
+        for source in SEARCH_SOURCES:
+            for title in sorted(titles.get(source, ())):
+                if title:
+                    self._add(source, title)
+
+        merged = sum(1 for entry in self.entries.values() if len(entry.all_titles()) > 1)
+        logger.info(f"Registro de juegos construido: {len(self.entries)} juegos, {merged} con títulos fusionados")
+
+    def _add(self, source: str, title: str):
+        key = canonical_title(title)
+        entry = self._by_canonical.get(key)
+        if entry is None:
+            entry = GameEntry(game_id=canonical_game_id(title), name=title)
+            self._by_canonical[key] = entry
+            self.entries[entry.game_id] = entry
+        entry.titles.setdefault(source, set()).add(title)
+        self._by_title[title] = entry
+
+    @property
+    def size(self) -> int:
+        return len(self.entries)
+
+    def resolve(self, title: str) -> Optional[GameEntry]:
+        """Busca la entrada de un título exacto o, si no, de su forma canónica"""
+        entry = self._by_title.get(title)
+        if entry is None:
+            entry = self._by_canonical.get(canonical_title(title))
+        return entry
+
+    def display_name(self, title: str) -> str:
+        """Nombre visible del juego de un título; el propio título si no está registrado"""
+        entry = self.resolve(title)
+        return entry.name if entry is not None else title
@@ -0,0 +1,157 @@
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+import logging
+from models import Recommendation, RecommendationList, RecommendationType, UserProfile, is_partial
+from game_registry import canonical_game_id
+from personal_recommender import PersonalRecommenderService
+from collaborative_recomendation import CollaborativeRecommenderService
+from popularity import with_popular_fallback
+from tracing import stage
+
+logger = logging.getLogger(__name__)
+
+HYBRID_STRATEGIES = ('by-game', 'by-preferences', 'by-friends', 'by-similar-users')
+
+# Candidatos que se piden a cada estrategia por cada recomendación final,
+# para que la fusión tenga margen al deduplicar y excluir juegos
+CANDIDATE_FACTOR = 2
+
+class InvalidWeightsError(ValueError):
+    """Pesos de estrategia desconocidos o no numéricos"""
+    status_code = 400
+
+def resolve_weights(defaults: Mapping[str, float], overrides: Optional[Mapping[str, float]] = None) -> Dict[str, float]:
+    """Pesos por estrategia: los de la petición sustituyen a los de Config"""
+    weights = {strategy: float(defaults.get(strategy, 0.0)) for strategy in HYBRID_STRATEGIES}
+    for strategy, weight in (overrides or {}).items():
+        if strategy not in HYBRID_STRATEGIES:
+            raise InvalidWeightsError(f"Estrategia desconocida en weights: {strategy}")
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+            raise InvalidWeightsError(f"El peso de {strategy} debe ser un número no negativo")
+        weights[strategy] = float(weight)
+    return weights
+
+def normalize_scores(recommendations: Iterable[Recommendation]) -> Dict[str, Recommendation]:
+    """Recomendaciones por game_id con la puntuación escalada a [0, 1] respecto a la máxima"""
+    recommendations = list(recommendations)
+    top = max((rec.score for rec in recommendations), default=0)
+    if top <= 0:
+        return {}
+
+    normalized = {}
+    for rec in recommendations:
+        if rec.score > 0 and rec.game_id not in normalized:
+            normalized[rec.game_id] = Recommendation(rec.game_id, rec.game_name, rec.score / top, rec.recommendation_type)
+    return normalized
+
+def fuse_recommendations(strategy_results: Mapping[str, List[Recommendation]], weights: Mapping[str, float],
+                         max_recommendations: int, exclude_ids: Iterable[str] = ()) -> List[Recommendation]:
+    """
+    Suma ponderada de las puntuaciones normalizadas de cada estrategia.
+    Un juego recomendado por varias estrategias aparece una vez, con la
+    suma de sus contribuciones; en empate se ordena por nombre. Los
+    respaldos de popularidad de las estrategias no participan: sus
+    ventas no son comparables con las demás puntuaciones.
+    """
+    exclude_ids = set(exclude_ids)
+    scores: Dict[str, float] = {}
+    names: Dict[str, str] = {}
+
+    for strategy, recommendations in strategy_results.items():
+        weight = weights.get(strategy, 0.0)
+        if weight <= 0:
+            continue
+        personalized = (rec for rec in recommendations if rec.recommendation_type is not RecommendationType.POPULAR)
+        for game_id, rec in normalize_scores(personalized).items():
+            if game_id in exclude_ids:
+                continue
+            names.setdefault(game_id, rec.game_name)
+            scores[game_id] = scores.get(game_id, 0.0) + weight * rec.score
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], names[item[0]]))[:max(max_recommendations, 0)]
+    return [
+        Recommendation(
+            game_id=game_id,
+            game_name=names[game_id],
+            score=round(score, 6),
+            recommendation_type=RecommendationType.HYBRID
+        )
+        for game_id, score in ranked
+    ]
+
+def fusion_is_partial(profile: UserProfile, results: Mapping[str, List[Recommendation]], errors: Mapping[str, str]) -> bool:
+    """La lista fusionada es parcial si falló alguna estrategia o alguna consulta quedó incompleta"""
+    return profile.partial or bool(errors) or any(is_partial(recommendations) for recommendations in results.values())
+
+def interacted_game_ids(profile: UserProfile) -> set:
+    """IDs canónicos de los juegos que el usuario ya jugó o le gustaron"""
+    return {canonical_game_id(name) for name in profile.interacted_games}
+
+class HybridRecommenderService:
+    """
+    Una sola lista para una vista de página: carga el perfil del usuario
+    una vez, lo comparte entre las estrategias personales y colaborativas
+    y fusiona sus puntuaciones normalizadas con pesos por estrategia.
+    """
+
+    def __init__(self, personal_recommender: PersonalRecommenderService,
+                 collaborative_recommender: CollaborativeRecommenderService,
+                 weights: Mapping[str, float]):
+        self.personal_recommender = personal_recommender
+        self.collaborative_recommender = collaborative_recommender
+        self.weights = dict(weights)
+
+    def _strategies(self, user_id: str, game_name: Optional[str], candidates: int,
+                    profile: UserProfile) -> Dict[str, Callable[[], List[Recommendation]]]:
+        personal = self.personal_recommender
+        collaborative = self.collaborative_recommender
+        strategies = {
+            'by-preferences': lambda: personal.recommend_games_by_user_preferences(user_id, candidates, profile=profile),
+            'by-friends': lambda: collaborative.recommend_games_by_friends(user_id, candidates),
+            'by-similar-users': lambda: collaborative.recommend_games_by_similar_users(user_id, candidates, profile=profile)
+        }
+        if game_name:
+            strategies['by-game'] = lambda: personal.recommend_games_by_game(game_name, candidates)
+        return strategies
+
+    def recommend(self, user_id: str, max_recommendations: int, game_name: Optional[str] = None,
+                  weights: Optional[Mapping[str, float]] = None) -> List[Recommendation]:
+        """
+        Recomendaciones híbridas para un usuario y, opcionalmente, un juego
+        base. Si una estrategia falla se fusionan las demás; solo se
+        propaga el error si fallan todas.
+        """
+        try:
+            weights = resolve_weights(self.weights, weights)
+            candidates = max(max_recommendations * CANDIDATE_FACTOR, max_recommendations)
+
+            with stage('profile_fetch'):
+                profile = self.personal_recommender.profile_loader.load(user_id)
+
+            results = {}
+            errors = {}
+            for strategy, compute in self._strategies(user_id, game_name, candidates, profile).items():
+                if weights[strategy] <= 0:
+                    continue
+                try:
+                    results[strategy] = compute()
+                except Exception as e:
+                    logger.warning(f"Estrategia {strategy} fallida en la recomendación híbrida: {e}")
+                    errors[strategy] = str(e)
+
+            if errors and not results:
+                raise RuntimeError(f"Fallaron todas las estrategias: {errors}")
+
+            partial = fusion_is_partial(profile, results, errors)
+            with stage('fuse'):
+                recommendations = with_popular_fallback(
+                    fuse_recommendations(results, weights, max_recommendations, interacted_game_ids(profile)),
+                    self.personal_recommender.popularity, max_recommendations, exclude=profile.interacted_games,
+                    partial=partial
+                )
+
+            logger.info(f"Generadas {len(recommendations)} recomendaciones híbridas para usuario '{user_id}'")
+            return RecommendationList(recommendations, partial)
+
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones híbridas: {e}")
+            raise
@@ -0,0 +1,174 @@
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import numpy as np
+from category_index import CategoryIndex
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'VGIDX'
+SNAPSHOT_VERSION = 2
+# magic, versión, longitud de la cabecera JSON
+_PREAMBLE = struct.Struct('<5sHI')
+_ALIGNMENT = 8
+_MAP_TYPES = ('genre', 'platform', 'developer')
+_TITLE_SOURCES = ('vgsales', 'videogames')
+
+def _padding(offset: int) -> int:
+    return (-offset) % _ALIGNMENT
+
+def write_snapshot(path: str, index: CategoryIndex, fingerprint: Dict[str, Any]):
+    """
+    Escribe el índice de categorías en un archivo binario compacto:
+    una tabla de nombres internados (offsets + blob UTF-8) y, por cada
+    mapa, arreglos de IDs de categoría, offsets y listas de juegos; por
+    cada base de datos, los IDs de los títulos del índice de búsqueda.
+    La escritura es atómica (archivo temporal + rename).
+    """
+    maps = {
+        'genre': index.genre_games_map,
+        'platform': index.platform_games_map,
+        'developer': index.developer_games_map
+    }
+
+    names: Dict[str, int] = {}
+    def intern(name: str) -> int:
+        name_id = names.get(name)
+        if name_id is None:
+            name_id = names[name] = len(names)
+        return name_id
+
+    sections: List[np.ndarray] = []
+    layout: Dict[str, Any] = {}
+
+    for map_type in _MAP_TYPES:
+        games_map = maps[map_type]
+        category_ids = []
+        offsets = [0]
+        game_ids = []
+        for category, games in games_map.items():
+            category_ids.append(intern(category))
+            game_ids.extend(intern(game) for game in games)
+            offsets.append(len(game_ids))
+        layout[map_type] = len(sections)
+        sections.append(np.asarray(category_ids, dtype=np.int32))
+        sections.append(np.asarray(offsets, dtype=np.int32))
+        sections.append(np.asarray(game_ids, dtype=np.int32))
+
+    for source in _TITLE_SOURCES:
+        layout[f'titles:{source}'] = len(sections)
+        sections.append(np.asarray([intern(title) for title in index.titles[source]], dtype=np.int32))
+
+    encoded = [name.encode('utf-8') for name in names]
+    name_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(raw) for raw in encoded], out=name_offsets[1:])
+    layout['names'] = len(sections)
+    sections.append(name_offsets)
+    sections.append(np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    header = {
+        'fingerprint': fingerprint,
+        'watermarks': index.watermarks,
+        'layout': layout,
+        'sections': [[str(section.dtype), int(section.size)] for section in sections]
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            position = _PREAMBLE.size + len(header_bytes)
+            for section in sections:
+                pad = _padding(position)
+                f.write(b'\0' * pad)
+                f.write(section.tobytes())
+                position += pad + section.nbytes
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    logger.info(f"Snapshot del índice escrito en {path} ({len(names)} nombres)")
+
+def load_snapshot(path: str, fingerprint: Optional[Dict[str, Any]]) -> Optional[CategoryIndex]:
+    """
+    Carga el índice desde un snapshot mapeado en memoria. Devuelve None si
+    el archivo no existe, tiene otra versión o su huella no coincide con
+    la de la base de datos.
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, version, header_length = _PREAMBLE.unpack_from(mapped, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                logger.info(f"Snapshot {path} con versión incompatible, se ignora")
+                return None
+
+            header = json.loads(mapped[_PREAMBLE.size:_PREAMBLE.size + header_length])
+            if header['fingerprint'] != fingerprint:
+                logger.info(f"Snapshot {path} desactualizado, se reconstruirá el índice")
+                return None
+
+            index = _read_index(mapped, _PREAMBLE.size + header_length, header)
+            index.watermarks.update(header['watermarks'])
+            return index.finalize()
+
+    except (OSError, ValueError, KeyError, struct.error) as e:
+        logger.warning(f"No se pudo leer el snapshot {path}: {e}")
+        return None
+
+def _read_index(mapped: mmap.mmap, position: int, header: Dict[str, Any]) -> CategoryIndex:
+    """
+    Construye el índice a partir de las secciones del snapshot. Las vistas
+    NumPy sobre el mmap solo viven dentro de esta función, de modo que el
+    mapeo puede cerrarse al volver.
+    """
+    sections = []
+    for dtype, size in header['sections']:
+        position += _padding(position)
+        section = np.frombuffer(mapped, dtype=dtype, count=size, offset=position)
+        sections.append(section)
+        position += section.nbytes
+
+    layout = header['layout']
+    name_offsets = sections[layout['names']]
+    blob = sections[layout['names'] + 1].tobytes()
+    names = [
+        blob[start:end].decode('utf-8')
+        for start, end in zip(name_offsets[:-1].tolist(), name_offsets[1:].tolist())
+    ]
+
+    index = CategoryIndex()
+    adders = {
+        'genre': index.add_genre,
+        'platform': index.add_platform,
+        'developer': index.add_developer
+    }
+
+    for map_type in _MAP_TYPES:
+        position = layout[map_type]
+        category_ids = sections[position].tolist()
+        offsets = sections[position + 1].tolist()
+        game_ids = sections[position + 2].tolist()
+        add = adders[map_type]
+        for i, category_id in enumerate(category_ids):
+            category = names[category_id]
+            for game_id in game_ids[offsets[i]:offsets[i + 1]]:
+                add(names[game_id], category)
+
+    for source in _TITLE_SOURCES:
+        for title_id in sections[layout[f'titles:{source}']].tolist():
+            index.add_title(source, names[title_id])
+
+    return index
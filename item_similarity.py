@@ -0,0 +1,146 @@
+from typing import Dict, Iterable, List, Tuple
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class ItemSimilarityIndex:
+    """
+    Índice item-item de co-ocurrencia construido a partir de las aristas
+    (user)-[:LIKES]->(game). Para cada juego guarda sus N vecinos con más
+    usuarios en común, en formato CSR (indptr / neighbors / weights).
+
+    Sumar las listas de vecinos de los juegos que le gustan a un usuario
+    reproduce la puntuación de SIMILAR_USERS_QUERY (suma de juegos en común
+    con cada usuario que le dio LIKES al candidato), truncada a N vecinos.
+    """
+
+    def __init__(self, game_names: List[str], indptr: np.ndarray, neighbors: np.ndarray, weights: np.ndarray):
+        self.game_names = game_names
+        self.game_ids: Dict[str, int] = {name: idx for idx, name in enumerate(game_names)}
+        self.indptr = indptr
+        self.neighbors = neighbors
+        self.weights = weights
+
+    @classmethod
+    def build(cls, likes: Iterable[Tuple[str, str]], top_n: int = 50, max_user_likes: int = 0) -> 'ItemSimilarityIndex':
+        """
+        Construye el índice a partir de pares (userId, gameName).
+        Los usuarios con más de `max_user_likes` juegos se ignoran si el
+        límite es mayor que 0; aportan pares cuadráticos y poca señal.
+        """
+        user_ids: Dict[str, int] = {}
+        game_ids: Dict[str, int] = {}
+        edge_users = []
+        edge_games = []
+
+        for user_id, game_name in likes:
+            edge_users.append(user_ids.setdefault(user_id, len(user_ids)))
+            edge_games.append(game_ids.setdefault(game_name, len(game_ids)))
+
+        game_names = list(game_ids)
+        game_count = len(game_names)
+
+        users = np.asarray(edge_users, dtype=np.int32)
+        games = np.asarray(edge_games, dtype=np.int32)
+
+        # Aristas únicas (un LIKES duplicado no debe contar dos veces)
+        if users.size:
+            pairs = np.unique(users.astype(np.int64) * max(game_count, 1) + games)
+            users = (pairs // max(game_count, 1)).astype(np.int32)
+            games = (pairs % max(game_count, 1)).astype(np.int32)
+
+        if max_user_likes > 0 and users.size:
+            degree = np.bincount(users, minlength=len(user_ids))
+            keep = degree[users] <= max_user_likes
+            users, games = users[keep], games[keep]
+
+        user_items_ptr, user_items = cls._csr(users, games, len(user_ids))
+        item_users_ptr, item_users = cls._csr(games, users, game_count)
+
+        indptr = np.zeros(game_count + 1, dtype=np.int64)
+        neighbor_chunks = []
+        weight_chunks = []
+
+        for game in range(game_count):
+            likers = item_users[item_users_ptr[game]:item_users_ptr[game + 1]]
+            if likers.size:
+                co_liked = np.concatenate([user_items[user_items_ptr[u]:user_items_ptr[u + 1]] for u in likers])
+                counts = np.bincount(co_liked, minlength=game_count)
+                counts[game] = 0
+                candidates = np.flatnonzero(counts)
+            else:
+                candidates = np.empty(0, dtype=np.int64)
+
+            if candidates.size > top_n:
+                kth = -np.partition(-counts[candidates], top_n - 1)[top_n - 1]
+                candidates = candidates[counts[candidates] >= kth]
+            if candidates.size:
+                candidates = candidates[np.lexsort((candidates, -counts[candidates]))[:top_n]]
+                neighbor_chunks.append(candidates.astype(np.int32))
+                weight_chunks.append(counts[candidates].astype(np.float32))
+
+            indptr[game + 1] = indptr[game] + candidates.size
+
+        neighbors = np.concatenate(neighbor_chunks) if neighbor_chunks else np.empty(0, dtype=np.int32)
+        weights = np.concatenate(weight_chunks) if weight_chunks else np.empty(0, dtype=np.float32)
+
+        logger.info(
+            f"Índice de similitud construido: {game_count} juegos, {len(user_ids)} usuarios, "
+            f"{neighbors.size} vecinos (top {top_n})"
+        )
+        return cls(game_names, indptr, neighbors, weights)
+
+    @staticmethod
+    def _csr(rows: np.ndarray, cols: np.ndarray, row_count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Agrupa `cols` por `rows` en formato CSR"""
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(row_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=row_count), out=indptr[1:])
+        return indptr, cols[order]
+
+    @property
+    def size(self) -> int:
+        return len(self.game_names)
+
+    def neighbors_of(self, game_name: str) -> List[Tuple[str, float]]:
+        """Vecinos precalculados de un juego, de mayor a menor peso"""
+        game = self.game_ids.get(game_name)
+        if game is None:
+            return []
+        start, end = self.indptr[game], self.indptr[game + 1]
+        return [
+            (self.game_names[neighbor], weight.item())
+            for neighbor, weight in zip(self.neighbors[start:end], self.weights[start:end])
+        ]
+
+    def recommend(self, liked_games: Iterable[str], k: int, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """
+        Suma las listas de vecinos de los juegos que le gustan al usuario.
+        El coste depende solo del tamaño del perfil por N, no del grafo.
+        """
+        liked_ids = [self.game_ids[name] for name in liked_games if name in self.game_ids]
+        if k <= 0 or not liked_ids:
+            return []
+
+        slices = [slice(self.indptr[game], self.indptr[game + 1]) for game in liked_ids]
+        neighbors = np.concatenate([self.neighbors[s] for s in slices])
+        if not neighbors.size:
+            return []
+        weights = np.concatenate([self.weights[s] for s in slices]).astype(np.float64)
+
+        candidates, inverse = np.unique(neighbors, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+
+        excluded = {self.game_ids[name] for name in exclude if name in self.game_ids}
+        if excluded:
+            keep = ~np.isin(candidates, list(excluded))
+            candidates, scores = candidates[keep], scores[keep]
+
+        if candidates.size > k:
+            # Se conservan todos los empatados con el k-ésimo para desempatar por ID
+            keep = scores >= -np.partition(-scores, k - 1)[k - 1]
+            candidates, scores = candidates[keep], scores[keep]
+
+        order = np.lexsort((candidates, -scores))[:k]
+        return [(self.game_names[candidates[i]], scores[i].item()) for i in order]
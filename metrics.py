@@ -0,0 +1,136 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+from bisect import bisect_left
+import logging
+import threading
+import queries
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Límites superiores (segundos) de los histogramas de latencia
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNKNOWN_TEMPLATE = 'other'
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Contador monótono por combinación de etiquetas"""
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str]):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}')
+        return lines
+
+class Histogram:
+    """
+    Histograma con límites fijos. Cada observación solo hace una búsqueda
+    binaria y tres sumas bajo un lock; los acumulados se calculan al exportar.
+    """
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str],
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.label_names, labels, f'le="{_format_value(bound)}"')
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            series_labels = _format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{series_labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{series_labels} {cumulative}')
+        return lines
+
+QUERY_DURATION = Histogram(
+    'neo4j_query_duration_seconds', 'Latencia de las consultas Cypher por plantilla',
+    ('template', 'database')
+)
+QUERY_ROWS = Counter('neo4j_query_rows_total', 'Filas devueltas por plantilla', ('template', 'database'))
+QUERY_ERRORS = Counter('neo4j_query_errors_total', 'Consultas fallidas por plantilla', ('template', 'database'))
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones HTTP por endpoint',
+    ('endpoint', 'method', 'status')
+)
+
+METRICS = (QUERY_DURATION, QUERY_ROWS, QUERY_ERRORS, REQUEST_DURATION)
+
+# Texto de la consulta -> nombre estable de la plantilla. Las plantillas son
+# constantes de módulo, así que la búsqueda es un acceso a dict por petición.
+_TEMPLATE_NAMES: Dict[str, str] = {}
+
+def register_templates(namespace: Dict[str, object]):
+    """Registra las constantes *_QUERY de un módulo como plantillas con nombre"""
+    for name, value in namespace.items():
+        if name.endswith('_QUERY') and isinstance(value, str):
+            _TEMPLATE_NAMES[value] = name
+
+register_templates(vars(queries))
+
+def template_name(query: str) -> str:
+    return _TEMPLATE_NAMES.get(query, UNKNOWN_TEMPLATE)
+
+def observe_query(query: str, database: str, seconds: float, rows: int, failed: bool):
+    labels = (template_name(query), database)
+    QUERY_DURATION.observe(labels, seconds)
+    if failed:
+        QUERY_ERRORS.inc(labels)
+    else:
+        QUERY_ROWS.inc(labels, rows)
+
+def observe_request(endpoint: str, method: str, status: int, seconds: float):
+    REQUEST_DURATION.observe((endpoint, method, str(status)), seconds)
+
+def render_metrics(metrics: Iterable = METRICS) -> str:
+    """Todas las métricas en el formato de texto de Prometheus"""
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
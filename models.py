@@ -1,16 +1,21 @@
 from enum import Enum
-from typing import List, Optional
-from dataclasses import dataclass
+from typing import Iterable, List, Optional, Set
+from dataclasses import dataclass, field
 
 class RecommendationType(Enum):
     PERSONAL = "PERSONAL"
     COLLABORATIVE = "COLLABORATIVE"
+    HYBRID = "HYBRID"
+    POPULAR = "POPULAR"
 
 @dataclass
 class Recommendation:
+    # Se crean miles por petición en los lotes: sin __dict__ por instancia
+    __slots__ = ('game_id', 'game_name', 'score', 'recommendation_type')
+    
     game_id: str
     game_name: str
-    score: int
+    score: float
     recommendation_type: RecommendationType
     
     def to_dict(self):
@@ -21,6 +26,20 @@ class Recommendation:
             'type': self.recommendation_type.value
         }
 
+class RecommendationList(list):
+    """
+    Recomendaciones de una petición. `partial` indica que alguna base de
+    datos falló o superó el tiempo límite al calcularlas: se sirven, pero
+    no deben cachearse.
+    """
+    
+    def __init__(self, recommendations: Iterable[Recommendation] = (), partial: bool = False):
+        super().__init__(recommendations)
+        self.partial = partial
+
+def is_partial(recommendations) -> bool:
+    return getattr(recommendations, 'partial', False)
+
 @dataclass
 class VideoGame:
     id: str
@@ -58,3 +77,31 @@ class User:
             'playedGames': self.played_games,
             'likedGames': self.liked_games
         }
+
+@dataclass
+class UserProfile:
+    user_id: str
+    liked_games: Set[str] = field(default_factory=set)
+    played_games: Set[str] = field(default_factory=set)
+    genres: Set[str] = field(default_factory=set)
+    platforms: Set[str] = field(default_factory=set)
+    # Alguna base de datos no respondió al cargar el perfil
+    partial: bool = False
+    
+    @property
+    def interacted_games(self) -> Set[str]:
+        """Juegos que el usuario ha jugado o le han gustado"""
+        return self.liked_games | self.played_games
+    
+    @property
+    def is_empty(self) -> bool:
+        return not self.liked_games and not self.played_games
+    
+    def to_dict(self):
+        return {
+            'id': self.user_id,
+            'likedGames': sorted(self.liked_games),
+            'playedGames': sorted(self.played_games),
+            'genres': sorted(self.genres),
+            'platforms': sorted(self.platforms)
+        }
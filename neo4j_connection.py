@@ -1,21 +1,115 @@
-from neo4j import GraphDatabase
+from typing import Any, Dict, Iterator, Optional
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS, unit_of_work
 import logging
+import threading
+import time
+from metrics import observe_query
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def pool_settings(config) -> Dict[str, Any]:
+    """Parámetros del pool y de las transacciones tomados de Config"""
+    return {
+        'max_connection_pool_size': config.NEO4J_MAX_POOL_SIZE,
+        'max_connection_lifetime': config.NEO4J_MAX_CONNECTION_LIFETIME,
+        'connection_acquisition_timeout': config.NEO4J_ACQUISITION_TIMEOUT,
+        'max_transaction_retry_time': config.NEO4J_MAX_RETRY_TIME,
+        'query_timeout': config.NEO4J_QUERY_TIMEOUT or None,
+        'fetch_size': config.NEO4J_FETCH_SIZE
+    }
+
+def pool_connections(driver) -> Dict[str, Dict[str, int]]:
+    """
+    Conexiones abiertas y en uso por servidor. El driver no expone estas
+    cifras públicamente, así que se leen del pool interno si existe.
+    """
+    pool = getattr(driver, '_pool', None)
+    connections = getattr(pool, 'connections', None)
+    if not connections:
+        return {}
+    
+    report = {}
+    for address, address_connections in list(connections.items()):
+        address_connections = list(address_connections)
+        report[str(address)] = {
+            'open': len(address_connections),
+            'inUse': sum(1 for connection in address_connections if getattr(connection, 'in_use', False))
+        }
+    return report
+
+class PoolStatistics:
+    """Contadores de transacciones en curso, reintentos y fallos de una conexión"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.transactions = 0
+        self.retries = 0
+        self.failures = 0
+    
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+            self.transactions += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    
+    def end(self, attempts: int, failed: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.retries += max(attempts - 1, 0)
+            if failed:
+                self.failures += 1
+    
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'inFlight': self.in_flight,
+                'peakInFlight': self.peak_in_flight,
+                'transactions': self.transactions,
+                'retries': self.retries,
+                'failures': self.failures
+            }
+
 class Neo4jConnectionManager:
-    def __init__(self, uri, username, password):
+    """
+    Conexión a una base de datos Neo4j con pool configurable. Las consultas
+    se ejecutan como transacciones gestionadas (execute_read/execute_write)
+    que el driver reintenta ante errores transitorios; en un clúster las
+    lecturas se enrutan a las réplicas de lectura. Cada consulta registra
+    su latencia, filas y errores en metrics con el nombre de su plantilla.
+    """
+    
+    def __init__(self, uri, username, password, max_connection_pool_size: int = 100,
+                 max_connection_lifetime: float = 3600, connection_acquisition_timeout: float = 60,
+                 max_transaction_retry_time: float = 30, query_timeout: Optional[float] = None,
+                 fetch_size: int = 1000, name: str = 'neo4j'):
         self.uri = uri
+        self.name = name
         self.username = username
         self.password = password
+        self.max_connection_pool_size = max_connection_pool_size
+        self.max_connection_lifetime = max_connection_lifetime
+        self.connection_acquisition_timeout = connection_acquisition_timeout
+        self.max_transaction_retry_time = max_transaction_retry_time
+        self.query_timeout = query_timeout
+        self.fetch_size = fetch_size
+        self.stats = PoolStatistics()
         self.driver = None
         self._connect()
     
     def _connect(self):
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password))
-            logger.info(f"Conexión establecida con Neo4j en {self.uri}")
+            self.driver = GraphDatabase.driver(
+                self.uri,
+                auth=(self.username, self.password),
+                max_connection_pool_size=self.max_connection_pool_size,
+                max_connection_lifetime=self.max_connection_lifetime,
+                connection_acquisition_timeout=self.connection_acquisition_timeout,
+                max_transaction_retry_time=self.max_transaction_retry_time
+            )
+            logger.info(f"Conexión establecida con Neo4j en {self.uri} (pool de {self.max_connection_pool_size})")
         except Exception as e:
             logger.error(f"Error conectando a Neo4j: {e}")
             raise
@@ -31,30 +125,123 @@ class Neo4jConnectionManager:
             logger.error(f"Error en prueba de conexión: {e}")
             return False
     
-    def execute_query(self, query, parameters=None):
-        if parameters is None:
-            parameters = {}
+    def _run_managed(self, access_mode, query, parameters, timeout):
+        """
+        Ejecuta `query` en una transacción gestionada. Los registros se
+        materializan dentro de la función de transacción para que un
+        reintento del driver no devuelva un resultado ya consumido.
+        """
+        timeout = self.query_timeout if timeout is None else timeout
+        attempts = 0
+        
+        @unit_of_work(timeout=timeout)
+        def work(tx):
+            nonlocal attempts
+            attempts += 1
+            return tx.run(query, parameters or {}).data()
         
+        self.stats.begin()
+        started = time.perf_counter()
+        records = []
+        failed = True
         try:
-            with self.driver.session() as session:
-                result = session.run(query, parameters)
-                return result.data()
+            with self.driver.session(default_access_mode=access_mode) as session:
+                if access_mode == READ_ACCESS:
+                    records = session.execute_read(work)
+                else:
+                    records = session.execute_write(work)
+            failed = False
+            return records
+        finally:
+            self.stats.end(attempts, failed)
+            observe_query(query, self.name, time.perf_counter() - started, len(records), failed)
+    
+    def execute_read(self, query, parameters=None, timeout: Optional[float] = None):
+        """Consulta de solo lectura; se reintenta y se enruta a réplicas de lectura"""
+        try:
+            return self._run_managed(READ_ACCESS, query, parameters, timeout)
         except Exception as e:
             logger.error(f"Error ejecutando query: {e}")
             raise
     
-    def execute_write_transaction(self, query, parameters=None):
+    def execute_write(self, query, parameters=None, timeout: Optional[float] = None):
+        """Consulta de escritura en el líder; se reintenta ante errores transitorios"""
+        try:
+            return self._run_managed(WRITE_ACCESS, query, parameters, timeout)
+        except Exception as e:
+            logger.error(f"Error ejecutando transacción de escritura: {e}")
+            raise
+    
+    def execute_query(self, query, parameters=None, timeout: Optional[float] = None):
+        """Todas las consultas de los recomendadores son de lectura"""
+        return self.execute_read(query, parameters, timeout)
+    
+    def stream_query(self, query, parameters=None, fetch_size: Optional[int] = None,
+                     timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Consulta de lectura que entrega los registros uno a uno a medida que
+        llegan, pidiéndolos al servidor en lotes de `fetch_size`, sin
+        materializar el resultado completo. A diferencia de execute_read no
+        se reintenta, porque los registros ya entregados no se pueden
+        repetir. La sesión sigue abierta hasta agotar o cerrar el iterador.
+        """
+        timeout = self.query_timeout if timeout is None else timeout
+        fetch_size = self.fetch_size if fetch_size is None else fetch_size
+        
+        self.stats.begin()
+        started = time.perf_counter()
+        rows = 0
+        failed = True
+        try:
+            with self.driver.session(default_access_mode=READ_ACCESS, fetch_size=fetch_size) as session:
+                with session.begin_transaction(timeout=timeout) as tx:
+                    for record in tx.run(query, parameters or {}):
+                        rows += 1
+                        yield record.data()
+                    tx.commit()
+            failed = False
+        except GeneratorExit:
+            # El consumidor cerró el iterador antes de terminar
+            failed = False
+            raise
+        except Exception as e:
+            logger.error(f"Error ejecutando query en streaming: {e}")
+            raise
+        finally:
+            self.stats.end(1, failed)
+            observe_query(query, self.name, time.perf_counter() - started, rows, failed)
+    
+    def explain(self, query, parameters=None):
+        """Devuelve el plan de ejecución (EXPLAIN) de una consulta sin ejecutarla"""
         if parameters is None:
             parameters = {}
         
         try:
             with self.driver.session() as session:
-                result = session.write_transaction(lambda tx: tx.run(query, parameters))
-                return result
+                summary = session.run(f"EXPLAIN {query}", parameters).consume()
+                return summary.plan
         except Exception as e:
-            logger.error(f"Error ejecutando transacción de escritura: {e}")
+            logger.error(f"Error obteniendo el plan de la query: {e}")
             raise
     
+    def execute_write_transaction(self, query, parameters=None):
+        return self.execute_write(query, parameters)
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Configuración y uso del pool para dimensionarlo según la concurrencia"""
+        return {
+            'name': self.name,
+            'uri': self.uri,
+            'maxPoolSize': self.max_connection_pool_size,
+            'maxConnectionLifetime': self.max_connection_lifetime,
+            'acquisitionTimeout': self.connection_acquisition_timeout,
+            'maxRetryTime': self.max_transaction_retry_time,
+            'queryTimeout': self.query_timeout,
+            'fetchSize': self.fetch_size,
+            'transactions': self.stats.snapshot(),
+            'connections': pool_connections(self.driver)
+        }
+    
     def close(self):
         if self.driver:
             self.driver.close()
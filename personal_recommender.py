@@ -1,311 +1,524 @@
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Optional, Tuple
 from collections import defaultdict
 import logging
-from models import Recommendation, RecommendationType, VideoGame
+import threading
+from models import Recommendation, RecommendationList, RecommendationType, UserProfile, VideoGame
 from neo4j_connection import Neo4jConnectionManager
+from scoring_engine import CategoryScoringEngine
+from category_index import CategoryIndex
+from game_registry import GameEntry, canonical_game_id
+from index_snapshot import load_snapshot, write_snapshot
+from popularity import PopularityTables, with_popular_fallback
+from query_fanout import FanOutResult, QueryFanOut, get_shared_fanout
+from tracing import stage
+from user_profile import UserProfileLoader
+from queries import (
+    VGSALES_BATCH_GAME_ATTRIBUTES_QUERY,
+    VGSALES_FIND_GAME_QUERY,
+    VGSALES_FINGERPRINT_QUERY,
+    VGSALES_GAME_ATTRIBUTES_QUERY,
+    VGSALES_GENRES_QUERY,
+    VGSALES_PLATFORMS_QUERY,
+    VGSALES_TITLES_QUERY,
+    VIDEOGAMES_BATCH_GAME_ATTRIBUTES_QUERY,
+    VIDEOGAMES_DEVELOPERS_QUERY,
+    VIDEOGAMES_FIND_GAME_QUERY,
+    VIDEOGAMES_FINGERPRINT_QUERY,
+    VIDEOGAMES_GAME_ATTRIBUTES_QUERY,
+    VIDEOGAMES_TITLES_QUERY
+)
 
 logger = logging.getLogger(__name__)
 
+GENRE_WEIGHT = 2
+PLATFORM_WEIGHT = 1
+SHARED_ATTRIBUTE_WEIGHT = 1
+
+def build_personal_recommendations(top_games: List[Tuple[str, float]]) -> List[Recommendation]:
+    """Convierte los resultados del motor de puntuación en recomendaciones"""
+    return [
+        Recommendation(
+            game_id=canonical_game_id(game_name),
+            game_name=game_name,
+            score=int(score),
+            recommendation_type=RecommendationType.PERSONAL
+        )
+        for game_name, score in top_games
+    ]
+
+def rank_games(index: CategoryIndex, weighted_attributes: List[Tuple[str, str, float]], max_recommendations: int,
+               exclude: Set[str]) -> List[Recommendation]:
+    """Puntúa todos los juegos del índice y devuelve los mejores como recomendaciones"""
+    engine = index.scoring_engine
+    with stage('score'):
+        scores = engine.score(weighted_attributes)
+    with stage('sort'):
+        top_games = engine.top_k(scores, max_recommendations, exclude)
+    return build_personal_recommendations(top_games)
+
+def score_games_by_attributes(index: CategoryIndex, base_game_name: str, base_attributes: Dict[str, str],
+                              max_recommendations: int) -> List[Recommendation]:
+    """Puntúa los juegos por número de atributos compartidos con el juego base"""
+    weighted_attributes = [
+        (attribute_type, attribute_value, SHARED_ATTRIBUTE_WEIGHT)
+        for attribute_type, attribute_value in base_attributes.items()
+    ]
+    
+    return rank_games(index, weighted_attributes, max_recommendations, {index.registry.display_name(base_game_name)})
+
+def score_games_by_preferences(index: CategoryIndex, preferred_genres: Set[str], preferred_platforms: Set[str],
+                               user_games: Set[str], max_recommendations: int) -> List[Recommendation]:
+    """Puntúa los juegos por géneros y plataformas preferidos del usuario"""
+    weighted_attributes = [('genre', genre, GENRE_WEIGHT) for genre in preferred_genres]
+    weighted_attributes += [('platform', platform, PLATFORM_WEIGHT) for platform in preferred_platforms]
+    
+    display_name = index.registry.display_name
+    return rank_games(index, weighted_attributes, max_recommendations, {display_name(game) for game in user_games})
+
+def parse_game_attributes(vgsales_rows: List[Dict], videogames_rows: List[Dict]) -> Dict[str, str]:
+    """Extrae género, plataforma y desarrollador de las relaciones de un juego"""
+    attributes = {}
+    
+    for record in vgsales_rows:
+        labels = record['labels']
+        attr = record['attr']
+        
+        if attr is None:
+            continue
+        elif 'Genre' in labels:
+            attributes['genre'] = attr.get('name', '')
+        elif 'Platform' in labels:
+            attributes['platform'] = attr.get('name', '')
+    
+    for record in videogames_rows:
+        labels = record['labels']
+        attr = record['attr']
+        
+        if attr is not None and 'Developer' in labels:
+            attributes['developer'] = attr.get('name', '')
+    
+    return attributes
+
+def game_attribute_queries(vgsales_connection, videogames_connection, game_name: str,
+                           entry: Optional[GameEntry] = None) -> Dict:
+    """
+    Consultas de atributos de un juego, en formato de QueryFanOut. Con una
+    entrada del registro solo se consultan las bases de datos que contienen
+    el juego, cada una con su propio título.
+    """
+    queries = {
+        'vgsales': (vgsales_connection, VGSALES_GAME_ATTRIBUTES_QUERY),
+        'videogames': (videogames_connection, VIDEOGAMES_GAME_ATTRIBUTES_QUERY)
+    }
+    if entry is None:
+        return {source: (connection, query, {'name': game_name}) for source, (connection, query) in queries.items()}
+    
+    return {
+        source: (queries[source][0], queries[source][1], {'name': entry.title_in(source)})
+        for source in entry.sources
+    }
+
+def batch_game_attribute_queries(vgsales_connection, videogames_connection, game_names: List[str]) -> Dict:
+    """Consultas UNWIND de atributos de varios juegos, en formato de QueryFanOut"""
+    params = {'names': game_names}
+    return {
+        'vgsales': (vgsales_connection, VGSALES_BATCH_GAME_ATTRIBUTES_QUERY, params),
+        'videogames': (videogames_connection, VIDEOGAMES_BATCH_GAME_ATTRIBUTES_QUERY, params)
+    }
+
+def parse_games_attributes_batch(game_names: List[str], result: FanOutResult) -> Dict[str, Dict[str, str]]:
+    """Atributos por juego de las consultas por lotes; omite los juegos inexistentes"""
+    vgsales_rows = defaultdict(list)
+    for record in result.rows('vgsales'):
+        vgsales_rows[record['name']].append(record)
+    
+    videogames_rows = defaultdict(list)
+    for record in result.rows('videogames'):
+        videogames_rows[record['name']].append(record)
+    
+    return {
+        name: parse_game_attributes(vgsales_rows.get(name, []), videogames_rows.get(name, []))
+        for name in game_names if name in vgsales_rows or name in videogames_rows
+    }
+
 class PersonalRecommenderService:
-    def __init__(self, vgsales_connection: Neo4jConnectionManager, videogames_connection: Neo4jConnectionManager):
+    def __init__(self, vgsales_connection: Neo4jConnectionManager, videogames_connection: Neo4jConnectionManager,
+                 snapshot_path: Optional[str] = None, fanout: Optional[QueryFanOut] = None,
+                 popularity: Optional[PopularityTables] = None):
         self.vgsales_conn = vgsales_connection
         self.videogames_conn = videogames_connection
-        self.genre_games_map = defaultdict(set)
-        self.platform_games_map = defaultdict(set)
-        self.developer_games_map = defaultdict(set)
+        self.fanout = fanout or get_shared_fanout()
+        self.profile_loader = UserProfileLoader(vgsales_connection, videogames_connection, self.fanout)
+        self.snapshot_path = snapshot_path
+        # Tablas de ventas de vgsales.csv: respaldo de arranque en frío y desempate
+        self.popularity = popularity
+        self.category_index = CategoryIndex().finalize()
+        self._refresh_lock = threading.Lock()
         
         self._initialize_category_maps()
     
+    @property
+    def genre_games_map(self) -> Dict[str, Set[str]]:
+        return self.category_index.genre_games_map
+    
+    @property
+    def platform_games_map(self) -> Dict[str, Set[str]]:
+        return self.category_index.platform_games_map
+    
+    @property
+    def developer_games_map(self) -> Dict[str, Set[str]]:
+        return self.category_index.developer_games_map
+    
+    @property
+    def game_attributes_map(self) -> Dict[str, Dict[str, str]]:
+        return self.category_index.game_attributes_map
+    
+    @property
+    def scoring_engine(self) -> CategoryScoringEngine:
+        return self.category_index.scoring_engine
+    
     def _initialize_category_maps(self):
-        """Inicializa los mapas de categorías con datos de ambas bases de datos"""
+        """
+        Inicializa los mapas de categorías con datos de ambas bases de datos.
+        En la misma pasada construye el índice inverso juego -> atributos.
+        """
         try:
-            vgsales_genres = self.vgsales_conn.execute_query(
-                "MATCH (game:VideoGame)-[:BELONGS_TO_GENRE]->(genre:Genre) "
-                "RETURN game.Name as gameName, genre.name as genreName"
-            )
-            
-            for record in vgsales_genres:
-                game_name = record['gameName']
-                genre_name = record['genreName']
-                self.genre_games_map[genre_name].add(game_name)
+            with self._refresh_lock:
+                fingerprint = self._database_fingerprint() if self.snapshot_path else None
+                
+                index = load_snapshot(self.snapshot_path, fingerprint) if self.snapshot_path else None
+                if index is not None:
+                    self._install_index(index)
+                    logger.info(f"Mapas de categorías cargados desde snapshot {self.snapshot_path}")
+                    return
+                
+                self._install_index(self._load_category_index(CategoryIndex()))
+                self._save_snapshot(self.category_index, fingerprint)
             
-            vgsales_platforms = self.vgsales_conn.execute_query(
-                "MATCH (game:VideoGame)-[:AVAILABLE_ON]->(platform:Platform) "
-                "RETURN game.Name as gameName, platform.name as platformName"
-            )
+            logger.info("Mapas de categorías inicializados correctamente")
             
-            for record in vgsales_platforms:
-                game_name = record['gameName']
-                platform_name = record['platformName']
-                self.platform_games_map[platform_name].add(game_name)
+        except Exception as e:
+            logger.error(f"Error inicializando mapas de categorías: {e}")
+            raise
+    
+    def refresh_category_maps(self, full: bool = False) -> int:
+        """
+        Carga los juegos nuevos desde el último refresco (según el ID interno
+        más alto visto en cada base de datos) sobre una copia del índice y
+        la intercambia de forma atómica. Devuelve el número de juegos añadidos.
+        La marca de agua es aproximada (ver queries.py); con full=True se
+        reconstruye todo y se corrige lo que el modo incremental no ve.
+        """
+        with self._refresh_lock:
+            current = self.category_index
+            base = CategoryIndex() if full else current.copy()
             
-            videogames_devs = self.videogames_conn.execute_query(
-                "MATCH (game:Videojuego)-[:DEVELOPED_BY]->(developer:Developer) "
-                "RETURN game.nombre as gameName, developer.name as developerName"
-            )
+            # Solo una reconstrucción completa refleja aristas nuevas de juegos
+            # existentes y borrados; la huella se toma antes de cargar para no
+            # certificar escrituras que lleguen durante la carga
+            fingerprint = self._database_fingerprint() if full and self.snapshot_path else None
             
-            for record in videogames_devs:
-                game_name = record['gameName']
-                developer_name = record['developerName']
-                self.developer_games_map[developer_name].add(game_name)
+            refreshed = self._load_category_index(base)
+            added = refreshed.game_count - (0 if full else current.game_count)
             
-            logger.info("Mapas de categorías inicializados correctamente")
+            if full or refreshed.watermarks != current.watermarks:
+                self._install_index(refreshed)
+                if fingerprint is not None:
+                    self._save_snapshot(refreshed, fingerprint)
             
+            logger.info(f"Mapas de categorías refrescados: {added} juegos nuevos")
+            return added
+    
+    def _install_index(self, index: CategoryIndex):
+        """Publica un índice nuevo con las ventas de cada juego como prior de desempate"""
+        if self.popularity is not None:
+            index.scoring_engine.prior = self.popularity.prior(index.scoring_engine.game_names)
+        self.category_index = index
+    
+    def _database_fingerprint(self) -> Dict[str, Dict[str, int]]:
+        """
+        Huella barata de ambas bases de datos (conteos servidos por el
+        almacén de conteos de Neo4j) para validar el snapshot del índice.
+        """
+        vgsales = self.vgsales_conn.execute_query(
+            VGSALES_FINGERPRINT_QUERY
+        )
+        
+        videogames = self.videogames_conn.execute_query(
+            VIDEOGAMES_FINGERPRINT_QUERY
+        )
+        
+        return {
+            'vgsales': vgsales[0] if vgsales else {},
+            'videogames': videogames[0] if videogames else {}
+        }
+    
+    def _save_snapshot(self, index: CategoryIndex, fingerprint: Optional[Dict[str, Dict[str, int]]]):
+        """Escribe el snapshot del índice; un fallo aquí no es fatal"""
+        if not self.snapshot_path:
+            return
+        
+        try:
+            write_snapshot(self.snapshot_path, index, fingerprint)
         except Exception as e:
-            logger.error(f"Error inicializando mapas de categorías: {e}")
-            raise
+            logger.warning(f"No se pudo escribir el snapshot del índice: {e}")
+    
+    def _load_category_index(self, index: CategoryIndex) -> CategoryIndex:
+        """
+        Añade al índice los juegos con ID interno mayor que su marca de agua.
+        Las filas se consumen en streaming: cada una se incorpora al índice
+        al llegar, sin materializar antes el resultado completo de la consulta.
+        """
+        vgsales_watermark = index.watermarks['vgsales']
+        videogames_watermark = index.watermarks['videogames']
+        
+        index.ingest('genre', self.vgsales_conn.stream_query(
+            VGSALES_GENRES_QUERY,
+            {'watermark': vgsales_watermark}
+        ))
+        
+        index.ingest('platform', self.vgsales_conn.stream_query(
+            VGSALES_PLATFORMS_QUERY,
+            {'watermark': vgsales_watermark}
+        ))
+        
+        index.ingest('developer', self.videogames_conn.stream_query(
+            VIDEOGAMES_DEVELOPERS_QUERY,
+            {'watermark': videogames_watermark}
+        ))
+        
+        index.ingest_titles('vgsales', self.vgsales_conn.stream_query(
+            VGSALES_TITLES_QUERY,
+            {'watermark': vgsales_watermark}
+        ))
+        
+        index.ingest_titles('videogames', self.videogames_conn.stream_query(
+            VIDEOGAMES_TITLES_QUERY,
+            {'watermark': videogames_watermark}
+        ))
+        
+        return index.finalize()
     
     def recommend_games_by_game(self, base_game_name: str, max_recommendations: int) -> List[Recommendation]:
         """
         Recomienda juegos basándose en un juego base.
-        Busca el nodo del videojuego, obtiene sus atributos relacionados,
-        cuenta atributos compartidos y asigna puntuaciones.
+        Resuelve el juego y sus atributos desde el índice en memoria
+        (o desde Neo4j si no está indexado), cuenta atributos compartidos
+        y asigna puntuaciones. Si el juego no existe o no comparte atributos
+        con ningún otro, se recurre a los más vendidos.
         """
         try:
-            base_game = self._find_game_node(base_game_name)
-            if not base_game:
+            index = self.category_index
+            base_attributes, partial = self._resolve_game_attributes(base_game_name, index)
+            if base_attributes is None:
                 logger.warning(f"Juego base '{base_game_name}' no encontrado")
-                return []
-            
-            base_attributes = self._get_game_attributes(base_game_name)
-            
-            game_scores = defaultdict(int)
-            game_names = {}
-            
-            for attribute_type, attribute_value in base_attributes.items():
-                games_with_attribute = self._get_games_with_attribute(attribute_type, attribute_value)
-                
-                for game_name in games_with_attribute:
-                    if game_name != base_game_name:
-                        game_scores[game_name] += 1
-                        game_names[game_name] = game_name
-            
-            recommendations = []
-            sorted_games = sorted(game_scores.items(), key=lambda x: x[1], reverse=True)
-            
-            for game_name, score in sorted_games[:max_recommendations]:
-                recommendations.append(Recommendation(
-                    game_id=game_name,
-                    game_name=game_names[game_name],
-                    score=score,
-                    recommendation_type=RecommendationType.PERSONAL
-                ))
+                return RecommendationList(
+                    with_popular_fallback([], self.popularity, max_recommendations, exclude=[base_game_name], partial=partial),
+                    partial
+                )
+            
+            recommendations = with_popular_fallback(
+                score_games_by_attributes(index, base_game_name, base_attributes, max_recommendations),
+                self.popularity, max_recommendations, exclude=[base_game_name], attributes=base_attributes,
+                partial=partial
+            )
             
             logger.info(f"Generadas {len(recommendations)} recomendaciones para '{base_game_name}'")
-            return recommendations
+            return RecommendationList(recommendations, partial)
             
         except Exception as e:
             logger.error(f"Error generando recomendaciones por juego: {e}")
             raise
     
-    def recommend_games_by_user_preferences(self, user_id: str, max_recommendations: int) -> List[Recommendation]:
-        """Recomienda juegos basándose en las preferencias del usuario"""
+    def recommend_games_by_user_preferences(self, user_id: str, max_recommendations: int,
+                                            profile: Optional[UserProfile] = None) -> List[Recommendation]:
+        """
+        Recomienda juegos basándose en las preferencias del usuario.
+        Acepta un perfil ya cargado para reutilizarlo entre estrategias.
+        """
         try:
-            preferred_genres = self._get_user_preferred_genres(user_id)
-            
-            preferred_platforms = self._get_user_preferred_platforms(user_id)
-            
-            user_games = self._get_user_games(user_id)
-            
-            game_scores = defaultdict(int)
-            game_names = {}
-            
-            for genre in preferred_genres:
-                for game_name in self.genre_games_map.get(genre, set()):
-                    if game_name not in user_games:
-                        game_scores[game_name] += 2  
-                        game_names[game_name] = game_name
-            
-            for platform in preferred_platforms:
-                for game_name in self.platform_games_map.get(platform, set()):
-                    if game_name not in user_games:
-                        game_scores[game_name] += 1  
-                        game_names[game_name] = game_name
-            
-            recommendations = []
-            sorted_games = sorted(game_scores.items(), key=lambda x: x[1], reverse=True)
-            
-            for game_name, score in sorted_games[:max_recommendations]:
-                recommendations.append(Recommendation(
-                    game_id=game_name,
-                    game_name=game_names[game_name],
-                    score=score,
-                    recommendation_type=RecommendationType.PERSONAL
-                ))
+            if profile is None:
+                with stage('profile_fetch'):
+                    profile = self.profile_loader.load(user_id)
+            
+            recommendations = with_popular_fallback(
+                score_games_by_preferences(
+                    self.category_index, profile.genres, profile.platforms, profile.interacted_games, max_recommendations
+                ),
+                self.popularity, max_recommendations, exclude=profile.interacted_games, partial=profile.partial
+            )
             
             logger.info(f"Generadas {len(recommendations)} recomendaciones para usuario '{user_id}'")
-            return recommendations
+            return RecommendationList(recommendations, profile.partial)
             
         except Exception as e:
             logger.error(f"Error generando recomendaciones por preferencias: {e}")
             raise
     
-    def search_games(self, query: str) -> List[Dict]:
-        """Busca juegos por nombre en ambas bases de datos"""
+    def recommend_games_by_game_batch(self, game_names: List[str], max_recommendations: int) -> Dict[str, List[Recommendation]]:
+        """
+        Recomendaciones por juego para un lote de juegos. Los juegos indexados
+        se resuelven en memoria y el resto con una consulta UNWIND por base de
+        datos; si alguna no responde, los resultados de esos juegos son parciales.
+        """
         try:
-            games = []
-            
-            vgsales_games = self.vgsales_conn.execute_query(
-                "MATCH (game:VideoGame) "
-                "WHERE toLower(game.Name) CONTAINS toLower($query) "
-                "RETURN game.Name as name "
-                "LIMIT 10",
-                {'query': query}
-            )
+            index = self.category_index
+            attributes_by_game = {}
+            for name in game_names:
+                entry = index.registry.resolve(name)
+                attributes = index.attributes_for(entry) if entry is not None else None
+                if attributes:
+                    attributes_by_game[name] = attributes
+            
+            missing = [name for name in game_names if name not in attributes_by_game]
+            degraded = set()
+            if missing:
+                fetched, partial = self._get_games_attributes_batch(missing)
+                attributes_by_game.update(fetched)
+                if partial:
+                    degraded.update(missing)
+            
+            results = {}
+            for name in game_names:
+                base_attributes = attributes_by_game.get(name)
+                if base_attributes is None:
+                    recommendations = []
+                else:
+                    recommendations = score_games_by_attributes(index, name, base_attributes, max_recommendations)
+                results[name] = RecommendationList(
+                    with_popular_fallback(
+                        recommendations, self.popularity, max_recommendations, exclude=[name], attributes=base_attributes,
+                        partial=name in degraded
+                    ),
+                    name in degraded
+                )
+            
+            logger.info(f"Generadas recomendaciones por juego para un lote de {len(game_names)} juegos")
+            return results
             
-            for record in vgsales_games:
-                games.append({'name': record['name'], 'source': 'vgsales'})
-            
-            videogames_games = self.videogames_conn.execute_query(
-                "MATCH (game:Videojuego) "
-                "WHERE toLower(game.nombre) CONTAINS toLower($query) "
-                "RETURN game.nombre as name "
-                "LIMIT 10",
-                {'query': query}
-            )
-            
-            for record in videogames_games:
-                games.append({'name': record['name'], 'source': 'videogames'})
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por juego en lote: {e}")
+            raise
+    
+    def recommend_games_by_user_preferences_batch(self, user_ids: List[str], max_recommendations: int) -> Dict[str, List[Recommendation]]:
+        """
+        Recomendaciones por preferencias para un lote de usuarios con un
+        número fijo de consultas, independiente del tamaño del lote.
+        """
+        try:
+            index = self.category_index
+            profiles = self.profile_loader.load_many(user_ids)
+            
+            results = {}
+            for user_id in user_ids:
+                profile = profiles[user_id]
+                results[user_id] = RecommendationList(
+                    with_popular_fallback(
+                        score_games_by_preferences(
+                            index, profile.genres, profile.platforms, profile.interacted_games, max_recommendations
+                        ),
+                        self.popularity, max_recommendations, exclude=profile.interacted_games,
+                        partial=profile.partial
+                    ),
+                    profile.partial
+                )
+            
+            logger.info(f"Generadas recomendaciones por preferencias para un lote de {len(user_ids)} usuarios")
+            return results
             
-            return games
+        except Exception as e:
+            logger.error(f"Error generando recomendaciones por preferencias en lote: {e}")
+            raise
+    
+    def search_games(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Busca juegos por nombre en el índice de n-gramas en memoria, que se
+        actualiza junto con los mapas de categorías.
+        """
+        try:
+            return self.category_index.search_index.search(query, limit)
             
         except Exception as e:
             logger.error(f"Error buscando juegos: {e}")
             raise
     
-    def _find_game_node(self, game_name: str) -> Dict:
-        """Busca un juego en ambas bases de datos"""
-        vgsales_result = self.vgsales_conn.execute_query(
-            "MATCH (game:VideoGame {Name: $name}) RETURN game",
-            {'name': game_name}
-        )
-        
-        if vgsales_result:
-            return vgsales_result[0]['game']
+    def _resolve_game_attributes(self, game_name: str, index: CategoryIndex) -> Tuple[Optional[Dict[str, str]], bool]:
+        """
+        Obtiene los atributos de un juego desde el registro y el índice
+        inverso. Un juego registrado sin atributos se consulta solo en las
+        bases de datos que lo contienen; uno desconocido, en ambas. Devuelve
+        también si alguna consulta quedó incompleta.
+        """
+        with stage('lookup'):
+            entry = index.registry.resolve(game_name)
+            attributes = index.attributes_for(entry) if entry is not None else None
         
-        videogames_result = self.videogames_conn.execute_query(
-            "MATCH (game:Videojuego {nombre: $name}) RETURN game",
-            {'name': game_name}
-        )
+        if entry is None:
+            with stage('node_lookup'):
+                node, lookup_partial = self._find_game_node(game_name)
+            if not node:
+                return None, lookup_partial
+            with stage('attribute_fetch'):
+                attributes, partial = self._get_game_attributes(game_name)
+            return attributes, lookup_partial or partial
         
-        if videogames_result:
-            return videogames_result[0]['game']
+        if attributes:
+            return attributes, False
         
-        return None
+        with stage('attribute_fetch'):
+            return self._get_game_attributes(game_name, entry)
     
-    def _get_game_attributes(self, game_name: str) -> Dict[str, str]:
-        """Obtiene todos los atributos relacionados a un videojuego"""
-        attributes = {}
+    def _find_game_node(self, game_name: str) -> Tuple[Optional[Dict], bool]:
+        """
+        Busca un juego en ambas bases de datos en paralelo. Devuelve el nodo
+        (o None) y si alguna base de datos no respondió: en ese caso un
+        "no encontrado" no es definitivo.
+        """
+        result = self.fanout.run({
+            'vgsales': (
+                self.vgsales_conn,
+                VGSALES_FIND_GAME_QUERY,
+                {'name': game_name}
+            ),
+            'videogames': (
+                self.videogames_conn,
+                VIDEOGAMES_FIND_GAME_QUERY,
+                {'name': game_name}
+            )
+        })
         
-        vgsales_attrs = self.vgsales_conn.execute_query(
-            "MATCH (game:VideoGame {Name: $name})-[r]-(attr) "
-            "RETURN type(r) as relationType, labels(attr) as labels, attr",
-            {'name': game_name}
-        )
+        if result.failed:
+            raise RuntimeError(f"Búsqueda de '{game_name}' fallida en ambas bases de datos: {result.errors}")
         
-        for record in vgsales_attrs:
-            rel_type = record['relationType']
-            labels = record['labels']
-            attr = record['attr']
-            
-            if 'Genre' in labels:
-                attributes['genre'] = attr.get('name', '')
-            elif 'Platform' in labels:
-                attributes['platform'] = attr.get('name', '')
+        for source in ('vgsales', 'videogames'):
+            rows = result.rows(source)
+            if rows:
+                return rows[0]['game'], result.partial
         
-        videogames_attrs = self.videogames_conn.execute_query(
-            "MATCH (game:Videojuego {nombre: $name})-[r]-(attr) "
-            "RETURN type(r) as relationType, labels(attr) as labels, attr",
-            {'name': game_name}
+        return None, result.partial
+    
+    def _get_game_attributes(self, game_name: str, entry: Optional[GameEntry] = None) -> Tuple[Dict[str, str], bool]:
+        """Obtiene todos los atributos relacionados a un videojuego y si la consulta quedó incompleta"""
+        result = self.fanout.run(
+            game_attribute_queries(self.vgsales_conn, self.videogames_conn, game_name, entry)
         )
         
-        for record in videogames_attrs:
-            rel_type = record['relationType']
-            labels = record['labels']
-            attr = record['attr']
-            
-            if 'Developer' in labels:
-                attributes['developer'] = attr.get('name', '')
+        if result.failed:
+            raise RuntimeError(f"Atributos de '{game_name}' no disponibles en ninguna base de datos: {result.errors}")
         
-        return attributes
+        return parse_game_attributes(result.rows('vgsales'), result.rows('videogames')), result.partial
     
-    def _get_games_with_attribute(self, attribute_type: str, attribute_value: str) -> Set[str]:
-        """Obtiene juegos que comparten un atributo específico"""
-        if attribute_type == 'genre':
-            return self.genre_games_map.get(attribute_value, set())
-        elif attribute_type == 'platform':
-            return self.platform_games_map.get(attribute_value, set())
-        elif attribute_type == 'developer':
-            return self.developer_games_map.get(attribute_value, set())
+    def _get_games_attributes_batch(self, game_names: List[str]) -> Tuple[Dict[str, Dict[str, str]], bool]:
+        """
+        Obtiene los atributos de varios juegos no indexados; omite los
+        inexistentes. Devuelve también si alguna base de datos no respondió.
+        """
+        result = self.fanout.run(
+            batch_game_attribute_queries(self.vgsales_conn, self.videogames_conn, game_names)
+        )
         
-        return set()
-    
-    def _get_user_preferred_genres(self, user_id: str) -> Set[str]:
-        """Obtiene géneros preferidos del usuario"""
-        try:
-
-            vgsales_genres = self.vgsales_conn.execute_query(
-                "MATCH (user:User {id: $userId})-[:LIKES]->(game:VideoGame)-[:BELONGS_TO_GENRE]->(genre:Genre) "
-                "RETURN DISTINCT genre.name as genreName",
-                {'userId': user_id}
-            )
-            
-            videogames_genres = self.videogames_conn.execute_query(
-                "MATCH (user:User {id: $userId})-[:LIKES]->(game:Videojuego)-[:BELONGS_TO_GENRE]->(genre:Genre) "
-                "RETURN DISTINCT genre.name as genreName",
-                {'userId': user_id}
-            )
-            
-            genres = set()
-            for record in vgsales_genres + videogames_genres:
-                genres.add(record['genreName'])
-            
-            return genres
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo géneros preferidos: {e}")
-            return set()
-    
-    def _get_user_preferred_platforms(self, user_id: str) -> Set[str]:
-        """Obtiene plataformas preferidas del usuario"""
-        try:
-            vgsales_platforms = self.vgsales_conn.execute_query(
-                "MATCH (user:User {id: $userId})-[:LIKES]->(game:VideoGame)-[:AVAILABLE_ON]->(platform:Platform) "
-                "RETURN DISTINCT platform.name as platformName",
-                {'userId': user_id}
-            )
-            
-            platforms = set()
-            for record in vgsales_platforms:
-                platforms.add(record['platformName'])
-            
-            return platforms
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo plataformas preferidas: {e}")
-            return set()
+        if result.failed:
+            raise RuntimeError(f"Atributos del lote no disponibles en ninguna base de datos: {result.errors}")
+        
+        return parse_games_attributes_batch(game_names, result), result.partial
     
-    def _get_user_games(self, user_id: str) -> Set[str]:
-        """Obtiene juegos que el usuario ha jugado o le han gustado"""
-        try:
-            vgsales_games = self.vgsales_conn.execute_query(
-                "MATCH (user:User {id: $userId})-[:PLAYED|LIKES]->(game:VideoGame) "
-                "RETURN DISTINCT game.Name as gameName",
-                {'userId': user_id}
-            )
-            
-            videogames_games = self.videogames_conn.execute_query(
-                "MATCH (user:User {id: $userId})-[:PLAYED|LIKES]->(game:Videojuego) "
-                "RETURN DISTINCT game.nombre as gameName",
-                {'userId': user_id}
-            )
-            
-            games = set()
-            for record in vgsales_games + videogames_games:
-                games.add(record['gameName'])
-            
-            return games
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo juegos del usuario: {e}")
-            return set()
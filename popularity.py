@@ -0,0 +1,172 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from collections import defaultdict
+import logging
+import os
+import numpy as np
+from models import Recommendation, RecommendationType
+from game_registry import canonical_game_id, canonical_title
+
+logger = logging.getLogger(__name__)
+
+# región de la API -> columna de ventas de vgsales.csv
+SALES_REGIONS = {
+    'global': 'Global_Sales',
+    'na': 'NA_Sales',
+    'eu': 'EU_Sales',
+    'jp': 'JP_Sales'
+}
+
+DIMENSIONS = ('genre', 'platform', 'year')
+
+class InvalidPopularityQueryError(ValueError):
+    """Región o filtro de popularidad no válido"""
+    status_code = 400
+
+def parse_popularity_filter(params: Mapping[str, str]) -> Tuple[str, Optional[str], object]:
+    """Región y filtro opcional (genre, platform o year) de una consulta de popularidad"""
+    region = (params.get('region') or 'global').lower()
+    if region not in SALES_REGIONS:
+        raise InvalidPopularityQueryError(f"Región desconocida: {region}")
+
+    filters = [dimension for dimension in DIMENSIONS if params.get(dimension)]
+    if len(filters) > 1:
+        raise InvalidPopularityQueryError('Solo se admite un filtro: genre, platform o year')
+    if not filters:
+        return region, None, None
+
+    dimension = filters[0]
+    value = params[dimension].strip()
+    if dimension == 'year':
+        try:
+            value = int(value)
+        except ValueError:
+            raise InvalidPopularityQueryError('year debe ser un entero')
+    return region, dimension, value
+
+class PopularityTables:
+    """
+    Rankings de ventas precalculados desde vgsales.csv: global y por género,
+    plataforma y año, para cada región. Cada ranking guarda los
+    `table_size` títulos más vendidos, así que servir una consulta es un
+    acceso a dict y un recorte de lista. Los títulos repetidos en varias
+    plataformas suman sus ventas.
+    """
+
+    def __init__(self, rows: Iterable[Dict], table_size: int = 100):
+        self.table_size = table_size
+        # (región, dimensión, valor) -> [(título, ventas)] en orden descendente
+        self.tables: Dict[Tuple[str, Optional[str], object], List[Tuple[str, float]]] = {}
+        # título canónico -> ventas globales, para el prior de desempate
+        self._global_sales: Dict[str, float] = {}
+
+        display_names: Dict[str, str] = {}
+        totals = {region: defaultdict(float) for region in SALES_REGIONS}
+        by_dimension = {
+            (region, dimension): defaultdict(lambda: defaultdict(float))
+            for region in SALES_REGIONS for dimension in DIMENSIONS
+        }
+
+        for row in rows:
+            key = canonical_title(row['name'])
+            if not key:
+                continue
+            display_names.setdefault(key, row['name'])
+            values = {'genre': row.get('genre'), 'platform': row.get('platform'), 'year': row['sales'].get('Year')}
+            for region, column in SALES_REGIONS.items():
+                sales = row['sales'].get(column)
+                if not sales:
+                    continue
+                totals[region][key] += sales
+                for dimension, value in values.items():
+                    if value is not None:
+                        by_dimension[(region, dimension)][value][key] += sales
+
+        for region in SALES_REGIONS:
+            self.tables[(region, None, None)] = self._ranked(totals[region], display_names)
+            for dimension in DIMENSIONS:
+                for value, sales in by_dimension[(region, dimension)].items():
+                    self.tables[(region, dimension, value)] = self._ranked(sales, display_names)
+
+        self._global_sales = dict(totals['global'])
+        logger.info(f"Tablas de popularidad construidas: {len(display_names)} juegos, {len(self.tables)} rankings")
+
+    def _ranked(self, sales: Dict[str, float], display_names: Dict[str, str]) -> List[Tuple[str, float]]:
+        ranked = sorted(sales.items(), key=lambda item: (-item[1], display_names[item[0]]))
+        return [(display_names[key], round(total, 2)) for key, total in ranked[:self.table_size]]
+
+    @classmethod
+    def from_csv(cls, path: str, table_size: int = 100) -> 'PopularityTables':
+        # Importación diferida: bulk_loader arrastra las plantillas de carga
+        from bulk_loader import DATASETS, stream_rows
+        return cls(stream_rows(path, DATASETS['vgsales']), table_size)
+
+    def top(self, k: int, region: str = 'global', dimension: Optional[str] = None, value=None,
+            exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Los k títulos más vendidos de un ranking; vacío si el ranking no existe"""
+        table = self.tables.get((region, dimension, value if dimension else None), [])
+        exclude = {canonical_title(name) for name in exclude}
+        if not exclude:
+            return table[:max(k, 0)]
+        return [(name, sales) for name, sales in table if canonical_title(name) not in exclude][:max(k, 0)]
+
+    def sales_of(self, title: str) -> float:
+        return self._global_sales.get(canonical_title(title), 0.0)
+
+    def prior(self, game_names: Sequence[str]) -> np.ndarray:
+        """Ventas globales alineadas con una lista de nombres; 0 si el juego no está en vgsales"""
+        return np.fromiter((self.sales_of(name) for name in game_names), dtype=np.float64, count=len(game_names))
+
+def load_popularity(path: str, table_size: int = 100) -> Optional[PopularityTables]:
+    """Carga las tablas si el CSV existe; sin él los servicios no tienen respaldo de popularidad"""
+    if not path:
+        return None
+    if not os.path.exists(path):
+        logger.warning(f"No se encontró {path}; recomendaciones de popularidad deshabilitadas")
+        return None
+
+    try:
+        return PopularityTables.from_csv(path, table_size)
+    except Exception as e:
+        logger.warning(f"No se pudieron construir las tablas de popularidad: {e}")
+        return None
+
+def popular_recommendations(popularity: Optional[PopularityTables], max_recommendations: int,
+                            exclude: Iterable[str] = (), attributes: Optional[Dict[str, str]] = None) -> List[Recommendation]:
+    """
+    Los juegos más vendidos como recomendaciones. Con atributos de un juego
+    base se usa el ranking de su género o, si no, de su plataforma.
+    """
+    if popularity is None:
+        return []
+
+    top = []
+    for dimension in ('genre', 'platform'):
+        if attributes and attributes.get(dimension):
+            top = popularity.top(max_recommendations, dimension=dimension, value=attributes[dimension], exclude=exclude)
+            if top:
+                break
+    if not top:
+        top = popularity.top(max_recommendations, exclude=exclude)
+
+    return [
+        Recommendation(
+            game_id=canonical_game_id(name),
+            game_name=name,
+            score=sales,
+            recommendation_type=RecommendationType.POPULAR
+        )
+        for name, sales in top
+    ]
+
+def with_popular_fallback(recommendations: List[Recommendation], popularity: Optional[PopularityTables],
+                          max_recommendations: int, exclude: Iterable[str] = (),
+                          attributes: Optional[Dict[str, str]] = None, partial: bool = False) -> List[Recommendation]:
+    """
+    Devuelve las recomendaciones o, si no hay ninguna (arranque en frío), las
+    más vendidas. Con datos parciales (alguna base de datos no respondió) no
+    se recurre a la popularidad: un usuario o juego sin resultados puede no
+    ser nuevo, sino no haberse podido leer.
+    """
+    if recommendations or popularity is None or partial:
+        return recommendations
+    return popular_recommendations(popularity, max_recommendations, exclude, attributes)
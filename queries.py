@@ -0,0 +1,205 @@
+"""Plantillas Cypher compartidas por los servicios síncronos y asíncronos"""
+
+# Índice de categorías (vgsales / videogames). La carga incremental filtra
+# por id(game) > $watermark, que es solo una aproximación: id() está obsoleto
+# en Neo4j 5, los IDs internos se reutilizan tras un borrado (un juego
+# recreado puede quedar bajo la marca) y cada consulta lee en un momento
+# distinto (la marca puede superar a un juego cuyas aristas aún no se
+# leyeron). Lo que se pierda así solo se recupera con la reconstrucción
+# completa de CATEGORY_FULL_REFRESH_EVERY.
+VGSALES_GENRES_QUERY = (
+    "MATCH (game:VideoGame)-[:BELONGS_TO_GENRE]->(genre:Genre) "
+    "WHERE id(game) > $watermark "
+    "RETURN id(game) as gameId, game.Name as gameName, genre.name as genreName"
+)
+
+VGSALES_PLATFORMS_QUERY = (
+    "MATCH (game:VideoGame)-[:AVAILABLE_ON]->(platform:Platform) "
+    "WHERE id(game) > $watermark "
+    "RETURN id(game) as gameId, game.Name as gameName, platform.name as platformName"
+)
+
+VIDEOGAMES_DEVELOPERS_QUERY = (
+    "MATCH (game:Videojuego)-[:DEVELOPED_BY]->(developer:Developer) "
+    "WHERE id(game) > $watermark "
+    "RETURN id(game) as gameId, game.nombre as gameName, developer.name as developerName"
+)
+
+# Títulos para el índice de búsqueda en memoria
+VGSALES_TITLES_QUERY = (
+    "MATCH (game:VideoGame) "
+    "WHERE id(game) > $watermark "
+    "RETURN id(game) as gameId, game.Name as gameName"
+)
+
+VIDEOGAMES_TITLES_QUERY = (
+    "MATCH (game:Videojuego) "
+    "WHERE id(game) > $watermark "
+    "RETURN id(game) as gameId, game.nombre as gameName"
+)
+
+VGSALES_FINGERPRINT_QUERY = (
+    "CALL { MATCH (game:VideoGame) RETURN count(game) as games } "
+    "CALL { MATCH ()-[r:BELONGS_TO_GENRE]->() RETURN count(r) as genreEdges } "
+    "CALL { MATCH ()-[r:AVAILABLE_ON]->() RETURN count(r) as platformEdges } "
+    "RETURN games, genreEdges, platformEdges"
+)
+
+VIDEOGAMES_FINGERPRINT_QUERY = (
+    "CALL { MATCH (game:Videojuego) RETURN count(game) as games } "
+    "CALL { MATCH ()-[r:DEVELOPED_BY]->() RETURN count(r) as developerEdges } "
+    "RETURN games, developerEdges"
+)
+
+# Resolución de juegos
+VGSALES_FIND_GAME_QUERY = "MATCH (game:VideoGame {Name: $name}) RETURN game"
+
+VIDEOGAMES_FIND_GAME_QUERY = "MATCH (game:Videojuego {nombre: $name}) RETURN game"
+
+VGSALES_GAME_ATTRIBUTES_QUERY = (
+    "MATCH (game:VideoGame {Name: $name})-[r]-(attr) "
+    "RETURN type(r) as relationType, labels(attr) as labels, attr"
+)
+
+VIDEOGAMES_GAME_ATTRIBUTES_QUERY = (
+    "MATCH (game:Videojuego {nombre: $name})-[r]-(attr) "
+    "RETURN type(r) as relationType, labels(attr) as labels, attr"
+)
+
+# Perfil del usuario: juegos con LIKES/PLAYED y géneros/plataformas de los
+# juegos que le gustan, en una sola consulta por base de datos y lote
+VGSALES_USER_PROFILE_QUERY = """
+UNWIND $userIds AS userId
+MATCH (user:User {id: userId})-[rel:LIKES|PLAYED]->(game:VideoGame)
+WITH userId, game, collect(type(rel)) AS relTypes
+WITH userId, game, 'LIKES' IN relTypes AS liked, 'PLAYED' IN relTypes AS played
+RETURN userId,
+       collect(CASE WHEN liked THEN game.Name END) AS likedGames,
+       collect(CASE WHEN played THEN game.Name END) AS playedGames,
+       collect(CASE WHEN liked THEN [(game)-[:BELONGS_TO_GENRE]->(genre:Genre) | genre.name] END) AS genres,
+       collect(CASE WHEN liked THEN [(game)-[:AVAILABLE_ON]->(platform:Platform) | platform.name] END) AS platforms
+"""
+
+VIDEOGAMES_USER_PROFILE_QUERY = """
+UNWIND $userIds AS userId
+MATCH (user:User {id: userId})-[rel:LIKES|PLAYED]->(game:Videojuego)
+WITH userId, game, collect(type(rel)) AS relTypes
+WITH userId, game, 'LIKES' IN relTypes AS liked, 'PLAYED' IN relTypes AS played
+RETURN userId,
+       collect(CASE WHEN liked THEN game.nombre END) AS likedGames,
+       collect(CASE WHEN played THEN game.nombre END) AS playedGames,
+       collect(CASE WHEN liked THEN [(game)-[:BELONGS_TO_GENRE]->(genre:Genre) | genre.name] END) AS genres,
+       [] AS platforms
+"""
+
+# Recomendación colaborativa
+# Amigos (peso $friendWeight) y amigos de amigos (peso $friendOfFriendWeight)
+# en un solo recorrido; $friendLimit acota cuántos amigos se muestrean
+FRIENDS_WEIGHTED_QUERY = """
+MATCH (user:User {id: $userId})
+CALL {
+    WITH user
+    MATCH (user)-[:FRIENDS_WITH]->(friend:User)
+    RETURN friend
+    LIMIT $friendLimit
+}
+WITH user, collect(friend) AS friends
+CALL {
+    WITH friends
+    UNWIND friends AS friend
+    RETURN friend AS liker, $friendWeight AS weight
+    UNION
+    WITH user, friends
+    UNWIND friends AS friend
+    MATCH (friend)-[:FRIENDS_WITH]->(friendOfFriend:User)
+    WHERE friendOfFriend <> user AND NOT (user)-[:FRIENDS_WITH]->(friendOfFriend)
+    RETURN DISTINCT friendOfFriend AS liker, $friendOfFriendWeight AS weight
+}
+MATCH (liker)-[:LIKES]->(game:VideoGame)
+WHERE NOT (user)-[:PLAYED|LIKES]->(game)
+RETURN game.Name as gameName, sum(weight) as score
+ORDER BY score DESC, gameName
+LIMIT $limit
+"""
+
+SIMILAR_USERS_QUERY = """
+MATCH (user:User {id: $userId})-[:LIKES]->(game:VideoGame)<-[:LIKES]-(otherUser:User)
+WHERE user <> otherUser
+WITH otherUser, count(game) AS commonGames
+WHERE commonGames > 0
+MATCH (otherUser)-[:LIKES]->(rec:VideoGame)
+WHERE NOT (user)-[:PLAYED|LIKES]->(rec)
+RETURN rec.Name AS gameName, sum(commonGames) AS score
+ORDER BY score DESC
+"""
+
+# Aristas para el índice item-item y el grafo social en memoria
+LIKES_EDGES_QUERY = (
+    "MATCH (user:User)-[:LIKES]->(game:VideoGame) "
+    "RETURN user.id as userId, game.Name as gameName"
+)
+
+PLAYED_EDGES_QUERY = (
+    "MATCH (user:User)-[:PLAYED]->(game:VideoGame) "
+    "RETURN user.id as userId, game.Name as gameName"
+)
+
+FRIENDS_EDGES_QUERY = (
+    "MATCH (user:User)-[:FRIENDS_WITH]->(friend:User) "
+    "RETURN user.id as userId, friend.id as friendId"
+)
+
+# Consultas por lotes: una sola consulta para todos los IDs del lote
+VGSALES_BATCH_GAME_ATTRIBUTES_QUERY = (
+    "UNWIND $names AS name "
+    "MATCH (game:VideoGame {Name: name}) "
+    "OPTIONAL MATCH (game)-[r]-(attr) "
+    "RETURN name, labels(attr) as labels, attr"
+)
+
+VIDEOGAMES_BATCH_GAME_ATTRIBUTES_QUERY = (
+    "UNWIND $names AS name "
+    "MATCH (game:Videojuego {nombre: name}) "
+    "OPTIONAL MATCH (game)-[r]-(attr) "
+    "RETURN name, labels(attr) as labels, attr"
+)
+
+BATCH_FRIENDS_WEIGHTED_QUERY = """
+UNWIND $userIds AS userId
+MATCH (user:User {id: userId})
+CALL {
+    WITH user
+    MATCH (user)-[:FRIENDS_WITH]->(friend:User)
+    RETURN friend
+    LIMIT $friendLimit
+}
+WITH userId, user, collect(friend) AS friends
+CALL {
+    WITH friends
+    UNWIND friends AS friend
+    RETURN friend AS liker, $friendWeight AS weight
+    UNION
+    WITH user, friends
+    UNWIND friends AS friend
+    MATCH (friend)-[:FRIENDS_WITH]->(friendOfFriend:User)
+    WHERE friendOfFriend <> user AND NOT (user)-[:FRIENDS_WITH]->(friendOfFriend)
+    RETURN DISTINCT friendOfFriend AS liker, $friendOfFriendWeight AS weight
+}
+MATCH (liker)-[:LIKES]->(game:VideoGame)
+WHERE NOT (user)-[:PLAYED|LIKES]->(game)
+WITH userId, game.Name AS gameName, sum(weight) AS score
+ORDER BY score DESC, gameName
+RETURN userId, collect({gameName: gameName, score: score})[..$limit] AS games
+"""
+
+BATCH_SIMILAR_USERS_QUERY = """
+UNWIND $userIds AS userId
+MATCH (user:User {id: userId})-[:LIKES]->(game:VideoGame)<-[:LIKES]-(otherUser:User)
+WHERE user <> otherUser
+WITH userId, user, otherUser, count(game) AS commonGames
+MATCH (otherUser)-[:LIKES]->(rec:VideoGame)
+WHERE NOT (user)-[:PLAYED|LIKES]->(rec)
+WITH userId, rec.Name AS gameName, sum(commonGames) AS score
+ORDER BY score DESC
+RETURN userId, collect({gameName: gameName, score: score})[..$limit] AS games
+"""
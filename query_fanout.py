@@ -0,0 +1,119 @@
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
+import asyncio
+import logging
+import threading
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# (conexión, query, parámetros)
+QuerySpec = Tuple[Any, str, Optional[Dict[str, Any]]]
+
+class FanOutResult:
+    """Resultados por base de datos de una consulta en paralelo"""
+
+    def __init__(self, results: Dict[str, List[Dict]], errors: Dict[str, str]):
+        self.results = results
+        self.errors = errors
+
+    def rows(self, source: str) -> List[Dict]:
+        return self.results.get(source, [])
+
+    def all_rows(self) -> List[Dict]:
+        rows = []
+        for source_rows in self.results.values():
+            rows.extend(source_rows)
+        return rows
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.errors)
+
+    @property
+    def failed(self) -> bool:
+        return not self.results and bool(self.errors)
+
+class QueryFanOut:
+    """
+    Ejecuta las consultas de cada base de datos de forma concurrente en un
+    pool de hilos compartido. Si una base de datos falla o supera el tiempo
+    límite, se devuelven los resultados parciales del resto. El tiempo
+    límite también se envía al servidor como timeout de la transacción:
+    cancel() no detiene un future en ejecución, así que sin él una consulta
+    lenta retendría su hilo y su conexión.
+    """
+
+    def __init__(self, max_workers: int = 8, timeout: float = 5.0):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='neo4j-fanout')
+
+    def run(self, queries: Dict[str, QuerySpec], timeout: Optional[float] = None) -> FanOutResult:
+        timeout = self.timeout if timeout is None else timeout
+        futures = {
+            source: self._executor.submit(connection.execute_query, query, parameters, timeout=timeout or None)
+            for source, (connection, query, parameters) in queries.items()
+        }
+
+        wait(futures.values(), timeout=timeout or None)
+
+        results = {}
+        errors = {}
+        for source, future in futures.items():
+            if not future.done():
+                future.cancel()
+                errors[source] = f"Tiempo límite de {timeout}s superado"
+                logger.warning(f"Consulta a '{source}' superó el tiempo límite de {timeout}s")
+                continue
+
+            try:
+                results[source] = future.result()
+            except Exception as e:
+                errors[source] = str(e)
+                logger.warning(f"Consulta a '{source}' falló: {e}")
+
+        return FanOutResult(results, errors)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+async def run_async_fanout(queries: Dict[str, QuerySpec], timeout: Optional[float] = None) -> FanOutResult:
+    """
+    Equivalente asíncrono de QueryFanOut.run para conexiones
+    AsyncNeo4jConnectionManager: lanza las consultas con asyncio.gather
+    y aplica el tiempo límite a cada una.
+    """
+    timeout = Config.FANOUT_TIMEOUT if timeout is None else timeout
+    sources = list(queries)
+    outcomes = await asyncio.gather(
+        *(
+            asyncio.wait_for(connection.execute_query(query, parameters, timeout=timeout or None), timeout or None)
+            for connection, query, parameters in queries.values()
+        ),
+        return_exceptions=True
+    )
+
+    results = {}
+    errors = {}
+    for source, outcome in zip(sources, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors[source] = f"Tiempo límite de {timeout}s superado"
+            logger.warning(f"Consulta a '{source}' superó el tiempo límite de {timeout}s")
+        elif isinstance(outcome, Exception):
+            errors[source] = str(outcome)
+            logger.warning(f"Consulta a '{source}' falló: {outcome}")
+        else:
+            results[source] = outcome
+
+    return FanOutResult(results, errors)
+
+_shared_fanout: Optional[QueryFanOut] = None
+_shared_lock = threading.Lock()
+
+def get_shared_fanout() -> QueryFanOut:
+    """Devuelve el ejecutor compartido por todos los servicios del proceso"""
+    global _shared_fanout
+    with _shared_lock:
+        if _shared_fanout is None:
+            _shared_fanout = QueryFanOut(Config.FANOUT_MAX_WORKERS, Config.FANOUT_TIMEOUT)
+        return _shared_fanout
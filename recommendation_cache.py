@@ -0,0 +1,192 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+from collections import OrderedDict, defaultdict
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Hashable, int]
+
+# Endpoints cuyas claves son nombres de juego; el resto se indexan por usuario
+GAME_ENDPOINTS = frozenset({'by-game'})
+
+class InvalidCacheKeyError(ValueError):
+    """IDs de invalidación que no son cadenas"""
+    status_code = 400
+
+def parse_invalidation_request(data: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], List[str]]:
+    """userId, gameName y relatedUserIds de una petición de invalidación, validando sus tipos"""
+    if not isinstance(data, dict):
+        raise InvalidCacheKeyError('Se requiere un objeto JSON')
+
+    user_id = data.get('userId')
+    game_name = data.get('gameName')
+    related_user_ids = data.get('relatedUserIds') or []
+
+    for field, value in (('userId', user_id), ('gameName', game_name)):
+        if value is not None and not isinstance(value, str):
+            raise InvalidCacheKeyError(f"{field} debe ser una cadena")
+    if not isinstance(related_user_ids, list) or not all(isinstance(value, str) for value in related_user_ids):
+        raise InvalidCacheKeyError('relatedUserIds debe ser una lista de cadenas')
+
+    return user_id, game_name, related_user_ids
+
+def _id_kind(endpoint: str) -> str:
+    return 'game' if endpoint in GAME_ENDPOINTS else 'user'
+
+class _CacheEntry:
+    __slots__ = ('value', 'expires_at', 'size')
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+class RecommendationCache:
+    """
+    Caché acotada de resultados de recomendación con TTL por endpoint,
+    desalojo LRU, límite de memoria y contadores de aciertos/fallos.
+    Las claves son (endpoint, id, maxRecommendations); para invalidar se
+    indexan por (tipo, id), de modo que un juego y un usuario con el mismo
+    texto no se pisan.
+    """
+
+    def __init__(self, default_ttl: float = 300, endpoint_ttls: Optional[Dict[str, float]] = None,
+                 max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.default_ttl = default_ttl
+        self.endpoint_ttls = dict(endpoint_ttls or {})
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._keys_by_id: Dict[Tuple[str, Hashable], Set[CacheKey]] = defaultdict(set)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, endpoint: str, key_id: Hashable, max_recommendations: int) -> Optional[Any]:
+        """Devuelve el valor cacheado o None si no existe o ha expirado"""
+        key = (endpoint, key_id, max_recommendations)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, endpoint: str, key_id: Hashable, max_recommendations: int, value: Any):
+        """Guarda un valor aplicando el TTL del endpoint y los límites de tamaño"""
+        ttl = self.endpoint_ttls.get(endpoint, self.default_ttl)
+        if ttl <= 0:
+            return
+
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        key = (endpoint, key_id, max_recommendations)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _CacheEntry(value, self._clock() + ttl, size)
+            self._keys_by_id[(_id_kind(endpoint), key_id)].add(key)
+            self._bytes += size
+            self._evict()
+
+    def get_or_compute(self, endpoint: str, key_id: Hashable, max_recommendations: int,
+                       compute: Callable[[], Any]) -> Any:
+        """Devuelve el valor cacheado o lo calcula y lo guarda"""
+        value = self.get(endpoint, key_id, max_recommendations)
+        if value is None:
+            value = compute()
+            self.put(endpoint, key_id, max_recommendations, value)
+        return value
+
+    def invalidate_user(self, user_id: Hashable, related_user_ids: Iterable[Hashable] = ()) -> int:
+        """
+        Elimina las entradas de un usuario (y de los usuarios relacionados)
+        cuando cambian sus relaciones LIKES, PLAYED o FRIENDS_WITH.
+        """
+        removed = self._invalidate('user', [user_id, *related_user_ids])
+        if removed:
+            logger.info(f"Invalidadas {removed} entradas de caché para usuario '{user_id}'")
+        return removed
+
+    def invalidate_game(self, game_name: str) -> int:
+        """Elimina las entradas cacheadas para un juego base"""
+        removed = self._invalidate('game', [game_name])
+        if removed:
+            logger.info(f"Invalidadas {removed} entradas de caché para juego '{game_name}'")
+        return removed
+
+    def _invalidate(self, kind: str, key_ids: Iterable[Hashable]) -> int:
+        removed = 0
+        with self._lock:
+            for key_id in key_ids:
+                for key in list(self._keys_by_id.get((kind, key_id), ())):
+                    self._remove(key)
+                    removed += 1
+            self.invalidations += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxEntries': self.max_entries,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        index_key = (_id_kind(key[0]), key[1])
+        keys = self._keys_by_id.get(index_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_id[index_key]
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return 1024
@@ -0,0 +1,189 @@
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import re
+import queries
+
+logger = logging.getLogger(__name__)
+
+class SchemaNotReadyError(Exception):
+    """Se lanza cuando una plantilla caliente sigue requiriendo un escaneo completo"""
+    status_code = 503
+
+# Restricciones e índices que necesitan las consultas, por base de datos.
+# Todas las sentencias son idempotentes (IF NOT EXISTS).
+SCHEMA_STATEMENTS = {
+    'vgsales': [
+        "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (user:User) REQUIRE user.id IS UNIQUE",
+        "CREATE INDEX videogame_name IF NOT EXISTS FOR (game:VideoGame) ON (game.Name)",
+        "CREATE INDEX genre_name IF NOT EXISTS FOR (genre:Genre) ON (genre.name)",
+        "CREATE INDEX platform_name IF NOT EXISTS FOR (platform:Platform) ON (platform.name)",
+        "CREATE FULLTEXT INDEX videogame_name_fulltext IF NOT EXISTS FOR (game:VideoGame) ON EACH [game.Name]"
+    ],
+    'videogames': [
+        "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (user:User) REQUIRE user.id IS UNIQUE",
+        "CREATE INDEX videojuego_nombre IF NOT EXISTS FOR (game:Videojuego) ON (game.nombre)",
+        "CREATE INDEX genre_name IF NOT EXISTS FOR (genre:Genre) ON (genre.name)",
+        "CREATE INDEX developer_name IF NOT EXISTS FOR (developer:Developer) ON (developer.name)",
+        "CREATE FULLTEXT INDEX videojuego_nombre_fulltext IF NOT EXISTS FOR (game:Videojuego) ON EACH [game.nombre]"
+    ]
+}
+
+# Plantillas de carga masiva: recorren todo el grafo a propósito y no se
+# ejecutan por petición, así que un escaneo completo es esperado
+FULL_SCAN_TEMPLATES = {
+    'VGSALES_GENRES_QUERY',
+    'VGSALES_PLATFORMS_QUERY',
+    'VIDEOGAMES_DEVELOPERS_QUERY',
+    'VGSALES_TITLES_QUERY',
+    'VIDEOGAMES_TITLES_QUERY',
+    'VGSALES_FINGERPRINT_QUERY',
+    'VIDEOGAMES_FINGERPRINT_QUERY',
+    'LIKES_EDGES_QUERY',
+    'PLAYED_EDGES_QUERY',
+    'FRIENDS_EDGES_QUERY'
+}
+
+SCAN_OPERATORS = ('NodeByLabelScan', 'AllNodesScan')
+
+# Valores de ejemplo para los parámetros de las plantillas al pedir EXPLAIN
+EXPLAIN_PARAMETERS = {
+    'userId': '',
+    'userIds': [],
+    'name': '',
+    'names': [],
+    'watermark': -1,
+    'limit': 1,
+    'friendLimit': 1,
+    'friendWeight': 1.0,
+    'friendOfFriendWeight': 0.5
+}
+
+def query_templates() -> List[Tuple[str, str, str]]:
+    """(nombre, base de datos, Cypher) de cada plantilla definida en queries.py"""
+    templates = []
+    for name, value in sorted(vars(queries).items()):
+        if not name.endswith('_QUERY') or not isinstance(value, str):
+            continue
+        source = 'videogames' if name.startswith('VIDEOGAMES_') else 'vgsales'
+        templates.append((name, source, value))
+    return templates
+
+def explain_parameters(query: str) -> Dict[str, Any]:
+    return {name: EXPLAIN_PARAMETERS.get(name, '') for name in set(re.findall(r'\$(\w+)', query))}
+
+def find_scans(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """Operadores de escaneo completo presentes en un plan de EXPLAIN"""
+    if not plan:
+        return []
+
+    scans = []
+    pending = [plan]
+    while pending:
+        operator = pending.pop()
+        operator_type = operator.get('operatorType', '').split('@')[0]
+        if operator_type in SCAN_OPERATORS:
+            scans.append(operator_type)
+        pending.extend(operator.get('children', []))
+    return scans
+
+class SchemaBootstrap:
+    """
+    Prepara el esquema de ambas bases de datos al arrancar: crea las
+    restricciones e índices que usan las consultas calientes y comprueba
+    con EXPLAIN que ninguna plantilla por petición termina en un escaneo
+    por etiqueta o de todos los nodos.
+    """
+
+    def __init__(self, vgsales_connection, videogames_connection, create_schema: bool = True, strict: bool = False):
+        self.connections = {'vgsales': vgsales_connection, 'videogames': videogames_connection}
+        self.create_schema = create_schema
+        self.strict = strict
+        self.report: Dict[str, Any] = {'checked': False, 'applied': [], 'scans': {}, 'errors': {}}
+
+    def _new_report(self) -> Dict[str, Any]:
+        return {'checked': True, 'applied': [], 'scans': {}, 'errors': {}}
+
+    def _record_plan(self, report: Dict[str, Any], name: str, plan: Optional[Dict[str, Any]]):
+        scans = find_scans(plan)
+        if scans:
+            report['scans'][name] = scans
+            logger.warning(f"La plantilla {name} usa un escaneo completo ({', '.join(sorted(set(scans)))})")
+
+    def _finish(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        self.report = report
+        if report['scans'] and self.strict:
+            raise SchemaNotReadyError(f"Plantillas con escaneo completo: {', '.join(sorted(report['scans']))}")
+        logger.info(f"Esquema verificado: {len(report['scans'])} plantillas con escaneo completo")
+        return report
+
+    def _steps(self, report: Dict[str, Any], create_schema: bool, check_plans: bool):
+        """
+        Recorre las sentencias de esquema y las plantillas. Genera
+        (método, argumentos) de cada llamada a Neo4j y recibe su resultado
+        (o la excepción) para anotarlo en el informe; run y run_async solo
+        deciden cómo ejecutar cada llamada.
+        """
+        if create_schema:
+            for source, statements in SCHEMA_STATEMENTS.items():
+                connection = self.connections[source]
+                if connection is None:
+                    continue
+                for statement in statements:
+                    outcome = yield connection.execute_write, (statement,)
+                    if isinstance(outcome, Exception):
+                        report['errors'][f'{source}: {statement}'] = str(outcome)
+                        logger.warning(f"No se pudo aplicar '{statement}' en {source}: {outcome}")
+                    else:
+                        report['applied'].append(statement)
+
+        if not check_plans:
+            return
+
+        for name, source, query in query_templates():
+            if name in FULL_SCAN_TEMPLATES:
+                continue
+            outcome = yield self.connections[source].explain, (query, explain_parameters(query))
+            if isinstance(outcome, Exception):
+                report['errors'][name] = str(outcome)
+            else:
+                self._record_plan(report, name, outcome)
+
+    def _drive(self, steps):
+        try:
+            method, args = next(steps)
+            while True:
+                try:
+                    outcome = method(*args)
+                except Exception as e:
+                    outcome = e
+                method, args = steps.send(outcome)
+        except StopIteration:
+            pass
+
+    def apply_schema(self, report: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Aplica las sentencias de esquema en las bases de datos con conexión"""
+        report = report if report is not None else self._new_report()
+        self._drive(self._steps(report, create_schema=True, check_plans=False))
+        return report
+
+    def run(self) -> Dict[str, Any]:
+        """Crea el esquema (si está habilitado) y revisa los planes de las plantillas"""
+        report = self._new_report()
+        self._drive(self._steps(report, self.create_schema, check_plans=True))
+        return self._finish(report)
+
+    async def run_async(self) -> Dict[str, Any]:
+        """Versión para AsyncNeo4jConnectionManager"""
+        report = self._new_report()
+        steps = self._steps(report, self.create_schema, check_plans=True)
+        try:
+            method, args = next(steps)
+            while True:
+                try:
+                    outcome = await method(*args)
+                except Exception as e:
+                    outcome = e
+                method, args = steps.send(outcome)
+        except StopIteration:
+            pass
+        return self._finish(report)
@@ -0,0 +1,118 @@
+from typing import List, Dict, Set, Iterable, Tuple, Optional
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class CategoryScoringEngine:
+    """
+    Motor de puntuación vectorizado sobre los mapas de categorías.
+    Los juegos se representan con IDs enteros y la pertenencia a cada
+    categoría (género, plataforma, desarrollador) como arreglos NumPy.
+    """
+
+    def __init__(self, category_maps: Dict[str, Dict[str, Set[str]]]):
+        names = set()
+        for games_map in category_maps.values():
+            for games in games_map.values():
+                names.update(games)
+
+        game_names = sorted(names)
+        game_ids = {name: idx for idx, name in enumerate(game_names)}
+        postings = {}
+        for attribute_type, games_map in category_maps.items():
+            postings[attribute_type] = {}
+            for attribute_value, games in games_map.items():
+                ids = np.fromiter((game_ids[name] for name in games), dtype=np.int32, count=len(games))
+                ids.sort()
+                postings[attribute_type][attribute_value] = ids
+
+        self._setup(game_names, postings)
+
+    @classmethod
+    def from_postings(cls, game_names: List[str], postings: Dict[str, Dict[str, np.ndarray]]) -> 'CategoryScoringEngine':
+        """
+        Construye el motor a partir de listas de IDs ya ordenadas, p. ej. las
+        de CompactCatalog; `game_names` debe estar en orden alfabético.
+        """
+        engine = cls.__new__(cls)
+        engine._setup(game_names, postings)
+        return engine
+
+    def _setup(self, game_names: List[str], postings: Dict[str, Dict[str, np.ndarray]]):
+        self.game_names: List[str] = game_names
+        self.game_ids: Dict[str, int] = {name: idx for idx, name in enumerate(game_names)}
+        self._postings: Dict[str, Dict[str, np.ndarray]] = postings
+        # Popularidad por ID de juego (p. ej. ventas globales) para desempatar; opcional
+        self.prior: Optional[np.ndarray] = None
+
+        logger.info(f"Motor de puntuación construido con {len(self.game_names)} juegos")
+
+    @property
+    def size(self) -> int:
+        return len(self.game_names)
+
+    def game_id(self, game_name: str) -> Optional[int]:
+        return self.game_ids.get(game_name)
+
+    def postings(self, attribute_type: str, attribute_value: str) -> np.ndarray:
+        """Devuelve los IDs de juegos que tienen un atributo específico"""
+        return self._postings.get(attribute_type, {}).get(attribute_value, np.empty(0, dtype=np.int32))
+
+    def score(self, weighted_attributes: Iterable[Tuple[str, str, float]]) -> np.ndarray:
+        """
+        Calcula la puntuación de todos los juegos como un único producto
+        de un vector disperso de pesos por la matriz categoría x juego.
+        """
+        id_chunks = []
+        weight_chunks = []
+
+        for attribute_type, attribute_value, weight in weighted_attributes:
+            ids = self.postings(attribute_type, attribute_value)
+            if ids.size:
+                id_chunks.append(ids)
+                weight_chunks.append(np.full(ids.size, weight, dtype=np.float64))
+
+        if not id_chunks:
+            return np.zeros(self.size, dtype=np.float64)
+
+        return np.bincount(
+            np.concatenate(id_chunks),
+            weights=np.concatenate(weight_chunks),
+            minlength=self.size
+        )
+
+    def top_k(self, scores: np.ndarray, k: int, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """
+        Selecciona los k juegos con mayor puntuación usando argpartition.
+        Los juegos excluidos y los que no tienen puntuación se descartan.
+        """
+        if k <= 0 or not scores.size:
+            return []
+
+        mask = scores > 0
+        excluded_ids = [self.game_ids[name] for name in exclude if name in self.game_ids]
+        if excluded_ids:
+            mask[excluded_ids] = False
+
+        candidates = np.flatnonzero(mask)
+        prior = self.prior
+        if candidates.size > k:
+            if prior is None:
+                partition = np.argpartition(-scores[candidates], k - 1)[:k]
+                candidates = candidates[partition]
+            else:
+                # Se conservan todos los empatados con el k-ésimo para que el prior decida
+                kth_score = -np.partition(-scores[candidates], k - 1)[k - 1]
+                candidates = candidates[scores[candidates] >= kth_score]
+
+        # Orden final: puntuación descendente y, en empate, por popularidad (si hay prior) y por ID de juego
+        if prior is None:
+            order = np.lexsort((candidates, -scores[candidates]))
+        else:
+            order = np.lexsort((candidates, -prior[candidates], -scores[candidates]))
+        return [(self.game_names[idx], scores[idx].item()) for idx in candidates[order][:k]]
+
+    def recommend(self, weighted_attributes: Iterable[Tuple[str, str, float]], k: int, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Puntúa los juegos y devuelve los k mejores"""
+        return self.top_k(self.score(weighted_attributes), k, exclude)
@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Tuple
+from bisect import bisect_left
+from collections import defaultdict
+import heapq
+import logging
+import unicodedata
+import numpy as np
+from compact_catalog import intersect
+
+logger = logging.getLogger(__name__)
+
+# Orden de preferencia cuando un título aparece en ambas bases de datos
+SEARCH_SOURCES = ('vgsales', 'videogames')
+GRAM_SIZES = (2, 3)
+
+def normalize_title(text: str) -> str:
+    """Minúsculas y sin acentos: 'Pokémon' y 'POKEMON' se normalizan igual"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def _grams(text: str, size: int) -> List[str]:
+    return [text[i:i + size] for i in range(len(text) - size + 1)]
+
+class GameSearchIndex:
+    """
+    Índice de n-gramas (bigramas y trigramas) sobre los títulos de ambas
+    bases de datos para el autocompletado. Reproduce la semántica de
+    CONTAINS sin distinguir mayúsculas ni acentos, prioriza las
+    coincidencias por prefijo y devuelve cada título una sola vez.
+    """
+
+    def __init__(self, titles: Dict[str, Iterable[str]]):
+        entries: Dict[str, Tuple[str, str]] = {}
+        for source in SEARCH_SOURCES:
+            for name in sorted(titles.get(source, ())):
+                if name:
+                    entries.setdefault(normalize_title(name), (name, source))
+
+        # Entradas ordenadas por título normalizado: el ID sirve de desempate
+        # alfabético y permite buscar prefijos con bisect
+        self._normalized: List[str] = sorted(entries)
+        self._names: List[str] = [entries[key][0] for key in self._normalized]
+        self._sources: List[str] = [entries[key][1] for key in self._normalized]
+
+        postings = defaultdict(list)
+        for entry_id, title in enumerate(self._normalized):
+            for size in GRAM_SIZES:
+                for gram in set(_grams(title, size)):
+                    postings[gram].append(entry_id)
+
+        self._postings: Dict[str, np.ndarray] = {
+            gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()
+        }
+
+        logger.info(f"Índice de búsqueda construido con {len(self._names)} títulos y {len(self._postings)} n-gramas")
+
+    @property
+    def size(self) -> int:
+        return len(self._names)
+
+    def _prefix_candidates(self, query: str) -> range:
+        start = bisect_left(self._normalized, query)
+        end = bisect_left(self._normalized, query + '\uffff', lo=start)
+        return range(start, end)
+
+    def _gram_candidates(self, query: str) -> np.ndarray:
+        size = max(gram_size for gram_size in GRAM_SIZES if gram_size <= len(query))
+        lists = []
+        for gram in set(_grams(query, size)):
+            ids = self._postings.get(gram)
+            if ids is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(ids)
+
+        return intersect(*lists)
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, str]]:
+        """
+        Busca títulos que contienen `query`. Orden: coincidencia exacta,
+        prefijo del título, prefijo de una palabra y el resto; a igualdad,
+        títulos más cortos y luego alfabético.
+        """
+        normalized = normalize_title(query.strip())
+        if not normalized or limit <= 0:
+            return []
+
+        if len(normalized) < min(GRAM_SIZES):
+            candidates = self._prefix_candidates(normalized)
+        else:
+            candidates = self._gram_candidates(normalized).tolist()
+
+        def rank(entry_id: int):
+            title = self._normalized[entry_id]
+            if title == normalized:
+                position = 0
+            elif title.startswith(normalized):
+                position = 1
+            elif (' ' + normalized) in title:
+                position = 2
+            else:
+                position = 3
+            return position, len(title), entry_id
+
+        matches = (entry_id for entry_id in candidates if normalized in self._normalized[entry_id])
+        return [
+            {'name': self._names[entry_id], 'source': self._sources[entry_id]}
+            for entry_id in heapq.nsmallest(limit, matches, key=rank)
+        ]
@@ -0,0 +1,243 @@
+from typing import Any, Dict, Optional
+import logging
+import threading
+import time
+from neo4j_connection import Neo4jConnectionManager, pool_settings
+from personal_recommender import PersonalRecommenderService
+from collaborative_recomendation import CollaborativeRecommenderService
+from hybrid_recommender import HybridRecommenderService
+from popularity import PopularityTables, load_popularity
+from category_refresher import CategoryMapRefresher, CollaborativeIndexRefresher
+from schema_bootstrap import SchemaBootstrap
+
+logger = logging.getLogger(__name__)
+
+class ServiceNotReadyError(Exception):
+    """Se lanza cuando se pide un servicio cuyo índice aún se está cargando"""
+    status_code = 503
+
+class ServiceContainer:
+    """
+    Crea de forma perezosa las conexiones a Neo4j y los servicios de
+    recomendación. La carga de índices se hace en un hilo en segundo plano
+    y su progreso se expone para el endpoint de readiness. Se pueden
+    inyectar conexiones ya creadas (p. ej. el backend de los benchmarks);
+    sin ellas se abren desde la configuración.
+    """
+
+    STAGES = ('connecting', 'verifying_schema', 'loading_category_index', 'starting_services', 'ready')
+
+    def __init__(self, config, vgsales_connection: Optional[Neo4jConnectionManager] = None,
+                 videogames_connection: Optional[Neo4jConnectionManager] = None):
+        self.config = config
+        self._lock = threading.RLock()
+        self._vgsales_connection = vgsales_connection
+        self._videogames_connection = videogames_connection
+        self._personal_recommender: Optional[PersonalRecommenderService] = None
+        self._collaborative_recommender: Optional[CollaborativeRecommenderService] = None
+        self._hybrid_recommender: Optional[HybridRecommenderService] = None
+        self._popularity: Optional[PopularityTables] = None
+        self._popularity_loaded = False
+        self._category_refresher: Optional[CategoryMapRefresher] = None
+        self._collaborative_refresher: Optional[CollaborativeIndexRefresher] = None
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._schema_bootstrap: Optional[SchemaBootstrap] = None
+        self._stage = 'pending'
+        self._error: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    @property
+    def vgsales_connection(self) -> Neo4jConnectionManager:
+        with self._lock:
+            if self._vgsales_connection is None:
+                self._vgsales_connection = Neo4jConnectionManager(
+                    self.config.VGSALES_URI,
+                    self.config.VGSALES_USER,
+                    self.config.VGSALES_PASSWORD,
+                    name='vgsales',
+                    **pool_settings(self.config)
+                )
+            return self._vgsales_connection
+
+    @property
+    def videogames_connection(self) -> Neo4jConnectionManager:
+        with self._lock:
+            if self._videogames_connection is None:
+                self._videogames_connection = Neo4jConnectionManager(
+                    self.config.VIDEOGAMES_URI,
+                    self.config.VIDEOGAMES_USER,
+                    self.config.VIDEOGAMES_PASSWORD,
+                    name='videogames',
+                    **pool_settings(self.config)
+                )
+            return self._videogames_connection
+
+    @property
+    def popularity(self) -> Optional[PopularityTables]:
+        """Tablas de popularidad, construidas una vez; None si no hay CSV de ventas"""
+        with self._lock:
+            if not self._popularity_loaded:
+                self._popularity = load_popularity(self.config.POPULARITY_CSV, self.config.POPULARITY_TABLE_SIZE)
+                self._popularity_loaded = True
+            return self._popularity
+
+    @property
+    def personal_recommender(self) -> PersonalRecommenderService:
+        if self._personal_recommender is None:
+            self.start_warmup()
+            raise ServiceNotReadyError(f"El servicio se está inicializando (etapa: {self._stage})")
+        return self._personal_recommender
+
+    @property
+    def collaborative_recommender(self) -> CollaborativeRecommenderService:
+        with self._lock:
+            if self._collaborative_recommender is None:
+                self._collaborative_recommender = CollaborativeRecommenderService(
+                    self.vgsales_connection,
+                    self.videogames_connection,
+                    similarity_top_n=self.config.SIMILARITY_TOP_N,
+                    similarity_max_user_likes=self.config.SIMILARITY_MAX_USER_LIKES,
+                    friend_sample_limit=self.config.FRIEND_SAMPLE_LIMIT,
+                    friend_of_friend_weight=self.config.FRIEND_OF_FRIEND_WEIGHT,
+                    graph_engine_enabled=self.config.GRAPH_ENGINE_ENABLED,
+                    popularity=self.popularity
+                )
+            return self._collaborative_recommender
+
+    @property
+    def hybrid_recommender(self) -> HybridRecommenderService:
+        personal_recommender = self.personal_recommender
+        with self._lock:
+            if self._hybrid_recommender is None:
+                self._hybrid_recommender = HybridRecommenderService(
+                    personal_recommender,
+                    self.collaborative_recommender,
+                    self.config.HYBRID_WEIGHTS
+                )
+            return self._hybrid_recommender
+
+    @property
+    def collaborative_refresher(self) -> Optional[CollaborativeIndexRefresher]:
+        """Hilo que reconstruye los índices colaborativos; None hasta terminar el calentamiento"""
+        return self._collaborative_refresher
+
+    @property
+    def is_ready(self) -> bool:
+        return self._stage == 'ready'
+
+    def start_warmup(self):
+        """Lanza la carga de índices en segundo plano (idempotente)"""
+        with self._lock:
+            if self._warmup_thread is not None and (self._warmup_thread.is_alive() or self._stage == 'ready'):
+                return
+
+            self._stage = 'pending'
+            self._error = None
+            self._started_at = time.time()
+            self._finished_at = None
+            self._warmup_thread = threading.Thread(target=self._warmup, name='service-warmup', daemon=True)
+            self._warmup_thread.start()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        thread = self._warmup_thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.is_ready
+
+    def _warmup(self):
+        try:
+            self._stage = 'connecting'
+            vgsales_connection = self.vgsales_connection
+            videogames_connection = self.videogames_connection
+
+            if self.config.SCHEMA_BOOTSTRAP_ENABLED:
+                self._stage = 'verifying_schema'
+                self._schema_bootstrap = SchemaBootstrap(
+                    vgsales_connection,
+                    videogames_connection,
+                    create_schema=self.config.SCHEMA_CREATE,
+                    strict=self.config.SCHEMA_STRICT
+                )
+                self._schema_bootstrap.run()
+
+            self._stage = 'loading_category_index'
+            personal_recommender = PersonalRecommenderService(
+                vgsales_connection,
+                videogames_connection,
+                snapshot_path=self.config.CATEGORY_SNAPSHOT_PATH or None,
+                popularity=self.popularity
+            )
+
+            self._stage = 'starting_services'
+            # Los índices colaborativos se construyen en su propio hilo;
+            # mientras tanto las recomendaciones se resuelven con Cypher
+            collaborative_refresher = CollaborativeIndexRefresher(
+                self.collaborative_recommender,
+                self.config.SIMILARITY_REFRESH_INTERVAL
+            )
+            collaborative_refresher.start()
+            refresher = CategoryMapRefresher(
+                personal_recommender,
+                self.config.CATEGORY_REFRESH_INTERVAL,
+                self.config.CATEGORY_FULL_REFRESH_EVERY
+            )
+            if self.config.CATEGORY_REFRESH_INTERVAL > 0:
+                refresher.start()
+
+            with self._lock:
+                self._personal_recommender = personal_recommender
+                self._category_refresher = refresher
+                self._collaborative_refresher = collaborative_refresher
+                self._stage = 'ready'
+                self._finished_at = time.time()
+
+            logger.info("Conexiones y servicios inicializados correctamente")
+
+        except Exception as e:
+            self._error = str(e)
+            self._stage = 'failed'
+            self._finished_at = time.time()
+            logger.error(f"Error inicializando servicios: {e}")
+
+    def readiness(self) -> Dict[str, Any]:
+        """Estado del calentamiento para el endpoint de readiness"""
+        stage = self._stage
+        completed = self.STAGES.index(stage) if stage in self.STAGES else 0
+        if stage == 'ready':
+            completed = len(self.STAGES)
+
+        end = self._finished_at or time.time()
+        status = {
+            'ready': stage == 'ready',
+            'stage': stage,
+            'progress': completed / len(self.STAGES),
+            'elapsedSeconds': round(end - self._started_at, 3) if self._started_at else 0.0,
+            'error': self._error
+        }
+
+        if self._schema_bootstrap is not None:
+            status['schema'] = self._schema_bootstrap.report
+
+        personal_recommender = self._personal_recommender
+        if personal_recommender is not None:
+            status['indexedGames'] = personal_recommender.category_index.game_count
+
+        collaborative_recommender = self._collaborative_recommender
+        if collaborative_recommender is not None:
+            similarity_index = collaborative_recommender.similarity_index
+            status['similarityIndexGames'] = similarity_index.size if similarity_index is not None else None
+            graph_engine = collaborative_recommender.graph_engine
+            status['graphEngineLoaded'] = graph_engine is not None
+
+        return status
+
+    def close(self):
+        with self._lock:
+            if self._category_refresher is not None:
+                self._category_refresher.stop()
+            if self._collaborative_refresher is not None:
+                self._collaborative_refresher.stop()
+            for connection in (self._vgsales_connection, self._videogames_connection):
+                if connection is not None:
+                    connection.close()
@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, List, Tuple
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def _csr(rows: np.ndarray, cols: np.ndarray, row_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Agrupa `cols` por `rows` en formato CSR (offsets, vecinos)"""
+    order = np.lexsort((cols, rows))
+    offsets = np.zeros(row_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=row_count), out=offsets[1:])
+    return offsets, cols[order].astype(np.int32)
+
+class SocialGraph:
+    """
+    Grafo en memoria de User, FRIENDS_WITH, LIKES y PLAYED con IDs enteros
+    y adyacencias CSR de NumPy. Implementa las mismas puntuaciones que
+    FRIENDS_WEIGHTED_QUERY y SIMILAR_USERS_QUERY sin pasar por Neo4j.
+    Los juegos se numeran en orden alfabético para que el desempate por
+    ID coincida con el ORDER BY gameName de Cypher.
+    """
+
+    def __init__(self, user_names: List[str], game_names: List[str], adjacency: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        self.user_names = user_names
+        self.game_names = game_names
+        self.user_ids: Dict[str, int] = {name: idx for idx, name in enumerate(user_names)}
+        self.game_ids: Dict[str, int] = {name: idx for idx, name in enumerate(game_names)}
+        self.friends_offsets, self.friends = adjacency['friends']
+        self.likes_offsets, self.likes = adjacency['likes']
+        self.likers_offsets, self.likers = adjacency['likers']
+        self.played_offsets, self.played = adjacency['played']
+
+    @classmethod
+    def build(cls, friend_edges: Iterable[Tuple[str, str]], like_edges: Iterable[Tuple[str, str]],
+              played_edges: Iterable[Tuple[str, str]]) -> 'SocialGraph':
+        """Construye el grafo a partir de pares (userId, userId) y (userId, gameName)"""
+        friend_edges = list(friend_edges)
+        like_edges = list(like_edges)
+        played_edges = list(played_edges)
+
+        user_names = sorted(
+            {user for edge in friend_edges for user in edge}
+            | {user for user, _ in like_edges}
+            | {user for user, _ in played_edges}
+        )
+        game_names = sorted({game for _, game in like_edges} | {game for _, game in played_edges})
+        user_ids = {name: idx for idx, name in enumerate(user_names)}
+        game_ids = {name: idx for idx, name in enumerate(game_names)}
+
+        def encode(edges, target_ids):
+            sources = np.fromiter((user_ids[source] for source, _ in edges), dtype=np.int32, count=len(edges))
+            targets = np.fromiter((target_ids[target] for _, target in edges), dtype=np.int32, count=len(edges))
+            if not sources.size:
+                return sources, targets
+            # Aristas únicas: una relación duplicada no debe contar dos veces
+            pairs = np.unique(sources.astype(np.int64) * max(len(target_ids), 1) + targets)
+            return (pairs // max(len(target_ids), 1)).astype(np.int32), (pairs % max(len(target_ids), 1)).astype(np.int32)
+
+        friend_sources, friend_targets = encode(friend_edges, user_ids)
+        like_users, like_games = encode(like_edges, game_ids)
+        played_users, played_games = encode(played_edges, game_ids)
+
+        graph = cls(user_names, game_names, {
+            'friends': _csr(friend_sources, friend_targets, len(user_names)),
+            'likes': _csr(like_users, like_games, len(user_names)),
+            'likers': _csr(like_games, like_users, len(game_names)),
+            'played': _csr(played_users, played_games, len(user_names))
+        })
+
+        logger.info(
+            f"Grafo social construido: {len(user_names)} usuarios, {len(game_names)} juegos, "
+            f"{friend_sources.size} FRIENDS_WITH, {like_users.size} LIKES, {played_users.size} PLAYED"
+        )
+        return graph
+
+    @staticmethod
+    def _gather(offsets: np.ndarray, values: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Concatena las listas de adyacencia de `rows`. Devuelve los vecinos
+        y, para cada vecino, la posición en `rows` de la fila de origen.
+        """
+        starts = offsets[rows]
+        lengths = offsets[rows + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.empty(0, dtype=values.dtype), np.empty(0, dtype=np.int64)
+
+        owners = np.repeat(np.arange(rows.size), lengths)
+        positions = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+        return values[positions], owners
+
+    def _row(self, offsets: np.ndarray, values: np.ndarray, row: int) -> np.ndarray:
+        return values[offsets[row]:offsets[row + 1]]
+
+    def _interacted(self, user: int) -> np.ndarray:
+        return np.union1d(self._row(self.likes_offsets, self.likes, user), self._row(self.played_offsets, self.played, user))
+
+    def _top_k(self, scores: np.ndarray, k: int, exclude: np.ndarray) -> List[Tuple[str, float]]:
+        if k <= 0 or not scores.size:
+            return []
+
+        mask = scores > 0
+        mask[exclude] = False
+        candidates = np.flatnonzero(mask)
+        if candidates.size > k:
+            # Se conservan todos los empatados con el k-ésimo para desempatar por ID
+            kth = -np.partition(-scores[candidates], k - 1)[k - 1]
+            candidates = candidates[scores[candidates] >= kth]
+
+        order = np.lexsort((candidates, -scores[candidates]))[:k]
+        return [(self.game_names[idx], scores[idx].item()) for idx in candidates[order]]
+
+    def friend_scores(self, user_name: str, k: int, friend_sample_limit: int = 0,
+                      friend_of_friend_weight: float = 0.5) -> List[Tuple[str, float]]:
+        """Equivalente en memoria de FRIENDS_WEIGHTED_QUERY"""
+        user = self.user_ids.get(user_name)
+        if user is None:
+            return []
+
+        all_friends = self._row(self.friends_offsets, self.friends, user)
+        friends = all_friends[:friend_sample_limit] if friend_sample_limit > 0 else all_friends
+
+        friends_of_friends, _ = self._gather(self.friends_offsets, self.friends, friends.astype(np.int64))
+        friends_of_friends = np.setdiff1d(friends_of_friends, np.append(all_friends, user))
+
+        likers = np.concatenate([friends, friends_of_friends])
+        liker_weights = np.concatenate([
+            np.full(friends.size, 1.0),
+            np.full(friends_of_friends.size, friend_of_friend_weight)
+        ])
+
+        games, owners = self._gather(self.likes_offsets, self.likes, likers.astype(np.int64))
+        scores = np.bincount(games, weights=liker_weights[owners], minlength=len(self.game_names))
+        return self._top_k(scores, k, self._interacted(user))
+
+    def similar_user_scores(self, user_name: str, k: int) -> List[Tuple[str, float]]:
+        """Equivalente en memoria de SIMILAR_USERS_QUERY"""
+        user = self.user_ids.get(user_name)
+        if user is None:
+            return []
+
+        liked = self._row(self.likes_offsets, self.likes, user)
+        co_likers, _ = self._gather(self.likers_offsets, self.likers, liked.astype(np.int64))
+
+        # Juegos en común con cada usuario que comparte al menos un LIKES
+        common = np.bincount(co_likers, minlength=len(self.user_names))
+        common[user] = 0
+        others = np.flatnonzero(common)
+
+        games, owners = self._gather(self.likes_offsets, self.likes, others)
+        scores = np.bincount(games, weights=common[others][owners].astype(np.float64), minlength=len(self.game_names))
+        return self._top_k(scores, k, self._interacted(user))
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes ocupados por los arreglos CSR y número de nodos/aristas"""
+        arrays = {
+            'friends': (self.friends_offsets, self.friends),
+            'likes': (self.likes_offsets, self.likes),
+            'likers': (self.likers_offsets, self.likers),
+            'played': (self.played_offsets, self.played)
+        }
+        usage = {f'{name}Bytes': int(offsets.nbytes + values.nbytes) for name, (offsets, values) in arrays.items()}
+        usage['totalBytes'] = sum(usage.values())
+        usage['users'] = len(self.user_names)
+        usage['games'] = len(self.game_names)
+        usage['friendEdges'] = int(self.friends.size)
+        usage['likeEdges'] = int(self.likes.size)
+        usage['playedEdges'] = int(self.played.size)
+        return usage
@@ -0,0 +1,124 @@
+from typing import Dict, List, Optional, Tuple
+from contextvars import ContextVar
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+class RequestTrace:
+    """Tiempos acumulados por etapa de una petición"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.stages: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float):
+        timing = self.stages.get(name)
+        if timing is None:
+            self.stages[name] = [seconds, 1]
+        else:
+            timing[0] += seconds
+            timing[1] += 1
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def total(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def breakdown(self) -> List[Tuple[str, float, int]]:
+        """(etapa, milisegundos, veces) en el orden en que se registró cada etapa"""
+        return [(name, seconds * 1000, count) for name, (seconds, count) in self.stages.items()]
+
+    def to_dict(self):
+        return {
+            'totalMs': round(self.total * 1000, 3),
+            'stages': [
+                {'name': name, 'ms': round(ms, 3), 'count': count}
+                for name, ms, count in self.breakdown()
+            ]
+        }
+
+    def server_timing(self) -> str:
+        """Valor de la cabecera Server-Timing"""
+        entries = [f'{name};dur={ms:.3f}' for name, ms, _ in self.breakdown()]
+        entries.append(f'total;dur={self.total * 1000:.3f}')
+        return ', '.join(entries)
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar('request_trace', default=None)
+
+class _Stage:
+    __slots__ = ('trace', 'name', 'started')
+
+    def __init__(self, trace: RequestTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.trace.add(self.name, time.perf_counter() - self.started)
+        return False
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NOOP_STAGE = _NoopStage()
+
+def stage(name: str):
+    """
+    Mide una etapa de la petición en curso: `with stage('score'): ...`.
+    Sin traza activa devuelve un contexto vacío compartido, así que el
+    coste con el trazado desactivado es una lectura de ContextVar.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_STAGE
+    return _Stage(trace, name)
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+def start_trace(label: str):
+    """Activa una traza en el contexto actual; devuelve el token para cerrarla"""
+    return _current_trace.set(RequestTrace(label))
+
+def finish_trace(token) -> Optional[RequestTrace]:
+    """Cierra la traza activa y restaura el contexto anterior"""
+    trace = _current_trace.get()
+    _current_trace.reset(token)
+    if trace is not None:
+        trace.finish()
+    return trace
+
+class SlowRequestLog:
+    """Registra con el desglose por etapas las peticiones que superan un umbral"""
+
+    def __init__(self, threshold_ms: float, sample_rate: float = 1.0):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+
+    def record(self, trace: RequestTrace) -> bool:
+        total_ms = trace.total * 1000
+        if self.threshold_ms <= 0 or total_ms < self.threshold_ms:
+            return False
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+
+        stages = ', '.join(f'{name}={ms:.1f}ms' + (f' x{count}' if count > 1 else '') for name, ms, count in trace.breakdown())
+        logger.warning(f"Petición lenta {trace.label}: {total_ms:.1f} ms ({stages or 'sin etapas'})")
+        return True
@@ -0,0 +1,60 @@
+from typing import Dict, List, Optional
+import logging
+from models import UserProfile
+from neo4j_connection import Neo4jConnectionManager
+from query_fanout import QueryFanOut, FanOutResult, get_shared_fanout
+from queries import VGSALES_USER_PROFILE_QUERY, VIDEOGAMES_USER_PROFILE_QUERY
+
+logger = logging.getLogger(__name__)
+
+def build_user_profiles(user_ids: List[str], result: FanOutResult) -> Dict[str, UserProfile]:
+    """
+    Combina las filas de ambas bases de datos en un perfil por usuario. Si
+    una base de datos falló, los perfiles quedan marcados como parciales.
+    """
+    profiles = {user_id: UserProfile(user_id, partial=result.partial) for user_id in user_ids}
+
+    for record in result.all_rows():
+        profile = profiles.get(record['userId'])
+        if profile is None:
+            continue
+
+        profile.liked_games.update(record['likedGames'])
+        profile.played_games.update(record['playedGames'])
+        for names in record['genres']:
+            profile.genres.update(names)
+        for names in record['platforms']:
+            profile.platforms.update(names)
+
+    return profiles
+
+def profile_queries(vgsales_connection, videogames_connection, user_ids: List[str]) -> Dict:
+    """Consultas de perfil por base de datos, en formato de QueryFanOut"""
+    params = {'userIds': user_ids}
+    return {
+        'vgsales': (vgsales_connection, VGSALES_USER_PROFILE_QUERY, params),
+        'videogames': (videogames_connection, VIDEOGAMES_USER_PROFILE_QUERY, params)
+    }
+
+class UserProfileLoader:
+    """
+    Carga el vecindario (user)-[:LIKES|PLAYED]->(game) de uno o varios
+    usuarios con una consulta basada en COLLECT por base de datos.
+    """
+
+    def __init__(self, vgsales_connection: Neo4jConnectionManager, videogames_connection: Neo4jConnectionManager,
+                 fanout: Optional[QueryFanOut] = None):
+        self.vgsales_conn = vgsales_connection
+        self.videogames_conn = videogames_connection
+        self.fanout = fanout or get_shared_fanout()
+
+    def load(self, user_id: str) -> UserProfile:
+        return self.load_many([user_id])[user_id]
+
+    def load_many(self, user_ids: List[str]) -> Dict[str, UserProfile]:
+        result = self.fanout.run(profile_queries(self.vgsales_conn, self.videogames_conn, user_ids))
+
+        if result.failed:
+            raise RuntimeError(f"No se pudo cargar el perfil en ninguna base de datos: {result.errors}")
+
+        return build_user_profiles(user_ids, result)
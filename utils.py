@@ -1,3 +1,4 @@
+import json
 import logging
 from functools import wraps
 from flask import jsonify
@@ -21,9 +22,32 @@ def handle_errors(f):
             return jsonify({
                 'success': False,
                 'error': str(e)
-            }), 500
+            }), getattr(e, 'status_code', 500)
     return decorated_function
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def ndjson_lines(records):
+    """
+    Genera una línea JSON por registro. Si falla a mitad de la respuesta,
+    cuando el estado ya se envió, el error llega como última línea.
+    """
+    try:
+        for record in records:
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+    except Exception as e:
+        logging.error(f"Error generando respuesta NDJSON: {str(e)}")
+        yield json.dumps({'success': False, 'error': str(e)}, ensure_ascii=False) + '\n'
+
+async def ndjson_lines_async(records):
+    """Equivalente de ndjson_lines para iterables asíncronos"""
+    try:
+        async for record in records:
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+    except Exception as e:
+        logging.error(f"Error generando respuesta NDJSON: {str(e)}")
+        yield json.dumps({'success': False, 'error': str(e)}, ensure_ascii=False) + '\n'
+
 def validate_request_data(required_fields):
     """Decorador para validar datos de request"""
     def decorator(f):